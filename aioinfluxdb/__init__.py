@@ -1,8 +1,32 @@
 from __future__ import annotations
 
-from .aiohttp_client import AioHTTPClient
-from .client import Client
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
+
 from .constants import WritePrecision
-from .types import MinimalRecordTuple, Record, RecordTuple
+from .types import MinimalRecordTuple, Point, Record, RecordTuple
+
+if TYPE_CHECKING:
+    from .aiohttp_client import AioHTTPClient
+    from .client import Client
+
+__all__ = ('Client', 'AioHTTPClient', 'MinimalRecordTuple', 'Point', 'Record', 'RecordTuple', 'WritePrecision')
+
+# the clients pull in asyncio, aiohttp and the Flux CSV parser, so they are imported on first access (PEP 562)
+_lazy_attributes: Dict[str, str] = {
+    'AioHTTPClient': '.aiohttp_client',
+    'Client': '.client',
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _lazy_attributes.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ('Client', 'AioHTTPClient', 'MinimalRecordTuple', 'Record', 'RecordTuple', 'WritePrecision')
+def __dir__() -> List[str]:
+    return sorted(set(globals()).union(__all__))
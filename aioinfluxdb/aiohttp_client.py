@@ -1,24 +1,103 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import http
+import re
+import time
 from datetime import datetime
-from typing import Any, AsyncIterable, Dict, Iterable, List, Mapping, Optional, Union, overload
+from types import SimpleNamespace
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+    overload,
+)
 
 import aiohttp
 import orjson
 from aiocsv.protocols import WithAsyncRead
 from isal import igzip as gzip
+from isal import isal_zlib
+from typing_extensions import Final
+from yarl import URL
 
 from aioinfluxdb import constants, serializer, types
+from aioinfluxdb.arrow import record_batches
+from aioinfluxdb.cache import CachedFluxResult, MetadataCache, QueryCache
 from aioinfluxdb.client import Client
-from aioinfluxdb.csv_parser import FluxCsvParser
+from aioinfluxdb.csv_parser import FluxCsvParser, SchemaCache
+from aioinfluxdb.exceptions import InvalidRecordError, PartialWriteError, WriteError
 from aioinfluxdb.flux_table import FluxRecord
+from aioinfluxdb.instrumentation import Instrumentation
+from aioinfluxdb.prepared_query import PreparedQuery
+from aioinfluxdb.singleflight import SingleFlight
+from aioinfluxdb.spool import WriteSpool
+from aioinfluxdb.throttle import WriteThrottle
+from aioinfluxdb.write_target import WriteTarget
+
+if TYPE_CHECKING:
+    import pyarrow
+
+_F = TypeVar('_F', bound=Callable[..., Awaitable[Any]])
+
+_flux_header: Final[Pattern[str]] = re.compile(r'(?:\s*(?://[^\n]*|import\s+(?:\w+\s+)?"[^"]*"))*')
+""" comments and imports at the start of a Flux script """
+
+
+def _enable_profilers(flux_body: str, profilers: Sequence[str]) -> str:
+    """`flux_body` with the `profiler` package imported and `profilers` enabled after the imports of the query"""
+    end = _flux_header.match(flux_body).end()  # type: ignore[union-attr]
+    header, body = flux_body[:end], flux_body[end:]
+    if re.search(r'import\s+"profiler"', header) is None:
+        header = 'import "profiler"\n' + header
+    enabled = ', '.join(f'"{profiler}"' for profiler in profilers)
+    return f'{header}\noption profiler.enabledProfilers = [{enabled}]\n{body}'
+
+
+def _deduplicated(method: _F) -> _F:
+    """Concurrent calls with the same arguments share one request if the client has `single_flight` enabled"""
+
+    @functools.wraps(method)
+    async def wrapper(self: AioHTTPClient, **kwargs: Any) -> Any:
+        if self._single_flight is None:
+            return await method(self, **kwargs)
+        key = (method.__name__, tuple(sorted(kwargs.items())))
+        return await self._single_flight.do(key, lambda: method(self, **kwargs))
+
+    return cast(_F, wrapper)
 
 
 class AioHTTPClient(Client):
     _host: str
     _port: int
     _session: aiohttp.ClientSession
+    _session_owner: bool
+    _spool: Optional[WriteSpool]
+    _spool_replay_interval: float
+    _spool_task: Optional[asyncio.Task[None]]
+    _write_throttle: Optional[WriteThrottle]
+    _instrumentation: Optional[Instrumentation]
+    _metadata_cache: Optional[MetadataCache]
+    _query_cache: Optional[QueryCache]
+    _single_flight: Optional[SingleFlight]
+    _record_serializer: serializer.RecordSerializer
+    _targets: Dict[Tuple[Tuple[str, str], ...], WriteTarget]
 
     def __init__(
         self,
@@ -28,21 +107,92 @@ class AioHTTPClient(Client):
         tls: bool = False,
         connector: Optional[aiohttp.BaseConnector] = None,
         gzip: bool = True,
+        spool: Optional[WriteSpool] = None,
+        spool_replay_interval: float = 5,
+        write_throttle: Optional[WriteThrottle] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        query_cache: Optional[QueryCache] = None,
+        single_flight: bool = False,
+        session: Optional[aiohttp.ClientSession] = None,
+        record_serializer: Optional[serializer.RecordSerializer] = None,
     ) -> None:
+        """
+        :param spool: keep writes that failed because the server is unreachable or overloaded
+            in this spool and replay them in the background instead of raising, see also `replay_spool()`
+        :param spool_replay_interval: seconds to wait between replay attempts of the spool
+        :param write_throttle: rate and concurrency limits applied to every write request
+        :param instrumentation: receives timings of serialization, compression, requests and parsing
+        :param metadata_cache: cache of buckets and organizations used by `get_*`, `find_*` and `list_*`
+        :param query_cache: cache of `flux_query()` results. Cached queries read the whole response before
+            the first record is returned
+        :param single_flight: concurrent identical `ping`, `get_*` and `list_*` calls share one request
+            and its result
+        :param session: session created with the base URL of the server to send the requests through
+            instead of creating one. It is not closed with this client. See also `with_token()`
+        :param record_serializer: serializer of the records given to `write*()`, `DefaultRecordSerializer` by default.
+            `SortedTagsRecordSerializer` writes tags ordered by key
+        """
         super().__init__(token=token, gzip=gzip)
 
         self._host = host
         self._port = port
-        self._session = aiohttp.ClientSession(
-            f'{"https" if tls else "http"}://{host}:{port}',
-            connector=connector,
-            connector_owner=connector is None,
+        self._spool = spool
+        self._spool_replay_interval = spool_replay_interval
+        self._spool_task = None
+        self._write_throttle = write_throttle
+        self._instrumentation = instrumentation
+        self._metadata_cache = metadata_cache
+        self._query_cache = query_cache
+        self._single_flight = SingleFlight() if single_flight else None
+        self._record_serializer = (
+            record_serializer if record_serializer is not None else serializer.DefaultRecordSerializer()
         )
+        self._targets = {}
+
+        if session is not None:
+            if connector is not None:
+                raise ValueError('`connector` can not be given along with `session`')
+            self._session = session
+            self._session_owner = False
+        else:
+            self._session = aiohttp.ClientSession(
+                f'{"https" if tls else "http"}://{host}:{port}',
+                connector=connector,
+                connector_owner=connector is None,
+                trace_configs=[_instrumentation_trace_config(instrumentation)] if instrumentation is not None else None,
+            )
+            self._session_owner = True
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self._session
+
+    def with_token(self, token: str) -> AioHTTPClient:
+        """
+        Client authenticated with `token` that sends its requests through the session of this client,
+        so clients of many tokens share one pool of keep-alive connections.
 
+        The new client has the same `gzip`, `single_flight` and `record_serializer` settings,
+        but no spool, throttle or caches, as those are specific to the token.
+        It can not be used once this client, which owns the session, is closed.
+        """
+        return AioHTTPClient(
+            host=self._host,
+            port=self._port,
+            token=token,
+            gzip=self._gzip,
+            single_flight=self._single_flight is not None,
+            session=self._session,
+            record_serializer=self._record_serializer,
+        )
+
+    @_deduplicated
     async def ping(self) -> bool:
         res = await self._session.get('/ping')
         return res.status in (http.HTTPStatus.OK, http.HTTPStatus.NO_CONTENT)
 
+    @_deduplicated
     async def list_organizations(
         self,
         *,
@@ -79,7 +229,11 @@ class AioHTTPClient(Client):
         res.raise_for_status()
         # TODO: Utilize `links`
         buckets = await res.json(loads=orjson.loads)
-        return map(types.Organization.from_json, buckets['orgs'])
+        orgs = tuple(map(types.Organization.from_json, buckets['orgs']))
+        if self._metadata_cache is not None:
+            for org in orgs:
+                self._metadata_cache.add_organization(org)
+        return orgs
 
     async def create_organization(self, *, description: Optional[str] = None, name: str) -> types.Organization:
         data = dict(name=name)
@@ -99,7 +253,10 @@ class AioHTTPClient(Client):
         )
         # TODO: error handling
         res.raise_for_status()
-        return types.Organization.from_json(await res.json(loads=orjson.loads))
+        org = types.Organization.from_json(await res.json(loads=orjson.loads))
+        if self._metadata_cache is not None:
+            self._metadata_cache.add_organization(org)
+        return org
 
     async def delete_organization(self, *, organization_id: str) -> None:
         headers = {aiohttp.hdrs.AUTHORIZATION: f'Token {self.api_token}'}
@@ -110,8 +267,16 @@ class AioHTTPClient(Client):
         )
         # TODO: error handling
         res.raise_for_status()
+        if self._metadata_cache is not None:
+            self._metadata_cache.remove_organization(organization_id)
 
+    @_deduplicated
     async def get_organization(self, *, organization_id: str) -> Optional[types.Organization]:
+        if self._metadata_cache is not None:
+            cached, org = self._metadata_cache.organizations.lookup(organization_id)
+            if cached:
+                return org
+
         headers = {aiohttp.hdrs.AUTHORIZATION: f'Token {self.api_token}'}
 
         res = await self._session.get(
@@ -120,8 +285,31 @@ class AioHTTPClient(Client):
         )
         # TODO: error handling
         res.raise_for_status()
-        return types.Organization.from_json(await res.json(loads=orjson.loads))
+        org = types.Organization.from_json(await res.json(loads=orjson.loads))
+        if self._metadata_cache is not None:
+            self._metadata_cache.add_organization(org)
+        return org
 
+    async def find_organization(self, *, name: str) -> Optional[types.Organization]:
+        """Organization named `name`, or `None` if it does not exist"""
+        if self._metadata_cache is not None:
+            cached, org = self._metadata_cache.organization_names.lookup(name)
+            if cached:
+                return org
+
+        try:
+            org = next(iter(await self.list_organizations(organization_name=name, limit=1)), None)
+        except aiohttp.ClientResponseError as e:
+            # the API responds 404 to an unknown `org` filter
+            if e.status != http.HTTPStatus.NOT_FOUND:
+                raise
+            org = None
+
+        if self._metadata_cache is not None and org is None:
+            self._metadata_cache.organization_names.set(name, None)
+        return org
+
+    @_deduplicated
     async def list_buckets(
         self,
         *,
@@ -160,7 +348,11 @@ class AioHTTPClient(Client):
         res.raise_for_status()
         # TODO: Utilize `links`
         buckets = await res.json(loads=orjson.loads)
-        return map(types.Bucket.from_json, buckets['buckets'])
+        ret = tuple(map(types.Bucket.from_json, buckets['buckets']))
+        if self._metadata_cache is not None:
+            for bucket in ret:
+                self._metadata_cache.add_bucket(bucket)
+        return ret
 
     async def create_bucket(
         self,
@@ -198,7 +390,10 @@ class AioHTTPClient(Client):
             headers=headers,
         )
         res.raise_for_status()
-        return types.Bucket.from_json(await res.json(loads=orjson.loads))
+        bucket = types.Bucket.from_json(await res.json(loads=orjson.loads))
+        if self._metadata_cache is not None:
+            self._metadata_cache.add_bucket(bucket)
+        return bucket
 
     async def delete_bucket(self, *, bucket_id: str) -> None:
         headers = {aiohttp.hdrs.AUTHORIZATION: f'Token {self.api_token}'}
@@ -208,8 +403,16 @@ class AioHTTPClient(Client):
             headers=headers,
         )
         res.raise_for_status()
+        if self._metadata_cache is not None:
+            self._metadata_cache.remove_bucket(bucket_id)
 
+    @_deduplicated
     async def get_bucket(self, *, bucket_id: str) -> Optional[types.Bucket]:
+        if self._metadata_cache is not None:
+            cached, bucket = self._metadata_cache.buckets.lookup(bucket_id)
+            if cached:
+                return bucket
+
         headers = {aiohttp.hdrs.AUTHORIZATION: f'Token {self.api_token}'}
 
         res = await self._session.get(
@@ -218,7 +421,44 @@ class AioHTTPClient(Client):
         )
         # TODO: error handling
         res.raise_for_status()
-        return types.Bucket.from_json(await res.json(loads=orjson.loads))
+        bucket = types.Bucket.from_json(await res.json(loads=orjson.loads))
+        if self._metadata_cache is not None:
+            self._metadata_cache.add_bucket(bucket)
+        return bucket
+
+    @overload
+    async def find_bucket(self, *, name: str, organization: str) -> Optional[types.Bucket]:
+        pass  # pragma: no cover
+
+    @overload
+    async def find_bucket(self, *, name: str, organization_id: str) -> Optional[types.Bucket]:
+        pass  # pragma: no cover
+
+    async def find_bucket(self, *, name: str, **kwargs: str) -> Optional[types.Bucket]:
+        """Bucket named `name` in the given organization, or `None` if it does not exist"""
+        key = (kwargs.get('organization'), kwargs.get('organization_id'), name)
+        if self._metadata_cache is not None:
+            cached, bucket = self._metadata_cache.bucket_names.lookup(key)
+            if cached:
+                return bucket
+
+        try:
+            buckets = await self.list_buckets(
+                name=name,
+                limit=1,
+                organization=kwargs.get('organization'),
+                organization_id=kwargs.get('organization_id'),
+            )
+            bucket = next(iter(buckets), None)
+        except aiohttp.ClientResponseError as e:
+            # the API responds 404 to an unknown `org` filter
+            if e.status != http.HTTPStatus.NOT_FOUND:
+                raise
+            bucket = None
+
+        if self._metadata_cache is not None:
+            self._metadata_cache.bucket_names.set(key, bucket)
+        return bucket
 
     @overload
     async def write(
@@ -227,7 +467,7 @@ class AioHTTPClient(Client):
         bucket: str,
         organization: str,
         precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
-        record: Union[str, types.Record, types.MinimalRecordTuple, types.RecordTuple],
+        record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple],
     ) -> None:
         pass  # pragma: no cover
 
@@ -238,7 +478,7 @@ class AioHTTPClient(Client):
         bucket: str,
         organization_id: str,
         precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
-        record: Union[str, types.Record, types.MinimalRecordTuple, types.RecordTuple],
+        record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple],
     ) -> None:
         pass  # pragma: no cover
 
@@ -247,28 +487,17 @@ class AioHTTPClient(Client):
         *,
         bucket: str,
         precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
-        record: Union[str, types.Record, types.MinimalRecordTuple, types.RecordTuple],
+        record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple],
         **kwargs: str,
     ) -> None:
-        data = serializer.DefaultRecordSerializer.serialize_record(record)  # type: ignore[arg-type]
-        headers = {aiohttp.hdrs.AUTHORIZATION: f'Token {self.api_token}'}
-
-        if self._gzip:
-            data = gzip.compress(data.encode())  # type: ignore[no-untyped-call]
-            headers[aiohttp.hdrs.CONTENT_ENCODING] = 'gzip'
-            headers[aiohttp.hdrs.ACCEPT_ENCODING] = 'gzip'
-
-        res = await self._session.post(
-            '/api/v2/write',
-            params=self._build_query_params(
+        target = self._target(
+            self._build_query_params(
                 bucket=bucket,
                 precision=precision,
-                org_map=kwargs,
-            ),
-            headers=headers,
-            data=data,
+                org_map=await self._resolve_org_map(kwargs),
+            )
         )
-        res.raise_for_status()
+        await self._write_data(target=target, data=self._serialize_records((record,)))
 
     @overload
     async def write_multiple(
@@ -280,9 +509,12 @@ class AioHTTPClient(Client):
         records: Union[
             Iterable[str],
             Iterable[types.Record],
+            Iterable[types.Point],
             Iterable[types.MinimalRecordTuple],
             Iterable[types.RecordTuple],
         ],
+        on_invalid: Optional[Callable[[types.InvalidRecord], Any]] = None,
+        bisect_rejected: bool = False,
     ) -> None:
         pass  # pragma: no cover
 
@@ -296,9 +528,12 @@ class AioHTTPClient(Client):
         records: Union[
             Iterable[str],
             Iterable[types.Record],
+            Iterable[types.Point],
             Iterable[types.MinimalRecordTuple],
             Iterable[types.RecordTuple],
         ],
+        on_invalid: Optional[Callable[[types.InvalidRecord], Any]] = None,
+        bisect_rejected: bool = False,
     ) -> None:
         pass  # pragma: no cover
 
@@ -310,30 +545,130 @@ class AioHTTPClient(Client):
         records: Union[
             Iterable[str],
             Iterable[types.Record],
+            Iterable[types.Point],
             Iterable[types.MinimalRecordTuple],
             Iterable[types.RecordTuple],
         ],
+        on_invalid: Optional[Callable[[types.InvalidRecord], Any]] = None,
+        bisect_rejected: bool = False,
         **kwargs: str,
     ) -> None:
-        data = '\n'.join(map(serializer.DefaultRecordSerializer.serialize_record, records))  # type: ignore[arg-type]
-        headers = {aiohttp.hdrs.AUTHORIZATION: f'Token {self.api_token}'}
+        """
+        :param on_invalid: drop the records the serializer rejects with `InvalidRecordError` from the batch
+            and report each of them to this callback, instead of raising. See `ValidatingRecordSerializer`
+        :param bisect_rejected: if the server rejects the batch as malformed (400), resubmit it without the line
+            the error points out, or in halves if it points out none, until only the malformed lines are left.
+            They are raised in a `PartialWriteError` once the rest is written, or spooled if a spool is configured
+        """
+        target = self._target(
+            self._build_query_params(
+                bucket=bucket,
+                precision=precision,
+                org_map=await self._resolve_org_map(kwargs),
+            )
+        )
+        if bisect_rejected:
+            await self._write_bisecting(target, self._serialize_lines(records, on_invalid))
+        elif on_invalid is not None:
+            lines = self._serialize_lines(records, on_invalid)
+            # nothing to send if every record was rejected
+            if len(lines) != 0:
+                await self._write_data(target=target, data=b'\n'.join(lines), points=len(lines))
+        else:
+            await self._write_data(target=target, data=self._serialize_records(records))
 
-        if self._gzip:
-            data = gzip.compress(data.encode())  # type: ignore[no-untyped-call]
-            headers[aiohttp.hdrs.CONTENT_ENCODING] = 'gzip'
-            headers[aiohttp.hdrs.ACCEPT_ENCODING] = 'gzip'
+    @overload
+    async def write_lines(
+        self,
+        data: Union[bytes, Iterable[bytes], AsyncIterable[bytes]],
+        *,
+        bucket: str,
+        organization: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        precompressed: bool = False,
+    ) -> None:
+        pass  # pragma: no cover
 
-        res = await self._session.post(
-            '/api/v2/write',
-            params=self._build_query_params(
+    @overload
+    async def write_lines(
+        self,
+        data: Union[bytes, Iterable[bytes], AsyncIterable[bytes]],
+        *,
+        bucket: str,
+        organization_id: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        precompressed: bool = False,
+    ) -> None:
+        pass  # pragma: no cover
+
+    async def write_lines(
+        self,
+        data: Union[bytes, Iterable[bytes], AsyncIterable[bytes]],
+        *,
+        bucket: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        precompressed: bool = False,
+        **kwargs: str,
+    ) -> None:
+        """
+        Write line protocol that is already serialized, without looking into it.
+
+        `data` is a body, or chunks of a body that are concatenated as-is,
+        so every chunk must end with a newline unless it is the last one.
+        An async iterable is streamed with chunked transfer encoding; such writes are not spooled,
+        and as their size is not known up front they pass a write throttle as a request of no points and no bytes.
+        Precompressed bodies are likewise throttled by their compressed size only.
+
+        :param precompressed: `data` is already gzip compressed
+        """
+        target = self._target(
+            self._build_query_params(
                 bucket=bucket,
                 precision=precision,
-                org_map=kwargs,
-            ),
-            headers=headers,
-            data=data,
+                org_map=await self._resolve_org_map(kwargs),
+            )
         )
-        res.raise_for_status()
+        await self._write_lines(target=target, data=data, precompressed=precompressed)
+
+    def replay_spool(self) -> None:
+        """
+        Start replaying the spool in the background if it holds any writes, such as the ones left by a previous run.
+
+        Writes that fail into the spool start the replay on their own, so this is only needed after opening
+        a spool that is not empty. Must be called from a running event loop.
+        """
+        if self._spool and self._spool_task is None:
+            self._spool_task = asyncio.create_task(self._replay_spool())
+
+    @overload
+    def target(
+        self,
+        *,
+        bucket: str,
+        organization: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+    ) -> WriteTarget:
+        pass  # pragma: no cover
+
+    @overload
+    def target(
+        self,
+        *,
+        bucket: str,
+        organization_id: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+    ) -> WriteTarget:
+        pass  # pragma: no cover
+
+    def target(
+        self,
+        *,
+        bucket: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        **kwargs: str,
+    ) -> WriteTarget:
+        """Reusable handle to write into `bucket` with prebuilt request URL and headers"""
+        return self._target(self._build_query_params(bucket=bucket, precision=precision, org_map=kwargs))
 
     @overload
     async def flux_query(
@@ -343,7 +678,8 @@ class AioHTTPClient(Client):
         flux_body: str,
         now: Optional[datetime] = None,
         params: Optional[Mapping[str, Any]] = None,
-    ) -> AsyncIterable[FluxRecord]:
+        profilers: Optional[Sequence[str]] = None,
+    ) -> types.FluxQueryResult:
         pass  # pragma: no cover
 
     @overload
@@ -354,7 +690,8 @@ class AioHTTPClient(Client):
         flux_body: str,
         now: Optional[datetime] = None,
         params: Optional[Mapping[str, Any]] = None,
-    ) -> AsyncIterable[FluxRecord]:
+        profilers: Optional[Sequence[str]] = None,
+    ) -> types.FluxQueryResult:
         pass  # pragma: no cover
 
     async def flux_query(
@@ -363,18 +700,161 @@ class AioHTTPClient(Client):
         flux_body: str,
         now: Optional[datetime] = None,
         params: Optional[Mapping[str, Any]] = None,
+        profilers: Optional[Sequence[str]] = None,
+        **kwargs: str,
+    ) -> types.FluxQueryResult:
+        """
+        :param profilers: Flux profilers to enable for the query, e.g. `query` and `operator`.
+            Their results are collected into the `stats` of the returned result instead of being returned as records.
+            A profiled query is never served from the query cache
+        """
+        if profilers:
+            stats = types.QueryStats()
+            res = await self._post_flux_query(
+                flux_body=_enable_profilers(flux_body, profilers), now=now, params=params, org_map=kwargs
+            )
+            query_options = types.QueryOptions(profilers=list(profilers), profiler_callback=stats.add_record)
+            return types.FluxQueryResult(self._read_flux_records(res, query_options=query_options), stats)
+
+        if self._query_cache is not None:
+            key = self._query_cache.key(flux_body=flux_body, now=now, params=params, org_map=kwargs)
+            result = await self._query_cache.get_or_fetch(
+                key,
+                lambda: self._fetch_flux_result(
+                    self._post_flux_query(flux_body=flux_body, now=now, params=params, org_map=kwargs)
+                ),
+            )
+            return types.FluxQueryResult(result.records())
+
+        res = await self._post_flux_query(flux_body=flux_body, now=now, params=params, org_map=kwargs)
+        return types.FluxQueryResult(self._read_flux_records(res))
+
+    @overload
+    async def flux_query_arrow(
+        self,
+        *,
+        organization: str,
+        flux_body: str,
+        now: Optional[datetime] = None,
+        params: Optional[Mapping[str, Any]] = None,
+        batch_size: int = 65_536,
+    ) -> AsyncIterator[pyarrow.RecordBatch]:
+        pass  # pragma: no cover
+
+    @overload
+    async def flux_query_arrow(
+        self,
+        *,
+        organization_id: str,
+        flux_body: str,
+        now: Optional[datetime] = None,
+        params: Optional[Mapping[str, Any]] = None,
+        batch_size: int = 65_536,
+    ) -> AsyncIterator[pyarrow.RecordBatch]:
+        pass  # pragma: no cover
+
+    async def flux_query_arrow(
+        self,
+        *,
+        flux_body: str,
+        now: Optional[datetime] = None,
+        params: Optional[Mapping[str, Any]] = None,
+        batch_size: int = 65_536,
         **kwargs: str,
+    ) -> AsyncIterator[pyarrow.RecordBatch]:
+        """
+        Like `flux_query()`, but the result is a stream of `pyarrow.RecordBatch`es typed after the `#datatype`
+        annotations, with at most `batch_size` rows of one Flux table each. Requires the `arrow` extra.
+
+        Write them to a Parquet or Arrow IPC file with `aioinfluxdb.arrow.write_record_batches()`.
+        """
+        res = await self._post_flux_query(flux_body=flux_body, now=now, params=params, org_map=kwargs)
+        parser = FluxCsvParser(
+            body_reader=_WithAsyncReadAdapter(res),
+            serialization_mode=constants.FluxSerializationMode.stream,
+        )
+        return record_batches(parser.row_generator(), batch_size=batch_size)
+
+    @overload
+    def prepare_query(self, *, organization: str, flux_body: str) -> PreparedQuery:
+        pass  # pragma: no cover
+
+    @overload
+    def prepare_query(self, *, organization_id: str, flux_body: str) -> PreparedQuery:
+        pass  # pragma: no cover
+
+    def prepare_query(self, *, flux_body: str, **kwargs: str) -> PreparedQuery:
+        """Flux query that is executed repeatedly with different `params`, see `PreparedQuery`"""
+        return PreparedQuery(self, flux_body=flux_body, org_map=kwargs)
+
+    def _read_flux_records(
+        self,
+        res: aiohttp.ClientResponse,
+        schema_cache: Optional[SchemaCache] = None,
+        query_options: Optional[types.QueryOptions] = None,
     ) -> AsyncIterable[FluxRecord]:
-        headers = {
-            aiohttp.hdrs.AUTHORIZATION: f'Token {self.api_token}',
-            aiohttp.hdrs.CONTENT_TYPE: 'application/json',
-            aiohttp.hdrs.ACCEPT: 'application/csv',
-        }
+        reader = _WithAsyncReadAdapter(res)
+        parser = FluxCsvParser(
+            body_reader=reader,
+            serialization_mode=constants.FluxSerializationMode.stream,
+            query_options=query_options,
+            schema_cache=schema_cache,
+        )
+        if self._instrumentation is None:
+            return parser.generator()
+        return self._instrument_parse(parser.generator(), reader)
 
-        if self._gzip:
-            # flux query does not support gzip body
-            headers[aiohttp.hdrs.ACCEPT_ENCODING] = 'gzip'
+    async def _fetch_flux_result(
+        self,
+        response: Awaitable[aiohttp.ClientResponse],
+        schema_cache: Optional[SchemaCache] = None,
+    ) -> CachedFluxResult:
+        res = await response
+
+        reader = _WithAsyncReadAdapter(res)
+        parser = FluxCsvParser(
+            body_reader=reader,
+            serialization_mode=constants.FluxSerializationMode.stream,
+            schema_cache=schema_cache,
+        )
+        records = parser.generator()
+        if self._instrumentation is not None:
+            records = self._instrument_parse(records, reader)
+
+        result = CachedFluxResult()
+        try:
+            async for record in records:
+                result.append(record)
+        finally:
+            res.close()
+        result.size = reader.size
+        return result
+
+    async def _post_flux_query(
+        self,
+        *,
+        flux_body: str,
+        now: Optional[datetime],
+        params: Optional[Mapping[str, Any]],
+        org_map: Mapping[str, str],
+    ) -> aiohttp.ClientResponse:
+        """Send a Flux query and return the response with the annotated CSV body not read yet"""
+        ser_body = orjson.dumps(self._flux_query_body(flux_body=flux_body, now=now, params=params))
+
+        return await self._send_flux_query(
+            url='/api/v2/query',
+            params=self._build_org_query_param(org_map),
+            headers=self._flux_query_headers(),
+            data=ser_body,
+        )
 
+    @staticmethod
+    def _flux_query_body(
+        *,
+        flux_body: str,
+        now: Optional[datetime],
+        params: Optional[Mapping[str, Any]],
+    ) -> Dict[str, Any]:
         body: Dict[str, Any] = dict(
             dialect=dict(
                 annotations=('group', 'datatype', 'default'),
@@ -387,22 +867,232 @@ class AioHTTPClient(Client):
             body['now'] = now
         if params is not None:
             body['params'] = params
+        return body
 
-        ser_body = orjson.dumps(body)
+    def _flux_query_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {
+            aiohttp.hdrs.AUTHORIZATION: f'Token {self.api_token}',
+            aiohttp.hdrs.CONTENT_TYPE: 'application/json',
+            aiohttp.hdrs.ACCEPT: 'application/csv',
+        }
 
-        res = await self._session.post(
-            '/api/v2/query',
-            params=self._build_org_query_param(kwargs),
-            headers=headers,
-            data=ser_body,
-        )
+        if self._gzip:
+            # flux query does not support gzip body
+            headers[aiohttp.hdrs.ACCEPT_ENCODING] = 'gzip'
+        return headers
+
+    async def _send_flux_query(
+        self,
+        *,
+        url: Union[str, URL],
+        params: Optional[Mapping[str, str]],
+        headers: Mapping[str, str],
+        data: bytes,
+    ) -> aiohttp.ClientResponse:
+        res = await self._session.post(url, params=params, headers=headers, data=data)
         res.raise_for_status()
+        return res
 
-        parser = FluxCsvParser(
-            body_reader=_WithAsyncReadAdapter(res),
-            serialization_mode=constants.FluxSerializationMode.stream,
-        )
-        return parser.generator()
+    async def _resolve_org_map(self, org_map: Mapping[str, str]) -> Mapping[str, str]:
+        """Replace an organization name with its cached id if `resolve_write_organizations` is enabled"""
+        if (
+            self._metadata_cache is None
+            or not self._metadata_cache.resolve_write_organizations
+            or 'organization' not in org_map
+        ):
+            return org_map
+
+        org = await self.find_organization(name=org_map['organization'])
+        if org is None or org.id is None:
+            return org_map
+        return dict(organization_id=org.id)
+
+    def _serialize_records(
+        self,
+        records: Iterable[Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple]],
+    ) -> bytes:
+        if self._instrumentation is None:
+            return '\n'.join(map(self._record_serializer.serialize_record, records)).encode()  # type: ignore[arg-type]
+        return b'\n'.join(self._serialize_lines(records))
+
+    def _serialize_lines(
+        self,
+        records: Iterable[Any],
+        on_invalid: Optional[Callable[[types.InvalidRecord], Any]] = None,
+    ) -> List[bytes]:
+        """Line of each record; records rejected by the serializer are reported to `on_invalid` if it is given"""
+        serialize_record: Callable[[Any], str] = self._record_serializer.serialize_record
+        started_at = time.perf_counter()
+        if on_invalid is None:
+            lines = [serialize_record(record).encode() for record in records]
+        else:
+            lines = []
+            for record in records:
+                try:
+                    lines.append(serialize_record(record).encode())
+                except InvalidRecordError as e:
+                    on_invalid(types.InvalidRecord(record=record, error=e))
+        if self._instrumentation is not None:
+            self._instrumentation.on_serialize(
+                points=len(lines),
+                size=sum(map(len, lines)) + max(len(lines) - 1, 0),
+                duration=time.perf_counter() - started_at,
+            )
+        return lines
+
+    async def _instrument_parse(
+        self,
+        records: AsyncGenerator[FluxRecord, None],
+        reader: _WithAsyncReadAdapter,
+    ) -> AsyncGenerator[FluxRecord, None]:
+        assert self._instrumentation is not None
+        rows = 0
+        duration = 0.0
+        try:
+            while True:
+                started_at = time.perf_counter()
+                try:
+                    record = await records.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    duration += time.perf_counter() - started_at
+                rows += 1
+                yield record
+        finally:
+            self._instrumentation.on_parse(rows=rows, size=reader.size, duration=duration)
+
+    def _target(self, params: Mapping[str, str]) -> WriteTarget:
+        key = tuple(params.items())
+        target = self._targets.get(key)
+        if target is None:
+            if len(self._targets) >= _MAX_CACHED_TARGETS:
+                self._targets.clear()
+            target = self._targets[key] = WriteTarget(self, params)
+        return target
+
+    async def _write_lines(
+        self,
+        *,
+        target: WriteTarget,
+        data: Union[bytes, Iterable[bytes], AsyncIterable[bytes]],
+        precompressed: bool,
+    ) -> None:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            await self._write_data(target=target, data=bytes(data), gzipped=precompressed)
+        elif isinstance(data, AsyncIterable):
+            if self._gzip and not precompressed:
+                data = _gzip_stream(data)
+            gzipped = self._gzip or precompressed
+            if self._write_throttle is None:
+                await self._send_write(target=target, data=data, gzipped=gzipped)
+            else:
+                async with self._write_throttle.throttle(points=0, size=0):
+                    await self._send_write(target=target, data=data, gzipped=gzipped)
+        else:
+            await self._write_data(target=target, data=b''.join(data), gzipped=precompressed)
+
+    async def _write_data(
+        self,
+        *,
+        target: WriteTarget,
+        data: bytes,
+        gzipped: bool = False,
+        points: Optional[int] = None,
+    ) -> bool:
+        """
+        Post already serialized line protocol to `/api/v2/write`.
+
+        :param target: destination of the write
+        :param data: line protocol body, gzip compressed if `gzipped` is set
+        :param gzipped: `data` was compressed by the caller and must be sent as-is
+        :param points: number of lines in `data`, counted from `data` if not given and not compressed
+        :return: `False` if the write failed and was kept in the spool instead
+        """
+        if points is None:
+            points = data.count(b'\n') + 1 if not gzipped else 0
+
+        if self._gzip and not gzipped:
+            if self._instrumentation is None:
+                data = gzip.compress(data)  # type: ignore[no-untyped-call]
+            else:
+                started_at = time.perf_counter()
+                compressed = gzip.compress(data)  # type: ignore[no-untyped-call]
+                self._instrumentation.on_compress(
+                    size=len(data),
+                    compressed_size=len(compressed),
+                    duration=time.perf_counter() - started_at,
+                )
+                data = compressed
+            gzipped = True
+
+        if self._spool is None:
+            await self._post_write(target=target, data=data, gzipped=gzipped, points=points)
+            return True
+
+        try:
+            await self._post_write(target=target, data=data, gzipped=gzipped, points=points)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            self._spool.append(params=target.params, data=data, gzipped=gzipped, points=points)
+        except aiohttp.ClientResponseError as e:
+            if not _is_retryable_status(e.status):
+                raise
+            self._spool.append(params=target.params, data=data, gzipped=gzipped, points=points)
+        else:
+            return True
+
+        self.replay_spool()
+        return False
+
+    async def _write_bisecting(self, target: WriteTarget, lines: List[bytes]) -> None:
+        """Write `lines`, isolating the lines the server rejects as malformed, see `bisect_rejected`"""
+        rejected: List[Tuple[bytes, WriteError]] = []
+        written = 0
+        spooled = 0
+        pending = [lines] if len(lines) != 0 else []
+        while len(pending) != 0:
+            batch = pending.pop()
+            try:
+                delivered = await self._write_data(target=target, data=b'\n'.join(batch), points=len(batch))
+            except WriteError as e:
+                if e.status != http.HTTPStatus.BAD_REQUEST:
+                    raise
+                if len(batch) == 1:
+                    rejected.append((batch[0], e))
+                elif e.line is not None and 1 <= e.line <= len(batch):
+                    rejected.append((batch[e.line - 1], e))
+                    pending.append(batch[: e.line - 1] + batch[e.line :])
+                else:
+                    middle = len(batch) // 2
+                    pending.append(batch[middle:])
+                    pending.append(batch[:middle])
+            else:
+                if delivered:
+                    written += len(batch)
+                else:
+                    spooled += len(batch)
+
+        if len(rejected) != 0:
+            raise PartialWriteError(rejected=rejected, written=written, spooled=spooled)
+
+    async def _post_write(self, *, target: WriteTarget, data: bytes, gzipped: bool, points: int = 0) -> None:
+        if self._write_throttle is None:
+            await self._send_write(target=target, data=data, gzipped=gzipped)
+            return
+
+        async with self._write_throttle.throttle(points=points, size=len(data)):
+            await self._send_write(target=target, data=data, gzipped=gzipped)
+
+    async def _send_write(
+        self,
+        *,
+        target: WriteTarget,
+        data: Union[bytes, AsyncIterable[bytes]],
+        gzipped: bool,
+    ) -> None:
+        res = await self._session.post(target.url, headers=target.headers(gzipped), data=data)
+        if not res.ok:
+            raise await _WriteResponseError.from_response(res)
 
     @classmethod
     def _build_query_params(
@@ -417,18 +1107,130 @@ class AioHTTPClient(Client):
         ret['precision'] = precision.value
         return ret
 
+    async def _replay_spool(self) -> None:
+        assert self._spool is not None
+        try:
+            while self._spool:
+                try:
+                    await self._spool.replay(self)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # besides the server being unavailable, e.g. a spool file may be unreadable for a while;
+                    # the task must not end, or nothing would be replayed until the next spooled write
+                    if self._instrumentation is not None:
+                        self._instrumentation.on_spool_error(error=e)
+                else:
+                    break
+                await asyncio.sleep(self._spool_replay_interval)
+        finally:
+            self._spool_task = None
+
     async def _close(self) -> None:
-        await self._session.close()
+        if self._spool_task is not None:
+            self._spool_task.cancel()
+            try:
+                await self._spool_task
+            except asyncio.CancelledError:
+                pass
+        if self._spool is not None:
+            self._spool.close()
+        if self._session_owner:
+            await self._session.close()
+
+
+_MAX_CACHED_TARGETS = 256
+
+
+async def _gzip_stream(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    compressor = isal_zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if len(compressed) != 0:
+            yield compressed
+    yield compressor.flush()
+
+
+def _instrumentation_trace_config(instrumentation: Instrumentation) -> aiohttp.TraceConfig:
+    async def on_request_start(
+        _: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        __: aiohttp.TraceRequestStartParams,
+    ) -> None:
+        ctx.started_at = time.perf_counter()
+
+    async def on_request_end(
+        _: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        params: aiohttp.TraceRequestEndParams,
+    ) -> None:
+        instrumentation.on_request(
+            method=params.method,
+            path=params.url.path,
+            status=params.response.status,
+            duration=time.perf_counter() - ctx.started_at,
+        )
+
+    async def on_request_exception(
+        _: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        params: aiohttp.TraceRequestExceptionParams,
+    ) -> None:
+        instrumentation.on_request(
+            method=params.method,
+            path=params.url.path,
+            status=None,
+            duration=time.perf_counter() - ctx.started_at,
+        )
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
+
+
+class _WriteResponseError(aiohttp.ClientResponseError, WriteError):
+    @classmethod
+    async def from_response(cls, res: aiohttp.ClientResponse) -> _WriteResponseError:
+        """Error of a failed write with the details of its JSON body, e.g. `{"code": "invalid", "message": ...}`"""
+        try:
+            body = orjson.loads(await res.read())
+        except (aiohttp.ClientError, orjson.JSONDecodeError):
+            body = None
+        finally:
+            res.release()
+        if not isinstance(body, dict):
+            body = {}
+
+        e = cls(
+            res.request_info,
+            res.history,
+            status=res.status,
+            message=body.get('message') or res.reason or '',
+            headers=res.headers,
+        )
+        e.error_code = body.get('code')
+        line = body.get('line')
+        e.line = line if isinstance(line, int) else None
+        return e
+
+
+def _is_retryable_status(status: int) -> bool:
+    return status == http.HTTPStatus.TOO_MANY_REQUESTS or status >= http.HTTPStatus.INTERNAL_SERVER_ERROR
 
 
 class _WithAsyncReadAdapter(WithAsyncRead):
     _res: aiohttp.ClientResponse
     _encoding: str
+    size: int
+    """ bytes read so far """
 
     def __init__(self, res: aiohttp.ClientResponse) -> None:
         super().__init__()
         self._res = res
         self._encoding = res.get_encoding()
+        self.size = 0
 
     async def read(self, __size: int) -> str:
         encoded_length = 0
@@ -449,6 +1251,10 @@ class _WithAsyncReadAdapter(WithAsyncRead):
 
             chunks.append(chunk)
             encoded_length += len(chunk)
-        self._res.close()
+            self.size += len(buf)
+
+        if self._res.content.at_eof():
+            # return the connection to the pool once the body is consumed
+            self._res.release()
 
         return ''.join(chunks)
@@ -0,0 +1,206 @@
+"""
+Flux query results as Apache Arrow record batches, built from the annotated CSV without `FluxRecord`s.
+
+Requires the `arrow` extra (`pyarrow`), which is imported on first use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import os
+from typing import TYPE_CHECKING, Any, AsyncGenerator, AsyncIterable, Dict, List, Optional, Tuple, Union
+
+from aioinfluxdb.flux_table import FluxColumn, FluxTable
+
+if TYPE_CHECKING:
+    import pyarrow
+
+
+def _arrow_type(data_type: Optional[str]) -> pyarrow.DataType:
+    import pyarrow
+
+    types: Dict[Optional[str], pyarrow.DataType] = {
+        'string': pyarrow.string(),
+        'boolean': pyarrow.bool_(),
+        'long': pyarrow.int64(),
+        'unsignedLong': pyarrow.uint64(),
+        'double': pyarrow.float64(),
+        'base64Binary': pyarrow.binary(),
+        'dateTime:RFC3339': pyarrow.timestamp('ns', tz='UTC'),
+        'dateTime:RFC3339Nano': pyarrow.timestamp('ns', tz='UTC'),
+        'duration': pyarrow.duration('ns'),
+    }
+    return types.get(data_type, pyarrow.null())
+
+
+def flux_table_schema(table: FluxTable) -> pyarrow.Schema:
+    """Arrow schema of the columns of `table`, typed after their `#datatype` annotation"""
+    import pyarrow
+
+    return pyarrow.schema(
+        pyarrow.field(
+            column.label,
+            _arrow_type(column.data_type),
+            metadata={'group': 'true' if column.group else 'false'},
+        )
+        for column in table.columns
+    )
+
+
+def _column_array(column: FluxColumn, field: pyarrow.Field, values: List[Optional[str]]) -> pyarrow.Array:
+    import pyarrow
+
+    if column.data_type == 'base64Binary':
+        return pyarrow.array([base64.b64decode(v) if v is not None else None for v in values], pyarrow.binary())
+    if column.data_type == 'duration':
+        return pyarrow.array(values, pyarrow.string()).cast(pyarrow.int64()).cast(field.type)
+    if field.type == pyarrow.null():
+        return pyarrow.nulls(len(values))
+    return pyarrow.array(values, pyarrow.string()).cast(field.type)
+
+
+class _BatchBuilder:
+    """Raw values of the rows of one table, column by column"""
+
+    table: FluxTable
+    schema: pyarrow.Schema
+    _columns: List[Tuple[FluxColumn, int, Optional[str], List[Optional[str]]]]
+    """ column, index of its value in a CSV row, default value and values """
+
+    def __init__(self, table: FluxTable) -> None:
+        self.table = table
+        self.schema = flux_table_schema(table)
+        self._columns = [
+            (column, column.index + 1, column.default_value or None, [])  # type: ignore[operator]
+            for column in table.columns
+        ]
+
+    def __len__(self) -> int:
+        return len(self._columns[0][3]) if len(self._columns) != 0 else 0
+
+    def append(self, row: List[str]) -> None:
+        for _, index, default_value, values in self._columns:
+            values.append(row[index] or default_value)
+
+    def build(self) -> pyarrow.RecordBatch:
+        import pyarrow
+
+        arrays = [
+            _column_array(column, field, values) for (column, _, _, values), field in zip(self._columns, self.schema)
+        ]
+        for _, _, _, values in self._columns:
+            values.clear()
+        return pyarrow.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+async def record_batches(
+    rows: AsyncIterable[Tuple[FluxTable, List[str]]],
+    batch_size: int = 65_536,
+) -> AsyncGenerator[pyarrow.RecordBatch, None]:
+    """
+    Record batches of the rows of `FluxCsvParser.row_generator()`.
+
+    Each batch holds rows of a single Flux table and at most `batch_size` of them.
+    The `result` and `table` columns tell which result and table a batch belongs to.
+    """
+    builder: Optional[_BatchBuilder] = None
+    async for table, row in rows:
+        if builder is None or builder.table is not table:
+            if builder is not None and len(builder) != 0:
+                yield builder.build()
+            if builder is not None and builder.table.columns == table.columns:
+                # the next table of the same annotations, only its group key differs
+                builder.table = table
+            else:
+                builder = _BatchBuilder(table)
+        builder.append(row)
+        if len(builder) >= batch_size:
+            yield builder.build()
+
+    if builder is not None and len(builder) != 0:
+        yield builder.build()
+
+
+def _align(batch: pyarrow.RecordBatch, schema: pyarrow.Schema) -> pyarrow.RecordBatch:
+    """`batch` with the columns of `schema`; columns `batch` does not have are null"""
+    import pyarrow
+
+    if batch.schema.equals(schema):
+        return batch
+    extra = set(batch.schema.names).difference(schema.names)
+    if len(extra) != 0:
+        raise ValueError(f'Columns {", ".join(sorted(extra))} are not in the schema of the file')
+    arrays = [
+        (
+            batch.column(field.name).cast(field.type)
+            if field.name in batch.schema.names
+            else pyarrow.nulls(batch.num_rows, field.type)
+        )
+        for field in schema
+    ]
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+async def write_record_batches(
+    batches: AsyncIterable[pyarrow.RecordBatch],
+    sink: Union[str, os.PathLike, Any],  # type: ignore[type-arg]
+    *,
+    format: str = 'parquet',
+    schema: Optional[pyarrow.Schema] = None,
+    **writer_options: Any,
+) -> int:
+    """
+    Write `batches` to a Parquet or Arrow IPC (`format='ipc'`) file as they arrive.
+
+    The file has `schema`, or the schema of the first batch. Later batches are aligned to it by column name.
+    Batches are written in the default executor, so the event loop keeps reading the next batch meanwhile.
+
+    :param sink: path or writable `pyarrow` file
+    :param writer_options: passed to `pyarrow.parquet.ParquetWriter` or `pyarrow.ipc.new_file`
+    :return: number of written rows
+    """
+    if format not in ('parquet', 'ipc'):
+        raise ValueError(f'Unsupported format: {format}')
+
+    loop = asyncio.get_running_loop()
+    writer: Any = None
+    pending: Optional[asyncio.Future[None]] = None
+    rows = 0
+    try:
+        async for batch in batches:
+            if writer is None:
+                if schema is None:
+                    schema = batch.schema
+                writer = _open_writer(sink, schema, format, writer_options)
+            batch = _align(batch, schema)
+            if pending is not None:
+                await pending
+            pending = loop.run_in_executor(None, writer.write_batch, batch)
+            rows += batch.num_rows
+        if pending is not None:
+            await pending
+        if writer is None and schema is not None:
+            # an empty result still makes a readable file
+            writer = _open_writer(sink, schema, format, writer_options)
+    finally:
+        if pending is not None:
+            # the writer is not closed under the batch in flight; if that failed as well,
+            # the exception already propagating is the one raised
+            await asyncio.wait([pending])
+            if not pending.cancelled():
+                pending.exception()
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _open_writer(sink: Any, schema: pyarrow.Schema, format: str, options: Dict[str, Any]) -> Any:
+    if format == 'parquet':
+        import pyarrow.parquet
+
+        return pyarrow.parquet.ParquetWriter(sink, schema, **options)
+
+    import pyarrow.ipc
+
+    return pyarrow.ipc.new_file(sink, schema, **options)
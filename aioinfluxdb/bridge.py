@@ -0,0 +1,239 @@
+"""
+Copy Flux query results into a bucket without materializing `FluxRecord`s.
+
+Rows of the annotated CSV response are turned into line protocol directly from their string values.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import ciso8601
+from typing_extensions import Final
+
+from aioinfluxdb import constants
+from aioinfluxdb.aiohttp_client import AioHTTPClient, _WithAsyncReadAdapter
+from aioinfluxdb.csv_parser import FluxCsvParser
+from aioinfluxdb.flux_table import FluxColumn, FluxTable
+from aioinfluxdb.serializer import DefaultRecordSerializer
+from aioinfluxdb.write_target import WriteTarget
+
+# the escaping rules of the record serializer, whose default flavor does not validate names
+_escape_measurement: Final = DefaultRecordSerializer._serialize_measurement
+_escape_key: Final = DefaultRecordSerializer._serialize_member
+_quote_backslash: Final = DefaultRecordSerializer._quote_backslash
+
+_NON_TAG_COLUMNS: Final = frozenset(('result', 'table', '_start', '_stop', '_time', '_measurement', '_field', '_value'))
+_NON_FINITE: Final = frozenset(('NaN', '+Inf', '-Inf', 'Inf'))
+
+
+def rfc3339_to_ns(value: str) -> int:
+    """Nanoseconds since epoch of a RFC3339(Nano) timestamp, without the microsecond rounding of `datetime`"""
+    if len(value) > 19 and value[19] == '.':
+        end = 20
+        while end < len(value) and value[end].isdigit():
+            end += 1
+        fraction = int(value[20:end].ljust(9, '0')[:9])
+        value = value[:19] + value[end:]
+    else:
+        fraction = 0
+    return int(ciso8601.parse_datetime(value).timestamp()) * 1_000_000_000 + fraction
+
+
+def _format_string(value: str) -> Optional[str]:
+    return '"' + _quote_backslash.sub(r'\\\g<0>', value) + '"'
+
+
+def _format_double(value: str) -> Optional[str]:
+    # line protocol can not represent them
+    return value if value not in _NON_FINITE else None
+
+
+_FIELD_FORMATTERS: Final[Mapping[str, Callable[[str], Optional[str]]]] = {
+    'string': _format_string,
+    'long': lambda value: value + 'i',
+    'unsignedLong': lambda value: value + 'u',
+    'double': _format_double,
+    'boolean': lambda value: value,
+    'duration': lambda value: value + 'i',
+    'base64Binary': _format_string,
+    'dateTime:RFC3339': _format_string,
+    'dateTime:RFC3339Nano': _format_string,
+}
+
+
+class _Column(NamedTuple):
+    label: str
+    data_type: str
+    position: int
+    """ index of the value in a CSV row """
+    flux_column: FluxColumn
+
+
+class FluxTableSerializer:
+    """
+    Line protocol writer for the rows of one Flux table.
+
+    Group key columns become tags (except the Flux internal ones), `_measurement` the measurement,
+    `_field`/`_value` the field and `_time` the timestamp in nanoseconds.
+    Tables without `_field` (e.g. after `pivot()`) use every non-group column as a field.
+    """
+
+    _measurement_index: Optional[int]
+    _measurement: Optional[str]
+    _time_index: Optional[int]
+    _tags: List[Tuple[int, str]]
+    _field_index: Optional[int]
+    _fields: List[Tuple[int, str, Callable[[str], Optional[str]], str]]
+
+    def __init__(self, table: FluxTable, measurement: Optional[str] = None) -> None:
+        columns: Dict[str, _Column] = {}
+        for column in table.columns:
+            if column.label is None or column.data_type is None or column.index is None:
+                raise ValueError('Columns of the table must have a header and a `#datatype` annotation')
+            # the first CSV column is the annotation column
+            columns[column.label] = _Column(column.label, column.data_type, column.index + 1, column)
+
+        self._measurement = _escape_measurement(measurement) if measurement is not None else None
+        self._measurement_index = columns['_measurement'].position if '_measurement' in columns else None
+        if self._measurement is None and self._measurement_index is None:
+            raise ValueError('`measurement` is required for tables without `_measurement` column')
+        self._time_index = columns['_time'].position if '_time' in columns else None
+
+        self._tags = sorted(
+            (
+                (column.position, _escape_key(column.label))
+                for column in columns.values()
+                if column.flux_column.group and column.label not in _NON_TAG_COLUMNS
+            ),
+            key=lambda tag: tag[1],
+        )
+
+        if '_field' in columns:
+            value = columns['_value']
+            self._field_index = columns['_field'].position
+            self._fields = [
+                (value.position, '', _FIELD_FORMATTERS[value.data_type], value.flux_column.default_value),
+            ]
+        else:
+            self._field_index = None
+            self._fields = [
+                (
+                    column.position,
+                    _escape_key(column.label),
+                    _FIELD_FORMATTERS[column.data_type],
+                    column.flux_column.default_value,
+                )
+                for column in columns.values()
+                if not column.flux_column.group and column.label not in _NON_TAG_COLUMNS
+            ]
+
+    def serialize(self, row: Sequence[str]) -> Optional[str]:
+        """Line of `row`, or `None` if it has no field value that line protocol can represent"""
+        fields = []
+        for index, key, formatter, default in self._fields:
+            value = row[index] or default
+            if not value:
+                continue
+            formatted = formatter(value)
+            if formatted is None:
+                continue
+            if self._field_index is not None:
+                key = _escape_key(row[self._field_index])
+            fields.append(f'{key}={formatted}')
+        if len(fields) == 0:
+            return None
+
+        if self._measurement is not None:
+            line = self._measurement
+        else:
+            line = _escape_measurement(row[self._measurement_index])  # type: ignore[index]
+        for index, key in self._tags:
+            value = row[index]
+            if value:
+                line += f',{key}={_escape_key(value)}'
+        line += ' ' + ','.join(fields)
+        if self._time_index is not None and row[self._time_index]:
+            line += f' {rfc3339_to_ns(row[self._time_index])}'
+        return line
+
+
+async def copy_flux_query(
+    source: AioHTTPClient,
+    target: WriteTarget,
+    *,
+    flux_body: str,
+    now: Optional[datetime] = None,
+    params: Optional[Mapping[str, Any]] = None,
+    measurement: Optional[str] = None,
+    batch_size: int = 5_000,
+    max_pending_batches: int = 2,
+    concurrency: int = 1,
+    **kwargs: str,
+) -> int:
+    """
+    Run a Flux query on `source` and write its rows into `target` while the response is still being read.
+
+    At most `max_pending_batches` batches of `batch_size` lines wait for `concurrency` writers,
+    which bounds memory use regardless of the size of the result.
+    `target` must use nanosecond precision.
+
+    :param measurement: measurement of the written points instead of the `_measurement` column
+    :param kwargs: `organization` or `organization_id` of the query
+    :return: number of written lines
+    """
+    if target.params.get('precision') != constants.WritePrecision.NanoSecond.value:
+        raise ValueError('`target` must use nanosecond precision')
+
+    res = await source._post_flux_query(flux_body=flux_body, now=now, params=params, org_map=kwargs)
+    parser = FluxCsvParser(
+        body_reader=_WithAsyncReadAdapter(res),
+        serialization_mode=constants.FluxSerializationMode.stream,
+    )
+    batches: asyncio.Queue[Optional[bytes]] = asyncio.Queue(maxsize=max_pending_batches)
+
+    async def read() -> int:
+        count = 0
+        lines: List[str] = []
+        table: Optional[FluxTable] = None
+        table_serializer: Optional[FluxTableSerializer] = None
+
+        async for row_table, row in parser.row_generator():
+            if row_table is not table:
+                table = row_table
+                table_serializer = FluxTableSerializer(table, measurement)
+            line = table_serializer.serialize(row)  # type: ignore[union-attr]
+            if line is None:
+                continue
+            lines.append(line)
+            if len(lines) >= batch_size:
+                await batches.put('\n'.join(lines).encode())
+                count += len(lines)
+                lines = []
+
+        if len(lines) != 0:
+            await batches.put('\n'.join(lines).encode())
+            count += len(lines)
+        for _ in range(concurrency):
+            await batches.put(None)
+        return count
+
+    async def write() -> None:
+        while True:
+            batch = await batches.get()
+            if batch is None:
+                return
+            await target.write_lines(batch)
+
+    reader = asyncio.ensure_future(read())
+    writers = [asyncio.ensure_future(write()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(reader, *writers)
+    except BaseException:
+        for task in (reader, *writers):
+            task.cancel()
+        res.close()
+        raise
+    return reader.result()
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import orjson
+
+from aioinfluxdb import types
+from aioinfluxdb.flux_table import FluxRecord
+from aioinfluxdb.singleflight import SingleFlight
+
+_K = TypeVar('_K', bound=Hashable)
+_V = TypeVar('_V')
+
+
+class TTLCache(Generic[_K, _V]):
+    """
+    LRU cache whose entries expire `ttl` seconds after they were stored.
+
+    `None` values are negative entries ("does not exist") and expire after `negative_ttl` instead.
+    """
+
+    _ttl: float
+    _negative_ttl: float
+    _max_entries: int
+    _entries: OrderedDict[_K, Tuple[float, Optional[_V]]]
+
+    def __init__(self, *, ttl: float, max_entries: int, negative_ttl: Optional[float] = None) -> None:
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl if negative_ttl is not None else ttl
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: _K) -> Tuple[bool, Optional[_V]]:
+        """:return: whether `key` is cached, and the cached value"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: _K, value: Optional[_V]) -> None:
+        ttl = self._ttl if value is not None else self._negative_ttl
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: _K) -> None:
+        self._entries.pop(key, None)
+
+    def discard_if(self, predicate: Callable[[_K, Optional[_V]], bool]) -> None:
+        for key in [k for k, (_, v) in self._entries.items() if predicate(k, v)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class MetadataCache:
+    """
+    Cache of buckets and organizations used by `AioHTTPClient` to avoid repeated metadata round trips.
+
+    Names that do not exist are cached for `negative_ttl` seconds.
+    Creating or deleting a bucket or an organization through the client invalidates the affected entries.
+
+    :param resolve_write_organizations: replace `organization=<name>` of writes with the cached `orgID`
+    """
+
+    buckets: TTLCache[str, types.Bucket]
+    """ by bucket id """
+    bucket_names: TTLCache[Tuple[Optional[str], Optional[str], str], types.Bucket]
+    """ by (organization name, organization id, bucket name) """
+    organizations: TTLCache[str, types.Organization]
+    """ by organization id """
+    organization_names: TTLCache[str, types.Organization]
+    """ by organization name """
+    resolve_write_organizations: bool
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 60,
+        max_entries: int = 1024,
+        negative_ttl: float = 5,
+        resolve_write_organizations: bool = False,
+    ) -> None:
+        self.buckets = TTLCache(ttl=ttl, max_entries=max_entries, negative_ttl=negative_ttl)
+        self.bucket_names = TTLCache(ttl=ttl, max_entries=max_entries, negative_ttl=negative_ttl)
+        self.organizations = TTLCache(ttl=ttl, max_entries=max_entries, negative_ttl=negative_ttl)
+        self.organization_names = TTLCache(ttl=ttl, max_entries=max_entries, negative_ttl=negative_ttl)
+        self.resolve_write_organizations = resolve_write_organizations
+
+    def add_bucket(self, bucket: types.Bucket) -> None:
+        if bucket.id is not None:
+            self.buckets.set(bucket.id, bucket)
+        # an organization name is not known from a bucket, so only entries looked up by id are refreshed
+        self.bucket_names.set((None, bucket.organization_id, bucket.name), bucket)
+        self.bucket_names.discard_if(lambda key, value: value is None and key[2] == bucket.name)
+
+    def remove_bucket(self, bucket_id: str) -> None:
+        self.buckets.pop(bucket_id)
+        self.bucket_names.discard_if(lambda _, value: value is not None and value.id == bucket_id)
+
+    def add_organization(self, organization: types.Organization) -> None:
+        if organization.id is not None:
+            self.organizations.set(organization.id, organization)
+        self.organization_names.set(organization.name, organization)
+
+    def remove_organization(self, organization_id: str) -> None:
+        self.organizations.pop(organization_id)
+        self.organization_names.discard_if(lambda _, value: value is not None and value.id == organization_id)
+        # buckets are deleted along with their organization
+        self.buckets.discard_if(lambda _, value: value is not None and value.organization_id == organization_id)
+        self.bucket_names.discard_if(
+            lambda key, value: key[1] == organization_id
+            or (value is not None and value.organization_id == organization_id)
+        )
+
+    def clear(self) -> None:
+        self.buckets.clear()
+        self.bucket_names.clear()
+        self.organizations.clear()
+        self.organization_names.clear()
+
+
+class CachedFluxResult:
+    """Records of a Flux query, stored as value tuples that share the column labels of their table."""
+
+    _labels: List[Tuple[str, ...]]
+    _rows: List[Tuple[int, int, Tuple[Any, ...]]]
+    """ table index, index into `_labels`, values """
+    size: int
+    """ bytes of the response the result was parsed from """
+
+    def __init__(self) -> None:
+        self._labels = []
+        self._rows = []
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def append(self, record: FluxRecord) -> None:
+        labels = tuple(record.values)
+        if len(self._labels) == 0 or self._labels[-1] != labels:
+            self._labels.append(labels)
+        self._rows.append((record.table, len(self._labels) - 1, tuple(record.values.values())))
+
+    async def records(self) -> AsyncIterator[FluxRecord]:
+        """New `FluxRecord`s on every call, so that callers can not modify the cached result"""
+        for table, labels, values in self._rows:
+            yield FluxRecord(table, dict(zip(self._labels[labels], values)))
+
+
+class QueryCache:
+    """
+    LRU cache of Flux query results with request coalescing.
+
+    Results are keyed by organization, query, params and `now` rounded down to `time_bucket` seconds
+    (the current time if `now` is not given), so a result is reused by identical queries issued within
+    the same time bucket. Concurrent identical queries share one in-flight request.
+    Results larger than `max_bytes` are not cached.
+    """
+
+    _time_bucket: float
+    _max_entries: int
+    _max_bytes: int
+    _entries: OrderedDict[Hashable, CachedFluxResult]
+    _bytes: int
+    _in_flight: SingleFlight
+
+    def __init__(self, *, time_bucket: float = 10, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024) -> None:
+        if time_bucket <= 0:
+            raise ValueError('`time_bucket` must be positive')
+        self._time_bucket = time_bucket
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._in_flight = SingleFlight()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def key(
+        self,
+        *,
+        flux_body: str,
+        now: Optional[datetime],
+        params: Optional[Mapping[str, Any]],
+        org_map: Mapping[str, str],
+    ) -> Hashable:
+        timestamp = now.timestamp() if now is not None else time.time()
+        return (
+            tuple(sorted(org_map.items())),
+            flux_body,
+            orjson.dumps(params, option=orjson.OPT_SORT_KEYS) if params is not None else None,
+            int(timestamp // self._time_bucket),
+        )
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[CachedFluxResult]],
+    ) -> CachedFluxResult:
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            return result
+
+        return await self._in_flight.do(key, lambda: self._fetch(key, fetch))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[CachedFluxResult]]) -> CachedFluxResult:
+        result = await fetch()
+        self._store(key, result)
+        return result
+
+    def _store(self, key: Hashable, result: CachedFluxResult) -> None:
+        if result.size > self._max_bytes:
+            return
+        self._entries[key] = result
+        self._bytes += result.size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
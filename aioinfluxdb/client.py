@@ -3,13 +3,29 @@ from __future__ import annotations
 import asyncio
 from abc import ABCMeta, abstractmethod
 from datetime import datetime
-from typing import Any, AsyncIterable, Dict, Iterable, Mapping, Optional, Union, overload
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    overload,
+)
 
 from typing_extensions import final
 
 from aioinfluxdb import constants, types
 from aioinfluxdb.flux_table import FluxRecord
 
+_T = TypeVar('_T')
+
 
 class Client(metaclass=ABCMeta):
     _token: str
@@ -57,6 +73,70 @@ class Client(metaclass=ABCMeta):
     ) -> Iterable[types.Bucket]:
         pass
 
+    async def iter_organizations(
+        self,
+        *,
+        descending: bool = False,
+        page_size: int = 100,
+        prefetch: bool = True,
+        organization_name: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> AsyncIterator[types.Organization]:
+        """
+        Iterate over all organizations, requesting `page_size` of them at a time.
+
+        :param prefetch: request the next page while the current one is consumed
+        """
+        offset = 0
+
+        async def fetch(previous: Optional[Tuple[types.Organization, ...]]) -> Tuple[types.Organization, ...]:
+            nonlocal offset
+            if previous is not None:
+                offset += len(previous)
+            return tuple(
+                await self.list_organizations(
+                    descending=descending,
+                    limit=page_size,
+                    offset=offset,
+                    organization_name=organization_name,
+                    organization_id=organization_id,
+                    user_id=user_id,
+                )
+            )
+
+        async for org in self._paginate(fetch, page_size=page_size, prefetch=prefetch):
+            yield org
+
+    async def iter_buckets(
+        self,
+        *,
+        page_size: int = 100,
+        prefetch: bool = True,
+        name: Optional[str] = None,
+        organization: Optional[str] = None,
+        organization_id: Optional[str] = None,
+    ) -> AsyncIterator[types.Bucket]:
+        """
+        Iterate over all buckets, requesting `page_size` of them at a time and seeking with `after`.
+
+        :param prefetch: request the next page while the current one is consumed
+        """
+
+        async def fetch(previous: Optional[Tuple[types.Bucket, ...]]) -> Tuple[types.Bucket, ...]:
+            return tuple(
+                await self.list_buckets(
+                    after=previous[-1].id if previous is not None else None,
+                    limit=page_size,
+                    name=name,
+                    organization=organization,
+                    organization_id=organization_id,
+                )
+            )
+
+        async for bucket in self._paginate(fetch, page_size=page_size, prefetch=prefetch):
+            yield bucket
+
     @abstractmethod
     async def create_organization(
         self,
@@ -102,7 +182,7 @@ class Client(metaclass=ABCMeta):
         bucket: str,
         organization: str,
         precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
-        record: Union[str, types.Record, types.MinimalRecordTuple, types.RecordTuple],
+        record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple],
     ) -> None:
         pass  # pragma: no cover
 
@@ -113,7 +193,7 @@ class Client(metaclass=ABCMeta):
         bucket: str,
         organization_id: str,
         precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
-        record: Union[str, types.Record, types.MinimalRecordTuple, types.RecordTuple],
+        record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple],
     ) -> None:
         pass  # pragma: no cover
 
@@ -123,7 +203,7 @@ class Client(metaclass=ABCMeta):
         *,
         bucket: str,
         precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
-        record: Union[str, types.Record, types.MinimalRecordTuple, types.RecordTuple],
+        record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple],
         **kwargs: str,
     ) -> None:
         raise NotImplementedError
@@ -138,6 +218,7 @@ class Client(metaclass=ABCMeta):
         records: Union[
             Iterable[str],
             Iterable[types.Record],
+            Iterable[types.Point],
             Iterable[types.MinimalRecordTuple],
             Iterable[types.RecordTuple],
         ],
@@ -154,6 +235,7 @@ class Client(metaclass=ABCMeta):
         records: Union[
             Iterable[str],
             Iterable[types.Record],
+            Iterable[types.Point],
             Iterable[types.MinimalRecordTuple],
             Iterable[types.RecordTuple],
         ],
@@ -169,6 +251,7 @@ class Client(metaclass=ABCMeta):
         records: Union[
             Iterable[str],
             Iterable[types.Record],
+            Iterable[types.Point],
             Iterable[types.MinimalRecordTuple],
             Iterable[types.RecordTuple],
         ],
@@ -222,6 +305,35 @@ class Client(metaclass=ABCMeta):
     def api_token(self) -> str:
         return self._token
 
+    @staticmethod
+    async def _paginate(
+        fetch: Callable[[Optional[Tuple[_T, ...]]], Awaitable[Tuple[_T, ...]]],
+        *,
+        page_size: int,
+        prefetch: bool,
+    ) -> AsyncIterator[_T]:
+        """Yield from pages returned by `fetch(previous_page)` until a page is not full"""
+        page = await fetch(None)
+        next_page: Optional[asyncio.Future[Tuple[_T, ...]]] = None
+        try:
+            while True:
+                has_next = len(page) == page_size
+                if has_next and prefetch:
+                    next_page = asyncio.ensure_future(fetch(page))
+
+                for item in page:
+                    yield item
+
+                if not has_next:
+                    return
+                if next_page is not None:
+                    page, next_page = await next_page, None
+                else:
+                    page = await fetch(page)
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
     @classmethod
     def _build_org_query_param(cls, org_map: Mapping[str, str]) -> Dict[str, str]:
         if 'organization_id' in org_map:
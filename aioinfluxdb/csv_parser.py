@@ -5,10 +5,12 @@ Based on https://github.com/influxdata/influxdb-client-python 1.25.0
 from __future__ import annotations
 
 import base64
+import codecs
+import io
+from csv import reader as csv_reader
 from datetime import datetime
-from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Sequence, Union
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-import aiocsv
 import ciso8601
 from aiocsv.protocols import WithAsyncRead
 
@@ -22,169 +24,230 @@ ANNOTATION_GROUP = "#group"
 ANNOTATION_DATATYPE = "#datatype"
 ANNOTATIONS = [ANNOTATION_DEFAULT, ANNOTATION_GROUP, ANNOTATION_DATATYPE]
 
+_READ_SIZE = 64 * 1024
 
-class FluxCsvParser(object):
-    """Parse to processing response from InfluxDB to FluxStructures or DataFrame."""
+_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "string": lambda str_val: str_val,
+    "boolean": lambda str_val: "true" == str_val,
+    "unsignedLong": int,
+    "long": int,
+    "double": float,
+    "base64Binary": base64.b64decode,
+    "dateTime:RFC3339": ciso8601.parse_datetime,
+    "dateTime:RFC3339Nano": ciso8601.parse_datetime,
+    # todo better type ?
+    "duration": int,
+}
+
+ColumnConverters = List[Tuple[str, int, Callable[[str], Any], Any]]
+""" label, index of the value in a CSV row, converter and converted default value of each column """
+SchemaCache = Dict[Tuple[Tuple[Optional[str], Optional[str], Any], ...], ColumnConverters]
+""" column converters by (label, data type, default value) of the columns of a table """
+
+
+class FluxCsvRowParser:
+    """
+    Sans-I/O core of `FluxCsvParser`.
+
+    Push chunks of an annotated Flux CSV response from any transport with `feed()` and `close()`,
+    or already split rows with `parse_row()`. It keeps track of the tables the rows belong to.
+    """
 
-    _reader: aiocsv.AsyncReader
     tables: List[FluxTable]
-    _serialization_mode: FluxSerializationMode
-    _data_frame_index: Union[List[str], str, None]
-    _data_frame_values: List[Dict[str, Any]]
+    table: Optional[FluxTable]
+    """ table of the last processed row """
+    table_index: int
+    """ number of tables started so far """
+    annotation_blocks: int
+    """ number of annotation blocks, each starting a table with its own columns, started so far """
+    reading_annotations: bool
+    """ the current annotation block has not reached its header row yet """
+    _keep_tables: bool
     _profilers: Optional[List[str]]
     _profiler_callback: Optional[Callable[[FluxRecord], Any]]
+    _schema_cache: SchemaCache
+    _converters: ColumnConverters
+    _table_id: int
+    _groups: List[str]
+    _parsing_state_error: bool
+    _decoder: codecs.IncrementalDecoder
+    _buffer: str
+    """ text of the incomplete last row fed so far """
 
     def __init__(
         self,
-        body_reader: WithAsyncRead,
-        serialization_mode: FluxSerializationMode,
-        data_frame_index: Union[List[str], str, None] = None,
+        *,
+        keep_tables: bool = False,
         query_options: Optional[types.QueryOptions] = None,
+        schema_cache: Optional[SchemaCache] = None,
+        encoding: str = 'utf-8',
     ) -> None:
-        """Initialize defaults."""
-        self._reader = aiocsv.AsyncReader(body_reader)
+        """
+        :param keep_tables: collect the tables and their records in `tables`
+        :param schema_cache: converters of previously parsed tables, shared by parsers of the same query
+        :param encoding: encoding of the chunks given to `feed()` as `bytes`
+        """
         self.tables = []
-        self._serialization_mode = serialization_mode
-        self._data_frame_index = data_frame_index
-        self._data_frame_values = []
+        self.table = None
+        self.table_index = 0
+        self.annotation_blocks = 0
+        self.reading_annotations = False
+        self._keep_tables = keep_tables
         self._profilers = query_options.profilers if query_options is not None else None
         self._profiler_callback = query_options.profiler_callback if query_options is not None else None
-        pass
-
-    def generator(self) -> AsyncGenerator[FluxRecord, None]:
-        """Return Python generator."""
-        return self._parse_flux_response()
-
-    async def _parse_flux_response(self) -> AsyncGenerator[Union[FluxRecord, 'pandas.DataFrame'], None]:
-        table_index = 0
-        table_id = -1
-        start_new_table = False
-        table: Optional[FluxTable] = None
-        groups: List[str] = []
-        parsing_state_error = False
-
-        async for csv in self._reader:
-            # debug
-            # print("parsing: ", csv)
-
-            # Response has HTTP status ok, but response is error.
-            if len(csv) < 1:
-                continue
-
-            if "error" == csv[1] and "reference" == csv[2]:
-                parsing_state_error = True
-                continue
-
-            # Throw  InfluxException with error response
-            if parsing_state_error:
-                error = csv[1]
-                reference_value = csv[2]
-                raise FluxQueryException(error, reference_value)
-
-            token = csv[0]
-            # start    new    table
-            if token in ANNOTATIONS and not start_new_table:
-
-                # Return already parsed DataFrame
-                if (self._serialization_mode is FluxSerializationMode.dataFrame) & hasattr(self, '_data_frame'):
-                    df = self._prepare_data_frame()
-                    if not self._is_profiler_table(table):  # type: ignore[arg-type]
-                        yield df
+        self._schema_cache = schema_cache if schema_cache is not None else {}
+        self._converters = []
+        self._table_id = -1
+        self._groups = []
+        self._parsing_state_error = False
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ''
+
+    def feed(self, chunk: Union[bytes, str]) -> List[FluxRecord]:
+        """Records of the rows completed by `chunk`; a chunk may end anywhere, even within a character"""
+        return [record for record in map(self.parse_row, self._split_rows(chunk, final=False)) if record is not None]
+
+    def close(self) -> List[FluxRecord]:
+        """Records of the rest of the response once it was fed completely"""
+        return [record for record in map(self.parse_row, self._split_rows('', final=True)) if record is not None]
+
+    def feed_rows(self, chunk: Union[bytes, str], *, final: bool = False) -> List[Tuple[FluxTable, List[str]]]:
+        """
+        Unconverted data rows completed by `chunk` with their tables, see `FluxCsvParser.row_generator()`.
+
+        :param final: `chunk` is the end of the response
+        """
+        rows = []
+        for csv in self._split_rows(chunk, final=final):
+            if self.is_table_row(csv):
+                rows.append((self.table, csv))
+        return rows  # type: ignore[return-value]
+
+    def _split_rows(self, chunk: Union[bytes, str], *, final: bool) -> List[List[str]]:
+        text = self._buffer + (self._decoder.decode(chunk, final) if isinstance(chunk, bytes) else chunk)
+        if final:
+            end = len(text)
+        else:
+            # a line break inside a quoted value does not end a row
+            end = text.rfind('\n')
+            while end != -1 and text.count('"', 0, end) % 2 != 0:
+                end = text.rfind('\n', 0, end)
+            end += 1
+        self._buffer = text[end:]
+        if end == 0:
+            return []
+        return list(csv_reader(io.StringIO(text[:end], newline='')))
+
+    def parse_row(self, csv: List[str]) -> Optional[FluxRecord]:
+        """Record of a data row, `None` for annotation and header rows and for records of profilers"""
+        if not self._advance(csv):
+            return None
+
+        flux_record = self._convert_record(self.table_index - 1, self._converters, csv)
+
+        if self._is_profiler_record(flux_record):
+            if self._profiler_callback is not None:
+                self._profiler_callback(flux_record)
+            return None
 
-                start_new_table = True
-                table = FluxTable()
-                self._insert_table(table, table_index)
-                table_index = table_index + 1
-                table_id = -1
-            elif table is None:
-                raise FluxCsvParserException("Unable to parse CSV response. FluxTable definition was not found.")
-
-            #  # datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string,string
-            if ANNOTATION_DATATYPE == token:
-                self.add_data_types(table, csv)
-
-            elif ANNOTATION_GROUP == token:
-                groups = csv
-
-            elif ANNOTATION_DEFAULT == token:
-                self.add_default_empty_values(table, csv)
-
-            else:
-                # parse column names
-                if start_new_table:
-                    self.add_groups(table, groups)
-                    self.add_column_names_and_tags(table, csv)
-                    start_new_table = False
-                    # Create DataFrame with default values
-                    if self._serialization_mode is FluxSerializationMode.dataFrame:
-                        import pandas
-
-                        labels = list(map(lambda it: it.label, table.columns))
-                        self._data_frame = pandas.DataFrame(data=[], columns=labels, index=None)
-                        pass
-                    continue
-
-                # to int converions todo
-                current_id = int(csv[2])
-                if table_id == -1:
-                    table_id = current_id
-
-                if table_id != current_id:
-                    # create    new        table       with previous column headers settings
-                    flux_columns = table.columns
-                    table = FluxTable()
-                    table.columns.extend(flux_columns)
-                    self._insert_table(table, table_index)
-                    table_index = table_index + 1
-                    table_id = current_id
-
-                flux_record = self.parse_record(table_index - 1, table, csv)
-
-                if self._is_profiler_record(flux_record):
-                    self._print_profiler_info(flux_record)
-                    continue
-
-                if self._serialization_mode is FluxSerializationMode.tables:
-                    self.tables[table_index - 1].records.append(flux_record)
-
-                if self._serialization_mode is FluxSerializationMode.stream:
-                    yield flux_record
+        if self._keep_tables:
+            self.tables[self.table_index - 1].records.append(flux_record)
+        return flux_record
 
-                if self._serialization_mode is FluxSerializationMode.dataFrame:
-                    self._data_frame_values.append(flux_record.values)
-                    pass
+    def is_table_row(self, csv: List[str]) -> bool:
+        """Process `csv` without converting it, `True` if it is a data row of `table` that is not from a profiler"""
+        if not self._advance(csv):
+            return False
+        return not (self._profilers and self._is_profiler_table(self.table))  # type: ignore[arg-type]
 
-        # Return latest DataFrame
-        if (self._serialization_mode is FluxSerializationMode.dataFrame) & hasattr(self, '_data_frame'):
-            df = self._prepare_data_frame()
-            if not self._is_profiler_table(table):  # type: ignore[arg-type]
-                yield df
+    def _advance(self, csv: List[str]) -> bool:
+        """Update the state with `csv`, `True` if it is a data row"""
+        # Response has HTTP status ok, but response is error.
+        if len(csv) < 1:
+            return False
 
-    def _prepare_data_frame(self) -> 'pandas.DataFrame':
-        import pandas
+        if "error" == csv[1] and "reference" == csv[2]:
+            self._parsing_state_error = True
+            return False
 
-        # We have to create temporary DataFrame because we want to preserve default column values
-        _temp_df = pandas.DataFrame(self._data_frame_values)
-        self._data_frame_values = []
+        # Throw  InfluxException with error response
+        if self._parsing_state_error:
+            raise FluxQueryException(csv[1], csv[2])
+
+        token = csv[0]
+        # start    new    table
+        if token in ANNOTATIONS and not self.reading_annotations:
+            self.reading_annotations = True
+            self.table = FluxTable()
+            self._insert_table(self.table, self.table_index)
+            self.table_index = self.table_index + 1
+            self.annotation_blocks = self.annotation_blocks + 1
+            self._table_id = -1
+        elif self.table is None:
+            raise FluxCsvParserException("Unable to parse CSV response. FluxTable definition was not found.")
+
+        table = self.table
+
+        #  # datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string,string
+        if ANNOTATION_DATATYPE == token:
+            self.add_data_types(table, csv)
+
+        elif ANNOTATION_GROUP == token:
+            self._groups = csv
+
+        elif ANNOTATION_DEFAULT == token:
+            self.add_default_empty_values(table, csv)
+
+        # parse column names
+        elif self.reading_annotations:
+            self.add_groups(table, self._groups)
+            self.add_column_names_and_tags(table, csv)
+            self._converters = self._column_converters(table)
+            self.reading_annotations = False
 
-        # Custom DataFrame index
-        if self._data_frame_index:
-            self._data_frame = self._data_frame.set_index(self._data_frame_index)
-            _temp_df = _temp_df.set_index(self._data_frame_index)
+        else:
+            # to int converions todo
+            current_id = int(csv[2])
+            if self._table_id == -1:
+                self._table_id = current_id
+
+            if self._table_id != current_id:
+                # create    new        table       with previous column headers settings
+                self.table = FluxTable()
+                self.table.columns.extend(table.columns)
+                self._insert_table(self.table, self.table_index)
+                self.table_index = self.table_index + 1
+                self._table_id = current_id
+            return True
 
-        # Append data
-        return self._data_frame.astype(_temp_df.dtypes).append(_temp_df)
+        return False
 
     def parse_record(self, table_index: int, table: FluxTable, csv: List[str]) -> FluxRecord:
         """Parse one record."""
-        record = FluxRecord(table_index)
-
-        for fluxColumn in table.columns:
-            column_name = fluxColumn.label
-            str_val = csv[fluxColumn.index + 1]  # type: ignore[operator]
-            record.values[column_name] = self._to_value(str_val, fluxColumn)  # type: ignore[index]
+        return self._convert_record(table_index, self._column_converters(table), csv)
 
-        return record
+    @staticmethod
+    def _convert_record(table_index: int, converters: ColumnConverters, csv: List[str]) -> FluxRecord:
+        values: Dict[str, Any] = {}
+        for label, index, convert, default_value in converters:
+            str_val = csv[index]
+            values[label] = convert(str_val) if str_val != '' else default_value
+        return FluxRecord(table_index, values)
+
+    def _column_converters(self, table: FluxTable) -> ColumnConverters:
+        key = tuple((column.label, column.data_type, column.default_value) for column in table.columns)
+        converters = self._schema_cache.get(key)
+        if converters is None:
+            converters = self._schema_cache[key] = [
+                (
+                    column.label,  # type: ignore[misc]
+                    column.index + 1,  # type: ignore[operator]
+                    _CONVERTERS.get(column.data_type, lambda _: None),  # type: ignore[arg-type]
+                    self._to_value('', column),
+                )
+                for column in table.columns
+            ]
+        return converters
 
     def _to_value(self, str_val: str, column: FluxColumn) -> Union[str, bool, int, float, bytes, datetime, None]:
 
@@ -194,27 +257,8 @@ class FluxCsvParser(object):
                 return None
             return self._to_value(default_value, column)
 
-        if "string" == column.data_type:
-            return str_val
-
-        if "boolean" == column.data_type:
-            return "true" == str_val
-
-        if "unsignedLong" == column.data_type or "long" == column.data_type:
-            return int(str_val)
-
-        if "double" == column.data_type:
-            return float(str_val)
-
-        if "base64Binary" == column.data_type:
-            return base64.b64decode(str_val)
-
-        if "dateTime:RFC3339" == column.data_type or "dateTime:RFC3339Nano" == column.data_type:
-            return ciso8601.parse_datetime(str_val)
-
-        if "duration" == column.data_type:
-            # todo better type ?
-            return int(str_val)
+        convert = _CONVERTERS.get(column.data_type)  # type: ignore[arg-type]
+        return convert(str_val) if convert is not None else None
 
     @staticmethod
     def add_data_types(table: FluxTable, data_types: Sequence[str]) -> None:
@@ -248,7 +292,7 @@ class FluxCsvParser(object):
             i += 1
 
     def _insert_table(self, table: FluxTable, table_index: int) -> None:
-        if self._serialization_mode is FluxSerializationMode.tables:
+        if self._keep_tables:
             self.tables.insert(table_index, table)
 
     def _is_profiler_record(self, flux_record: FluxRecord) -> bool:
@@ -275,18 +319,122 @@ class FluxCsvParser(object):
         else:
             return list(filter(lambda table: not self._is_profiler_table(table), self.tables))
 
-    def _print_profiler_info(self, flux_record: FluxRecord) -> None:
-        if flux_record.get_measurement().startswith("profiler/"):
-            if self._profiler_callback:
-                self._profiler_callback(flux_record)
-            else:
-                msg = "Profiler: " + flux_record.get_measurement()
-                print("\n" + len(msg) * "=")
-                print(msg)
-                print(len(msg) * "=")
-                for name in flux_record.values:
-                    val = flux_record[name]
-                    if isinstance(val, str) and len(val) > 50:
-                        print(f"{name:<20}: \n\n{val}")
-                    elif val is not None:
-                        print(f"{name:<20}: {val:<20}")
+
+class FluxCsvParser(FluxCsvRowParser):
+    """Parse to processing response from InfluxDB to FluxStructures or DataFrame."""
+
+    _body_reader: WithAsyncRead
+    _serialization_mode: FluxSerializationMode
+    _data_frame_index: Union[List[str], str, None]
+    _data_frame_values: List[Dict[str, Any]]
+
+    def __init__(
+        self,
+        body_reader: WithAsyncRead,
+        serialization_mode: FluxSerializationMode,
+        data_frame_index: Union[List[str], str, None] = None,
+        query_options: Optional[types.QueryOptions] = None,
+        schema_cache: Optional[SchemaCache] = None,
+    ) -> None:
+        """
+        Initialize defaults.
+
+        :param schema_cache: converters of previously parsed tables, shared by parsers of the same query
+        """
+        super().__init__(
+            keep_tables=serialization_mode is FluxSerializationMode.tables,
+            query_options=query_options,
+            schema_cache=schema_cache,
+        )
+        self._body_reader = body_reader
+        self._serialization_mode = serialization_mode
+        self._data_frame_index = data_frame_index
+        self._data_frame_values = []
+
+    def generator(self) -> AsyncGenerator[FluxRecord, None]:
+        """Return Python generator."""
+        return self._parse_flux_response()
+
+    async def row_generator(self) -> AsyncGenerator[Tuple[FluxTable, List[str]], None]:
+        """
+        Return Python generator of raw data rows with the table describing their columns.
+
+        Values are not converted, so this is the cheapest way to process a response row by row.
+        A new `FluxTable` is yielded for each table of the response.
+        """
+        while True:
+            chunk = await self._body_reader.read(_READ_SIZE)
+            for row in self.feed_rows(chunk, final=not chunk):
+                yield row
+            if not chunk:
+                return
+
+    async def _parse_flux_response(self) -> AsyncGenerator[Union[FluxRecord, 'pandas.DataFrame'], None]:
+        if self._serialization_mode is FluxSerializationMode.dataFrame:
+            async for data_frame in self._parse_data_frames():
+                yield data_frame
+            return
+
+        while True:
+            chunk = await self._body_reader.read(_READ_SIZE)
+            flux_records = self.feed(chunk) if chunk else self.close()
+            if self._serialization_mode is FluxSerializationMode.stream:
+                for flux_record in flux_records:
+                    yield flux_record
+            if not chunk:
+                return
+
+    async def _read_rows(self) -> AsyncGenerator[List[str], None]:
+        while True:
+            chunk = await self._body_reader.read(_READ_SIZE)
+            for csv in self._split_rows(chunk, final=not chunk):
+                yield csv
+            if not chunk:
+                return
+
+    async def _parse_data_frames(self) -> AsyncGenerator['pandas.DataFrame', None]:
+        # a DataFrame per annotation block, yielded once the header row of the next block is parsed
+        table: Optional[FluxTable] = None
+        annotation_block = 0
+
+        async for csv in self._read_rows():
+            flux_record = self.parse_row(csv)
+
+            if annotation_block != self.annotation_blocks and not self.reading_annotations:
+                # Return already parsed DataFrame
+                if table is not None:
+                    df = self._prepare_data_frame()
+                    if not self._is_profiler_table(table):
+                        yield df
+
+                # Create DataFrame with default values
+                import pandas
+
+                table = self.table
+                annotation_block = self.annotation_blocks
+                labels = list(map(lambda it: it.label, table.columns))  # type: ignore[union-attr]
+                self._data_frame = pandas.DataFrame(data=[], columns=labels, index=None)
+
+            if flux_record is not None:
+                self._data_frame_values.append(flux_record.values)
+
+        # Return latest DataFrame
+        if table is not None:
+            df = self._prepare_data_frame()
+            if not self._is_profiler_table(table):
+                yield df
+
+    def _prepare_data_frame(self) -> 'pandas.DataFrame':
+        import pandas
+
+        # We have to create temporary DataFrame because we want to preserve default column values
+        _temp_df = pandas.DataFrame(self._data_frame_values)
+        self._data_frame_values = []
+
+        # Custom DataFrame index
+        if self._data_frame_index:
+            self._data_frame = self._data_frame.set_index(self._data_frame_index)
+            _temp_df = _temp_df.set_index(self._data_frame_index)
+
+        # Append data
+        return self._data_frame.astype(_temp_df.dtypes).append(_temp_df)
@@ -4,7 +4,7 @@ Based on https://github.com/influxdata/influxdb-client-python 1.25.0
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, List, Optional, Tuple
 
 
 class FluxQueryException(Exception):
@@ -23,3 +23,45 @@ class FluxCsvParserException(Exception):
     """The exception for not parsable data."""
 
     pass
+
+
+class InvalidRecordError(ValueError):
+    """A record can not be written as line protocol."""
+
+    pass
+
+
+class WriteError(Exception):
+    """
+    A write was rejected by InfluxDB.
+
+    The errors raised by `AioHTTPClient` are also `aiohttp.ClientResponseError`s.
+    """
+
+    status: int
+    message: str
+    """ message of the error response, or the reason phrase if it has none """
+    error_code: Optional[str]
+    """ `code` of the error response, e.g. `invalid` """
+    line: Optional[int]
+    """ first malformed line of the request body, counted from 1, if the server reported it """
+
+
+class PartialWriteError(Exception):
+    """Some lines of a batch were rejected by InfluxDB, while the others were written."""
+
+    rejected: List[Tuple[bytes, WriteError]]
+    """ rejected lines with the error of the request that contained only them or that pointed them out """
+    written: int
+    """ number of written lines """
+    spooled: int
+    """ number of lines that could not be delivered and were kept in the spool of the client to be written later """
+
+    def __init__(self, rejected: List[Tuple[bytes, WriteError]], written: int, spooled: int = 0) -> None:
+        message = f'{len(rejected)} lines were rejected, {written} lines were written'
+        if spooled != 0:
+            message += f', {spooled} lines were spooled'
+        super().__init__(message)
+        self.rejected = rejected
+        self.written = written
+        self.spooled = spooled
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+from isal import igzip as gzip
+from typing_extensions import Final
+
+from aioinfluxdb import constants, serializer, types
+from aioinfluxdb.aiohttp_client import AioHTTPClient
+
+_series_key: Final[Pattern[str]] = re.compile(r'(?:[^ \\]|\\.)*')
+
+
+@dataclass(frozen=True)
+class FanOutTarget:
+    client: AioHTTPClient
+    bucket: str
+    organization: Optional[str] = None
+    organization_id: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if (self.organization is None) == (self.organization_id is None):
+            raise ValueError('Exactly one of `organization` or `organization_id` must be given')
+
+    @property
+    def org_map(self) -> Dict[str, str]:
+        if self.organization_id is not None:
+            return dict(organization_id=self.organization_id)
+        return dict(organization=self.organization)  # type: ignore[dict-item]
+
+
+@dataclass(frozen=True)
+class FanOutResult:
+    target: FanOutTarget
+    error: Optional[BaseException] = None
+    spooled: bool = False
+    """ the write failed and was kept in the spool of the client of the target to be written later """
+
+    @property
+    def ok(self) -> bool:
+        """The write was accepted by the target, or spooled by its client"""
+        return self.error is None
+
+    @property
+    def delivered(self) -> bool:
+        """The write was accepted by the target"""
+        return self.error is None and not self.spooled
+
+
+class FanOutWriter:
+    """
+    Write the same batch to several buckets or servers while serializing and compressing it only once.
+
+    In the default replicated mode every target receives the whole batch.
+    With `sharded=True` each record is routed to exactly one target by the CRC32 of its series key
+    (measurement and tag set), so that a series always lands on the same target.
+    """
+
+    _targets: Tuple[FanOutTarget, ...]
+    _precision: constants.WritePrecision
+    _sharded: bool
+    _record_serializer: serializer.RecordSerializer
+
+    def __init__(
+        self,
+        targets: Iterable[FanOutTarget],
+        *,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        sharded: bool = False,
+        record_serializer: Optional[serializer.RecordSerializer] = None,
+    ) -> None:
+        """
+        :param record_serializer: serializer of the records, by default the one of the clients of the targets,
+            which must then all use the same kind of serializer
+        """
+        self._targets = tuple(targets)
+        if len(self._targets) == 0:
+            raise ValueError('At least one target is required')
+        self._precision = precision
+        self._sharded = sharded
+        if record_serializer is None:
+            if len({type(target.client._record_serializer) for target in self._targets}) != 1:
+                raise ValueError('`record_serializer` is required for targets with different record serializers')
+            record_serializer = self._targets[0].client._record_serializer
+        self._record_serializer = record_serializer
+
+    @property
+    def targets(self) -> Tuple[FanOutTarget, ...]:
+        return self._targets
+
+    async def write_multiple(
+        self,
+        *,
+        records: Union[
+            Iterable[str],
+            Iterable[types.Record],
+            Iterable[types.Point],
+            Iterable[types.MinimalRecordTuple],
+            Iterable[types.RecordTuple],
+        ],
+    ) -> Tuple[FanOutResult, ...]:
+        """
+        Send `records` to the targets concurrently.
+
+        Errors are not raised, but reported per target in the returned results (same order as `targets`).
+        """
+        lines = map(self._record_serializer.serialize_record, records)  # type: ignore[arg-type]
+
+        if not self._sharded:
+            body = '\n'.join(lines).encode()
+            # like empty shards, an empty batch is not sent
+            bodies: List[Optional[bytes]] = [body if len(body) != 0 else None] * len(self._targets)
+        else:
+            shards: List[List[str]] = [[] for _ in self._targets]
+            for line in lines:
+                shards[self.shard_of(line)].append(line)
+            bodies = ['\n'.join(shard).encode() if len(shard) != 0 else None for shard in shards]
+
+        return await self._send(bodies)
+
+    def shard_of(self, line: str) -> int:
+        """Index of the target that owns the series of serialized `line`."""
+        series_key = _series_key.match(line).group()  # type: ignore[union-attr]
+        return zlib.crc32(series_key.encode()) % len(self._targets)
+
+    async def _send(self, bodies: List[Optional[bytes]]) -> Tuple[FanOutResult, ...]:
+        # identical bodies (replicated mode) share one compressed buffer
+        compressed: Dict[int, bytes] = {}
+        for target, body in zip(self._targets, bodies):
+            if body is not None and target.client._gzip and id(body) not in compressed:
+                compressed[id(body)] = gzip.compress(body)  # type: ignore[no-untyped-call]
+
+        async def send(target: FanOutTarget, body: Optional[bytes]) -> bool:
+            if body is None:
+                return True
+            gzipped = target.client._gzip
+            return await target.client._write_data(
+                target=target.client.target(bucket=target.bucket, precision=self._precision, **target.org_map),
+                data=compressed[id(body)] if gzipped else body,
+                gzipped=gzipped,
+                points=body.count(b'\n') + 1,
+            )
+
+        outcomes = await asyncio.gather(
+            *(send(target, body) for target, body in zip(self._targets, bodies)),
+            return_exceptions=True,
+        )
+        return tuple(
+            (
+                FanOutResult(target=target, error=outcome)
+                if isinstance(outcome, BaseException)
+                else FanOutResult(target=target, spooled=not outcome)
+            )
+            for target, outcome in zip(self._targets, outcomes)
+        )
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Optional
+
+
+class Instrumentation:
+    """
+    Hooks called by `AioHTTPClient` on its hot paths.
+
+    Every hook is a no-op, so implementations (e.g. bridges to OpenTelemetry or Prometheus)
+    only override what they need. Durations are in seconds, sizes in bytes.
+    """
+
+    def on_serialize(self, *, points: int, size: int, duration: float) -> None:
+        """Records were serialized into `size` bytes of line protocol"""
+
+    def on_compress(self, *, size: int, compressed_size: int, duration: float) -> None:
+        """A request body was gzip compressed"""
+
+    def on_request(self, *, method: str, path: str, status: Optional[int], duration: float) -> None:
+        """An HTTP round trip finished; `status` is `None` if no response was received"""
+
+    def on_retry(self, *, path: str) -> None:
+        """A request that failed before is sent again"""
+
+    def on_parse(self, *, rows: int, size: int, duration: float) -> None:
+        """A Flux query response was parsed completely; `duration` includes waiting for the body"""
+
+    def on_spool_error(self, *, error: Exception) -> None:
+        """Replaying the write spool failed with `error`; it is tried again after `spool_replay_interval`"""
+
+
+class ClientStats(Instrumentation):
+    """Cumulative counters, cheap enough to be always on."""
+
+    points_serialized: int
+    serialized_bytes: int
+    serialize_seconds: float
+    compressed_input_bytes: int
+    compressed_output_bytes: int
+    compress_seconds: float
+    requests: int
+    failed_requests: int
+    request_seconds: float
+    retries: int
+    rows_parsed: int
+    parsed_bytes: int
+    parse_seconds: float
+    spool_errors: int
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.points_serialized = 0
+        self.serialized_bytes = 0
+        self.serialize_seconds = 0.0
+        self.compressed_input_bytes = 0
+        self.compressed_output_bytes = 0
+        self.compress_seconds = 0.0
+        self.requests = 0
+        self.failed_requests = 0
+        self.request_seconds = 0.0
+        self.retries = 0
+        self.rows_parsed = 0
+        self.parsed_bytes = 0
+        self.parse_seconds = 0.0
+        self.spool_errors = 0
+
+    def on_serialize(self, *, points: int, size: int, duration: float) -> None:
+        self.points_serialized += points
+        self.serialized_bytes += size
+        self.serialize_seconds += duration
+
+    def on_compress(self, *, size: int, compressed_size: int, duration: float) -> None:
+        self.compressed_input_bytes += size
+        self.compressed_output_bytes += compressed_size
+        self.compress_seconds += duration
+
+    def on_request(self, *, method: str, path: str, status: Optional[int], duration: float) -> None:
+        self.requests += 1
+        if status is None or status >= 400:
+            self.failed_requests += 1
+        self.request_seconds += duration
+
+    def on_retry(self, *, path: str) -> None:
+        self.retries += 1
+
+    def on_parse(self, *, rows: int, size: int, duration: float) -> None:
+        self.rows_parsed += rows
+        self.parsed_bytes += size
+        self.parse_seconds += duration
+
+    def on_spool_error(self, *, error: Exception) -> None:
+        self.spool_errors += 1
+
+    @property
+    def compression_ratio(self) -> Optional[float]:
+        if self.compressed_input_bytes == 0:
+            return None
+        return self.compressed_output_bytes / self.compressed_input_bytes
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        if self.parse_seconds == 0:
+            return None
+        return self.rows_parsed / self.parse_seconds
+
+    def __repr__(self) -> str:
+        body = ', '.join(f'{key}={value}' for key, value in vars(self).items())
+        return f'<{self.__class__.__name__} {body}>'
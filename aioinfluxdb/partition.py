@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from string import Template
+from typing import AbstractSet, Any, AsyncIterator, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from aioinfluxdb.client import Client
+from aioinfluxdb.flux_table import FluxRecord
+
+_End = object()
+_NON_KEY_COLUMNS: AbstractSet[str] = frozenset(('result', 'table', '_start', '_stop', '_time', '_value'))
+""" columns that are not part of the group key, or whose value differs between windows """
+
+
+def split_time_range(start: datetime, stop: datetime, partitions: int) -> List[Tuple[datetime, datetime]]:
+    """`partitions` adjacent windows of (almost) equal length covering [`start`, `stop`)"""
+    if partitions < 1:
+        raise ValueError('`partitions` must be positive')
+    if start >= stop:
+        raise ValueError('`start` must be before `stop`')
+
+    step = (stop - start) / partitions
+    bounds = [start + step * i for i in range(partitions)] + [stop]
+    return [(lower, upper) for lower, upper in zip(bounds, bounds[1:]) if lower < upper]
+
+
+def _format_time(value: datetime) -> str:
+    if value.tzinfo is None:
+        raise ValueError('Naive datetime is ambiguous, give it a timezone')
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+async def partitioned_flux_query(
+    client: Client,
+    *,
+    flux_template: str,
+    start: datetime,
+    stop: datetime,
+    partitions: int,
+    concurrency: int = 4,
+    ordered: bool = True,
+    buffer_size: int = 10_000,
+    now: Optional[datetime] = None,
+    params: Optional[Mapping[str, Any]] = None,
+    group_columns: Optional[Sequence[str]] = None,
+    **kwargs: str,
+) -> AsyncIterator[FluxRecord]:
+    """
+    Split [`start`, `stop`) into `partitions` windows and run a query per window, `concurrency` at a time.
+
+    `flux_template` refers to the window with `$start` and `$stop`, e.g. `range(start: $start, stop: $stop)`.
+
+    With `ordered` the records of the windows are yielded window after window, so records of each table
+    keep their time order while later windows are already being fetched into buffers of `buffer_size` records.
+    Otherwise records are yielded as soon as any window produces them.
+    Tables are renumbered by their group key, so `FluxRecord.table` refers to the same table in every window,
+    even if it is missing from some of them.
+
+    :param group_columns: columns that identify a table across windows. By default every column except
+        `result`, `table`, `_start`, `_stop`, `_time` and `_value`, which is the group key of tables
+        that were not regrouped; results with other non-group columns (e.g. after `pivot()`) need them listed
+    :param kwargs: `organization` or `organization_id`
+    """
+    if concurrency < 1:
+        raise ValueError('`concurrency` must be positive')
+
+    template = Template(flux_template)
+    windows = split_time_range(start, stop, partitions)
+    semaphore = asyncio.Semaphore(concurrency)
+    tables: Dict[Hashable, int] = {}
+
+    def table_key(record: FluxRecord) -> Hashable:
+        if group_columns is not None:
+            return tuple(record.values.get(column) for column in group_columns)
+        return tuple((column, value) for column, value in record.values.items() if column not in _NON_KEY_COLUMNS)
+
+    async def run(
+        window: Tuple[datetime, datetime], queue: asyncio.Queue[Union[FluxRecord, BaseException, object]]
+    ) -> None:
+        try:
+            async with semaphore:
+                flux_body = template.safe_substitute(start=_format_time(window[0]), stop=_format_time(window[1]))
+                records = await client.flux_query(flux_body=flux_body, now=now, params=params, **kwargs)
+                # records of a table share its group key, so it is looked up once per table of the window
+                renumbered: Dict[int, int] = {}
+                async for record in records:
+                    table = renumbered.get(record.table)
+                    if table is None:
+                        table = renumbered[record.table] = tables.setdefault(table_key(record), len(tables))
+                    record.table = table
+                    await queue.put(record)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_End)
+
+    queues: List[asyncio.Queue[Union[FluxRecord, BaseException, object]]]
+    if ordered:
+        queues = [asyncio.Queue(maxsize=buffer_size) for _ in windows]
+    else:
+        queues = [asyncio.Queue(maxsize=buffer_size)]
+    tasks = [
+        asyncio.ensure_future(run(window, queues[i] if ordered else queues[0])) for i, window in enumerate(windows)
+    ]
+
+    try:
+        for queue, expected_ends in zip(queues, [1] * len(queues) if ordered else [len(windows)]):
+            ends = 0
+            while ends < expected_ends:
+                item = await queue.get()
+                if isinstance(item, FluxRecord):
+                    yield item
+                elif isinstance(item, BaseException):
+                    raise item
+                else:
+                    ends += 1
+    finally:
+        for task in tasks:
+            task.cancel()
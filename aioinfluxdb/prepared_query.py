@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, AsyncIterable, Dict, FrozenSet, Mapping, Optional, Pattern
+from urllib.parse import quote, urlencode
+
+import aiohttp
+import orjson
+from typing_extensions import Final
+from yarl import URL
+
+from aioinfluxdb.csv_parser import SchemaCache
+from aioinfluxdb.flux_table import FluxRecord
+
+if TYPE_CHECKING:
+    from aioinfluxdb.aiohttp_client import AioHTTPClient
+
+_param_reference: Final[Pattern[str]] = re.compile(r'\bparams\.([A-Za-z_][A-Za-z0-9_]*)')
+
+
+class PreparedQuery:
+    """
+    Flux query bound to a client and an organization, for repeated execution with different `params` and `now`.
+
+    The request URL, the headers and the JSON body without `params` and `now` are serialized once,
+    so each execution only serializes `params` and `now`.
+    Column converters built from the first response are reused for later responses with the same schema.
+    Create it with `AioHTTPClient.prepare_query()`.
+    """
+
+    _client: AioHTTPClient
+    _flux_body: str
+    _org_map: Dict[str, str]
+    _param_names: FrozenSet[str]
+    _url: URL
+    _headers: Dict[str, str]
+    _body: bytes
+    _schema_cache: SchemaCache
+
+    def __init__(self, client: AioHTTPClient, *, flux_body: str, org_map: Mapping[str, str]) -> None:
+        self._client = client
+        self._flux_body = flux_body
+        self._org_map = dict(org_map)
+        self._param_names = frozenset(_param_reference.findall(flux_body))
+        self._url = URL.build(
+            path='/api/v2/query',
+            query_string=urlencode(client._build_org_query_param(org_map), quote_via=quote),
+            encoded=True,
+        )
+        self._headers = client._flux_query_headers()
+        self._body = orjson.dumps(client._flux_query_body(flux_body=flux_body, now=None, params=None))
+        self._schema_cache = {}
+
+    @property
+    def flux_body(self) -> str:
+        return self._flux_body
+
+    @property
+    def param_names(self) -> FrozenSet[str]:
+        """Names of the `params` the query refers to"""
+        return self._param_names
+
+    def body(self, *, now: Optional[datetime] = None, params: Optional[Mapping[str, Any]] = None) -> bytes:
+        """Serialized request body"""
+        missing = self._param_names.difference(params if params is not None else ())
+        if len(missing) != 0:
+            raise ValueError(f'Missing params: {", ".join(sorted(missing))}')
+
+        if now is None and params is None:
+            return self._body
+        # splice `now` and `params` in before the closing brace of the prepared body
+        body = self._body[:-1]
+        if now is not None:
+            body += b',"now":' + orjson.dumps(now)
+        if params is not None:
+            body += b',"params":' + orjson.dumps(params)
+        return body + b'}'
+
+    async def execute(
+        self,
+        *,
+        now: Optional[datetime] = None,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> AsyncIterable[FluxRecord]:
+        """See `AioHTTPClient.flux_query()`"""
+        data = self.body(now=now, params=params)
+
+        query_cache = self._client._query_cache
+        if query_cache is not None:
+            key = query_cache.key(flux_body=self._flux_body, now=now, params=params, org_map=self._org_map)
+            result = await query_cache.get_or_fetch(
+                key,
+                lambda: self._client._fetch_flux_result(self._send(data), self._schema_cache),
+            )
+            return result.records()
+
+        return self._client._read_flux_records(await self._send(data), self._schema_cache)
+
+    async def _send(self, data: bytes) -> aiohttp.ClientResponse:
+        return await self._client._send_flux_query(url=self._url, params=None, headers=self._headers, data=data)
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self._flux_body!r}>'
@@ -1,28 +1,73 @@
 from __future__ import annotations
 
+import math
 import re
 from abc import ABCMeta, abstractmethod
 from datetime import datetime
-from typing import Iterable, Optional, Pattern, SupportsFloat, SupportsInt, Union
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Pattern,
+    SupportsFloat,
+    SupportsInt,
+    Tuple,
+    Union,
+)
 
 from typing_extensions import Final
 
 from aioinfluxdb import types
+from aioinfluxdb.exceptions import InvalidRecordError
+
+_INT64_MIN: Final[int] = -(1 << 63)
+_INT64_MAX: Final[int] = (1 << 63) - 1
+_UINT64_MAX: Final[int] = (1 << 64) - 1
 
 
 class RecordSerializer(metaclass=ABCMeta):
     @abstractmethod
-    def serialize_record(self, record: Union[types.Record, types.MinimalRecordTuple, types.RecordTuple]) -> str:
+    def serialize_record(
+        self, record: Union[types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple]
+    ) -> str:
         raise NotImplementedError
 
 
 class DefaultRecordSerializer(RecordSerializer):
+    """
+    Line protocol of records.
+
+    Tag and field sets may be mappings. The escaped keys of a mapping are cached per key set,
+    so serializing many records that share their keys escapes them only once.
+    """
+
+    sort_tags: ClassVar[bool] = False
+    """ write tags ordered by key """
+    validate: ClassVar[bool] = False
+    """ raise `InvalidRecordError` for records the server would reject, instead of failing the whole batch there """
+    _field_value_serializers: ClassVar[Dict[type, Callable[[Any], str]]] = {}
+    """ by type of the value, filled on first use """
     _comma_space: Final[Pattern[str]] = re.compile(r'[, ]')
     _comma_equal_space: Final[Pattern[str]] = re.compile(r'[, =]')
     _quote_backslash: Final[Pattern[str]] = re.compile(r'["\\]')
+    _line_break: Final[Pattern[str]] = re.compile(r'[\r\n]')
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._field_value_serializers = {}
 
     @classmethod
-    def serialize_record(cls, record: Union[types.Record, types.MinimalRecordTuple, types.RecordTuple]) -> str:
+    def serialize_record(
+        cls, record: Union[types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple]
+    ) -> str:
+        if record.__class__ is types.Point:
+            return cls._serialize_point(record)
+
         measurement: str
         tag_set: Optional[str] = None
         field_set: str
@@ -46,15 +91,18 @@ class DefaultRecordSerializer(RecordSerializer):
             and len(record) == 4
             and isinstance(record[0], str)
             and (isinstance(record[1], Iterable) or record[1] is None)
-            and isinstance(record[2], Iterable)  # type: ignore[misc]
-            and (isinstance(record[3], (datetime, int, float)) or record[3] is None)  # type: ignore[misc]
+            and isinstance(record[2], Iterable)
+            and (isinstance(record[3], (datetime, int, float)) or record[3] is None)
         ):
             measurement = cls._serialize_measurement(record[0])
-            tag_set = cls._serialize_tag_set(record[1])  # type: ignore[arg-type]
-            field_set = cls._serialize_field_set(record[2])  # type: ignore[misc]
-            timestamp = cls._serialize_timestamp(record[3])  # type: ignore[misc]
+            tag_set = cls._serialize_tag_set(record[1])
+            field_set = cls._serialize_field_set(record[2])
+            timestamp = cls._serialize_timestamp(record[3])
         else:
-            raise ValueError(f'Unsupported record: {record.__class__}')
+            raise InvalidRecordError(f'Unsupported record: {record.__class__}')
+
+        if cls.validate and len(field_set) == 0:
+            raise InvalidRecordError('Empty field set')
 
         ret = measurement
         if tag_set is not None:
@@ -64,8 +112,37 @@ class DefaultRecordSerializer(RecordSerializer):
             ret += f' {timestamp}'
         return ret
 
+    @classmethod
+    def _serialize_point(cls, point: types.Point) -> str:
+        # the key is cached along with the serializer that built it, which may escape or validate differently
+        cached = point._series_key
+        if cached is not None and cached[0] is cls:
+            series_key = cached[1]
+        else:
+            series_key = cls._serialize_measurement(point.measurement)
+            if len(point.tag_keys) != 0:
+                series_key += ',' + ','.join(
+                    f'{cls._serialize_member(key)}={cls._serialize_member(value)}'
+                    for key, value in zip(point.tag_keys, point.tag_values)
+                )
+            point._series_key = (cls, series_key)
+
+        serialize_member = cls._serialize_member
+        serialize_field_value = cls._serialize_field_value
+        field_set = ','.join(
+            f'{serialize_member(key)}={serialize_field_value(value)}'
+            for key, value in zip(point.field_keys, point.field_values)
+        )
+        if cls.validate and len(field_set) == 0:
+            raise InvalidRecordError('Empty field set')
+        if point.timestamp is None:
+            return f'{series_key} {field_set}'
+        return f'{series_key} {field_set} {cls._serialize_timestamp(point.timestamp)}'
+
     @classmethod
     def _serialize_measurement(cls, name: str) -> str:
+        if cls.validate:
+            cls._validate_name(name, 'measurement')
         return cls._comma_space.sub(r'\\\g<0>', name)
 
     @classmethod
@@ -73,15 +150,36 @@ class DefaultRecordSerializer(RecordSerializer):
         if tag_set is None:
             return None
 
-        ret = ','.join('='.join(map(cls._serialize_member, pair)) for pair in tag_set)
+        if isinstance(tag_set, Mapping):
+            serialize_member = cls._serialize_member
+            ret = ','.join(
+                f'{escaped}={serialize_member(tag_set[key])}'
+                for key, escaped in cls._escaped_keys(tuple(tag_set), cls.sort_tags)
+            )
+        else:
+            if cls.sort_tags:
+                tag_set = sorted(tag_set)
+            ret = ','.join('='.join(map(cls._serialize_member, pair)) for pair in tag_set)
         if len(ret) == 0:
             return None
         return ret
 
     @classmethod
     def _serialize_field_set(cls, field_set: types.FieldSetType) -> str:
+        if isinstance(field_set, Mapping):
+            serialize_field_value = cls._serialize_field_value
+            return ','.join(
+                f'{escaped}={serialize_field_value(value)}'
+                for (_, escaped), value in zip(cls._escaped_keys(tuple(field_set), False), field_set.values())
+            )
         return ','.join(f'{cls._serialize_member(pair[0])}={cls._serialize_field_value(pair[1])}' for pair in field_set)
 
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _escaped_keys(cls, keys: Tuple[str, ...], sort: bool) -> Tuple[Tuple[str, str], ...]:
+        """`keys` along with their escaped form, ordered by key if `sort`"""
+        return tuple((key, cls._serialize_member(key)) for key in (sorted(keys) if sort else keys))
+
     @classmethod
     def _serialize_timestamp(cls, timestamp: Optional[types.TimestampType]) -> Optional[str]:
         if timestamp is None:
@@ -94,55 +192,96 @@ class DefaultRecordSerializer(RecordSerializer):
         elif isinstance(timestamp, float):
             return str(int(timestamp * 1_000_000))
         else:
-            raise ValueError(f'Unsupported timestamp type: {timestamp.__class__}')
+            raise InvalidRecordError(f'Unsupported timestamp type: {timestamp.__class__}')
 
     @classmethod
     def _serialize_field_value(cls, value: types.FieldType) -> str:
-        if isinstance(value, bool):
-            return cls._serialize_bool_field_value(value)
-        elif isinstance(value, int):
-            return cls._serialize_int_field_value(value)
-        elif isinstance(value, float):
-            return cls._serialize_float_field_value(value)
-        elif isinstance(value, str):
-            return cls._serialize_string_field_value(value)
-        elif isinstance(value, SupportsInt):  # type: ignore[unreachable]
-            return cls._serialize_int_field_value(int(value))
-        elif isinstance(value, SupportsFloat):
-            return cls._serialize_float_field_value(float(value))
+        serialize = cls._field_value_serializers.get(value.__class__)
+        if serialize is None:
+            serialize = cls._field_value_serializers[value.__class__] = cls._field_value_serializer(value.__class__)
+        return serialize(value)
+
+    @classmethod
+    def _field_value_serializer(cls, value_type: type) -> Callable[[Any], str]:
+        """Serializer of field values of `value_type`, resolved once per type"""
+        if issubclass(value_type, bool):
+            return cls._serialize_bool_field_value
+        elif issubclass(value_type, int):
+            return cls._serialize_int_field_value
+        elif issubclass(value_type, float):
+            return cls._serialize_float_field_value
+        elif issubclass(value_type, str):
+            return cls._serialize_string_field_value
+        elif value_type.__module__ == 'numpy':
+            # a scalar of an array, numpy is already imported
+            import numpy
+
+            kind = numpy.dtype(value_type).kind
+            if kind == 'b':
+                return lambda value: cls._serialize_bool_field_value(bool(value))
+            elif kind in ('i', 'u'):
+                return lambda value: cls._serialize_int_field_value(int(value))
+            elif kind == 'f':
+                return lambda value: cls._serialize_float_field_value(float(value))
+
+        if issubclass(value_type, SupportsInt):
+            return lambda value: cls._serialize_int_field_value(int(value))
+        elif issubclass(value_type, SupportsFloat):
+            return lambda value: cls._serialize_float_field_value(float(value))
         else:
-            return cls._serialize_string_field_value(str(value))
+            return lambda value: cls._serialize_string_field_value(str(value))
 
     @classmethod
     def _serialize_member(cls, member: str) -> str:
+        if cls.validate:
+            cls._validate_name(member, 'tag or field key, or tag value')
         return cls._comma_equal_space.sub(r'\\\g<0>', member)
 
+    @classmethod
+    def _validate_name(cls, name: str, kind: str) -> None:
+        if len(name) == 0:
+            raise InvalidRecordError(f'Empty {kind}')
+        if cls._line_break.search(name) is not None:
+            raise InvalidRecordError(f'Line break in {kind} {name!r}')
+
     @classmethod
     def _serialize_string_field_value(cls, value: str) -> str:
-        value = cls._quote_backslash.sub(r'\\\g<0>', value)
+        if '"' in value or '\\' in value:
+            value = cls._quote_backslash.sub(r'\\\g<0>', value)
         if ' ' in value:
             return f'"{value}"'
         return value
 
     @classmethod
     def _serialize_int_field_value(cls, value: int) -> str:
-        if value.bit_length() > 64:
-            return str(float(value))
-        elif value.bit_length() == 64:
-            if value < 0:
-                if value < -9223372036854775808:
-                    return str(float(value))
-                else:
-                    return f'{value}i'
-            else:
-                return f'{value}u'
-        else:
+        if _INT64_MIN <= value <= _INT64_MAX:
             return f'{value}i'
+        elif 0 < value <= _UINT64_MAX:
+            return f'{value}u'
+        else:
+            return str(float(value))
 
     @classmethod
     def _serialize_float_field_value(cls, value: float) -> str:
+        if cls.validate and not math.isfinite(value):
+            raise InvalidRecordError(f'Float field value {value} is not finite')
         return str(value)
 
     @classmethod
     def _serialize_bool_field_value(cls, value: bool) -> str:
         return 't' if value else 'f'
+
+
+class SortedTagsRecordSerializer(DefaultRecordSerializer):
+    """Line protocol with tags ordered by key, which InfluxDB recommends for the best write performance"""
+
+    sort_tags = True
+
+
+class ValidatingRecordSerializer(DefaultRecordSerializer):
+    """
+    Line protocol of records, raising `InvalidRecordError` for empty names and field sets,
+    line breaks in names and tag values, and floats that are NaN or infinite.
+    """
+
+    validate = True
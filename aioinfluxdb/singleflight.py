@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+_V = TypeVar('_V')
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls with the same key.
+
+    While a call is in flight, callers with the same key wait for its result instead of starting their own.
+    The call runs in its own task, so cancelling one caller does not affect the others.
+    """
+
+    _calls: Dict[Hashable, asyncio.Future]  # type: ignore[type-arg]
+
+    def __init__(self) -> None:
+        self._calls = {}
+
+    def __len__(self) -> int:
+        """Number of calls in flight"""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[_V]]) -> _V:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = asyncio.ensure_future(fn())
+            call.add_done_callback(lambda done: self._done(key, done))
+        return await asyncio.shield(call)
+
+    def _done(self, key: Hashable, call: asyncio.Future) -> None:  # type: ignore[type-arg]
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # retrieved here, so that it is not reported when every caller was cancelled
+            call.exception()
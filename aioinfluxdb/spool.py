@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+import aiohttp
+import orjson
+from typing_extensions import Final
+
+if TYPE_CHECKING:
+    from aioinfluxdb.aiohttp_client import AioHTTPClient
+
+_header: Final[struct.Struct] = struct.Struct('>IIIB')
+""" length of query params, length of body, number of points, flags """
+_FLAG_GZIPPED: Final[int] = 0x1
+_SUFFIX: Final[str] = '.spool'
+
+
+class SpoolEntry(NamedTuple):
+    params: Dict[str, str]
+    data: bytes
+    gzipped: bool
+    points: int
+
+
+class WriteSpool:
+    """
+    Append-only on-disk spool of write requests that could not be delivered.
+
+    Entries are stored exactly as they would have been sent (already serialized and possibly compressed),
+    so replaying them does not serialize anything again.
+    Entries live in segment files that are rotated at `segment_bytes` and the oldest segments are evicted
+    once the spool exceeds `max_bytes`.
+    Writes are fsync-ed every `fsync_every` entries.
+
+    Delivery is at-least-once: a segment is removed only after all of its entries were accepted,
+    so entries replayed before a crash may be sent again on the next start.
+    """
+
+    _directory: Path
+    _max_bytes: int
+    _segment_bytes: int
+    _fsync_every: int
+    _segments: List[Path]
+    _active: Optional[IO[bytes]]
+    _active_path: Optional[Path]
+    _size: int
+    _unsynced: int
+    _replay_offset: int
+    _next_seq: int
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],  # type: ignore[type-arg]
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        segment_bytes: int = 16 * 1024 * 1024,
+        fsync_every: int = 64,
+    ) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._segment_bytes = segment_bytes
+        self._fsync_every = fsync_every
+        self._segments = sorted(self._directory.glob(f'*{_SUFFIX}'))
+        self._active = None
+        self._active_path = None
+        self._size = sum(p.stat().st_size for p in self._segments)
+        self._unsynced = 0
+        self._replay_offset = 0
+        self._next_seq = int(self._segments[-1].stem) + 1 if len(self._segments) != 0 else 0
+
+    @property
+    def size(self) -> int:
+        """Bytes currently held by the spool"""
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size != 0
+
+    def append(self, *, params: Mapping[str, str], data: bytes, gzipped: bool, points: int) -> None:
+        ser_params = orjson.dumps(params)
+        entry = _header.pack(len(ser_params), len(data), points, _FLAG_GZIPPED if gzipped else 0) + ser_params + data
+
+        if self._active is None or self._active.tell() + len(entry) > self._segment_bytes:
+            self._rotate()
+        assert self._active is not None
+
+        self._active.write(entry)
+        self._size += len(entry)
+        self._unsynced += 1
+        if self._unsynced >= self._fsync_every:
+            self.flush()
+
+        self._evict()
+
+    def flush(self) -> None:
+        if self._active is None:
+            return
+        self._active.flush()
+        os.fsync(self._active.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+            self._active_path = None
+
+    async def replay(self, client: AioHTTPClient) -> int:
+        """
+        Send spooled entries oldest-first through `client` until the spool is empty.
+
+        Entries rejected by the server as invalid (4xx other than 429) are dropped.
+        Stops at any other failure, which is raised; the failed entry is retried on the next call.
+
+        :return: number of entries delivered
+        """
+        delivered = 0
+        while len(self._segments) != 0:
+            path = self._segments[0]
+            if path == self._active_path:
+                # seal the active segment, so that new entries go to a fresh one while this is replayed
+                self.close()
+
+            for offset, entry in self._read_segment(path, self._replay_offset):
+                if client._instrumentation is not None:
+                    client._instrumentation.on_retry(path='/api/v2/write')
+                try:
+                    await client._post_write(
+                        target=client._target(entry.params),
+                        data=entry.data,
+                        gzipped=entry.gzipped,
+                        points=entry.points,
+                    )
+                except aiohttp.ClientResponseError as e:
+                    if e.status == 429 or not 400 <= e.status < 500:
+                        raise
+                else:
+                    delivered += 1
+                if len(self._segments) == 0 or self._segments[0] != path:
+                    # evicted while the entry was in flight
+                    break
+                self._replay_offset = offset
+            else:
+                self._remove_oldest()
+        return delivered
+
+    def _rotate(self) -> None:
+        if self._active is not None:
+            self.close()
+        self._active_path = self._directory / f'{self._next_seq:016d}{_SUFFIX}'
+        self._next_seq += 1
+        self._active = open(self._active_path, 'ab')
+        self._segments.append(self._active_path)
+
+    def _evict(self) -> None:
+        while self._size > self._max_bytes and len(self._segments) > 1:
+            self._remove_oldest()
+
+    def _remove_oldest(self) -> None:
+        path = self._segments.pop(0)
+        self._size -= path.stat().st_size
+        path.unlink()
+        self._replay_offset = 0
+
+    @staticmethod
+    def _read_segment(path: Path, offset: int) -> Iterator[Tuple[int, SpoolEntry]]:
+        """Yield entries after `offset` with the offset of the entry that follows each"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                end = len(buf)
+                while offset + _header.size <= end:
+                    params_len, data_len, points, flags = _header.unpack_from(buf, offset)
+                    params_start = offset + _header.size
+                    data_start = params_start + params_len
+                    data_end = data_start + data_len
+                    if data_end > end:
+                        # truncated tail of an entry that was never synced
+                        return
+                    yield data_end, SpoolEntry(
+                        params=orjson.loads(buf[params_start:data_start]),
+                        data=buf[data_start:data_end],
+                        gzipped=bool(flags & _FLAG_GZIPPED),
+                        points=points,
+                    )
+                    offset = data_end
@@ -0,0 +1,598 @@
+"""
+Blocking client for threads without an event loop, e.g. Celery workers and scripts.
+
+It shares the line protocol serializer and the Flux CSV parser core with `AioHTTPClient`,
+and keeps HTTP connections alive in a pool of `http.client` connections.
+"""
+
+from __future__ import annotations
+
+import http.client
+import queue
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Union, overload
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+
+import orjson
+from isal import igzip as gzip
+
+from aioinfluxdb import constants, serializer, types
+from aioinfluxdb.client import Client
+from aioinfluxdb.csv_parser import FluxCsvRowParser
+from aioinfluxdb.flux_table import FluxRecord
+
+_FLUSH = object()
+_READ_SIZE = 64 * 1024
+
+
+class _ConnectionPool:
+    """At most `maxsize` `http.client` connections to one server, reused while the server keeps them alive"""
+
+    _host: str
+    _port: int
+    _ssl_context: Optional[ssl.SSLContext]
+    _timeout: Optional[float]
+    _idle: queue.LifoQueue[http.client.HTTPConnection]
+    _slots: threading.BoundedSemaphore
+    _closed: bool
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        ssl_context: Optional[ssl.SSLContext],
+        maxsize: int,
+        timeout: Optional[float],
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._ssl_context = ssl_context
+        self._timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(maxsize)
+        self._closed = False
+
+    @contextmanager
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Mapping[str, str],
+    ) -> Iterator[http.client.HTTPResponse]:
+        """Response of the request; the connection is reused only if the response was read to its end"""
+        self._slots.acquire()
+        try:
+            conn, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._connect(), False
+
+        reusable = False
+        try:
+            try:
+                conn.request(method, url, body=body, headers=dict(headers))
+                res = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused:
+                    raise
+                # the server closed the idle connection
+                conn.close()
+                conn = self._connect()
+                conn.request(method, url, body=body, headers=dict(headers))
+                res = conn.getresponse()
+            yield res
+            reusable = res.isclosed() and not res.will_close
+        finally:
+            if reusable and not self._closed:
+                self._idle.put(conn)
+            else:
+                conn.close()
+            self._slots.release()
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._ssl_context is not None:
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self._timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+
+
+class SyncClient:
+    """
+    Blocking counterpart of `AioHTTPClient`.
+
+    Methods mirror those of `Client` with the same arguments, but block instead of returning coroutines.
+    It is safe to share one instance between threads.
+    """
+
+    _token: str
+    _gzip: bool
+    _pool: _ConnectionPool
+    _record_serializer: serializer.RecordSerializer
+    _closed: bool
+
+    def __init__(
+        self,
+        host: str,
+        token: str,
+        port: int = 8086,
+        tls: bool = False,
+        gzip: bool = True,
+        max_connections: int = 10,
+        timeout: Optional[float] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        record_serializer: Optional[serializer.RecordSerializer] = None,
+    ) -> None:
+        """
+        :param max_connections: requests beyond this many concurrent ones wait for a free connection
+        :param timeout: seconds to wait for connecting and for each read
+        :param record_serializer: see `AioHTTPClient`
+        """
+        self._token = token
+        self._gzip = gzip
+        self._pool = _ConnectionPool(
+            host,
+            port,
+            ssl_context=(ssl_context or ssl.create_default_context()) if tls else None,
+            maxsize=max_connections,
+            timeout=timeout,
+        )
+        self._record_serializer = (
+            record_serializer if record_serializer is not None else serializer.DefaultRecordSerializer()
+        )
+        self._closed = False
+
+    def __enter__(self) -> SyncClient:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    @property
+    def api_token(self) -> str:
+        return self._token
+
+    def ping(self) -> bool:
+        with self._pool.request('GET', '/ping', headers={}) as res:
+            res.read()
+            return res.status in (http.HTTPStatus.OK, http.HTTPStatus.NO_CONTENT)
+
+    def list_organizations(
+        self,
+        *,
+        descending: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+        organization_name: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Iterable[types.Organization]:
+        params = dict(
+            descending=int(descending),
+            limit=limit,
+            offset=offset,
+            org=organization_name,
+            orgID=organization_id,
+            userID=user_id,
+        )
+        orgs = self._request_json('GET', '/api/v2/orgs', params=params)
+        return tuple(map(types.Organization.from_json, orgs['orgs']))
+
+    def create_organization(self, *, description: Optional[str] = None, name: str) -> types.Organization:
+        data = dict(name=name)
+        if description is not None:
+            data['description'] = description
+        return types.Organization.from_json(self._request_json('POST', '/api/v2/orgs', body=orjson.dumps(data)))
+
+    def delete_organization(self, *, organization_id: str) -> None:
+        self._request_json('DELETE', f'/api/v2/orgs/{organization_id}')
+
+    def get_organization(self, *, organization_id: str) -> Optional[types.Organization]:
+        return types.Organization.from_json(self._request_json('GET', f'/api/v2/orgs/{organization_id}'))
+
+    def list_buckets(
+        self,
+        *,
+        after: Optional[str] = None,
+        bucket_id: Optional[str] = None,
+        limit: int = 20,
+        name: Optional[str] = None,
+        offset: int = 0,
+        organization: Optional[str] = None,
+        organization_id: Optional[str] = None,
+    ) -> Iterable[types.Bucket]:
+        params = dict(
+            after=after,
+            id=bucket_id,
+            limit=limit,
+            name=name,
+            offset=offset,
+            org=organization,
+            orgID=organization_id,
+        )
+        buckets = self._request_json('GET', '/api/v2/buckets', params=params)
+        return tuple(map(types.Bucket.from_json, buckets['buckets']))
+
+    def create_bucket(
+        self,
+        *,
+        description: Optional[str] = None,
+        name: str,
+        organization_id: str,
+        retention_rules: Iterable[types.RetentionRule] = (),
+        rp: Optional[str] = None,
+        schema_type: Optional[str] = None,
+    ) -> types.Bucket:
+        data: Dict[str, Any] = dict(
+            name=name,
+            orgID=organization_id,
+        )
+        retention_rules = tuple(retention_rules)
+        if len(retention_rules) != 0:
+            data['retentionRules'] = tuple(map(types.RetentionRule.to_json, retention_rules))
+        if description is not None:
+            data['description'] = description
+        if rp is not None:
+            data['rp'] = rp
+        if schema_type is not None:
+            data['schemaType'] = schema_type
+        return types.Bucket.from_json(self._request_json('POST', '/api/v2/buckets', body=orjson.dumps(data)))
+
+    def delete_bucket(self, *, bucket_id: str) -> None:
+        self._request_json('DELETE', f'/api/v2/buckets/{bucket_id}')
+
+    def get_bucket(self, *, bucket_id: str) -> Optional[types.Bucket]:
+        return types.Bucket.from_json(self._request_json('GET', f'/api/v2/buckets/{bucket_id}'))
+
+    @overload
+    def write(
+        self,
+        *,
+        bucket: str,
+        organization: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple],
+    ) -> None:
+        pass  # pragma: no cover
+
+    @overload
+    def write(
+        self,
+        *,
+        bucket: str,
+        organization_id: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple],
+    ) -> None:
+        pass  # pragma: no cover
+
+    def write(
+        self,
+        *,
+        bucket: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple],
+        **kwargs: str,
+    ) -> None:
+        self.write_lines(self._serialize_records((record,)), bucket=bucket, precision=precision, **kwargs)
+
+    @overload
+    def write_multiple(
+        self,
+        *,
+        bucket: str,
+        organization: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        records: Union[
+            Iterable[str],
+            Iterable[types.Record],
+            Iterable[types.Point],
+            Iterable[types.MinimalRecordTuple],
+            Iterable[types.RecordTuple],
+        ],
+    ) -> None:
+        pass  # pragma: no cover
+
+    @overload
+    def write_multiple(
+        self,
+        *,
+        bucket: str,
+        organization_id: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        records: Union[
+            Iterable[str],
+            Iterable[types.Record],
+            Iterable[types.Point],
+            Iterable[types.MinimalRecordTuple],
+            Iterable[types.RecordTuple],
+        ],
+    ) -> None:
+        pass  # pragma: no cover
+
+    def write_multiple(
+        self,
+        *,
+        bucket: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        records: Union[
+            Iterable[str],
+            Iterable[types.Record],
+            Iterable[types.Point],
+            Iterable[types.MinimalRecordTuple],
+            Iterable[types.RecordTuple],
+        ],
+        **kwargs: str,
+    ) -> None:
+        self.write_lines(self._serialize_records(records), bucket=bucket, precision=precision, **kwargs)
+
+    def write_lines(
+        self,
+        data: bytes,
+        *,
+        bucket: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        **kwargs: str,
+    ) -> None:
+        """Write already serialized line protocol"""
+        params = dict(Client._build_org_query_param(kwargs), bucket=bucket, precision=precision.value)
+        headers = {}
+        if self._gzip:
+            data = gzip.compress(data)  # type: ignore[no-untyped-call]
+            headers['Content-Encoding'] = 'gzip'
+        self._request_json('POST', '/api/v2/write', params=params, body=data, headers=headers)
+
+    @overload
+    def flux_query(
+        self,
+        *,
+        organization: str,
+        flux_body: str,
+        now: Optional[datetime] = None,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[FluxRecord]:
+        pass  # pragma: no cover
+
+    @overload
+    def flux_query(
+        self,
+        *,
+        organization_id: str,
+        flux_body: str,
+        now: Optional[datetime] = None,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[FluxRecord]:
+        pass  # pragma: no cover
+
+    def flux_query(
+        self,
+        *,
+        flux_body: str,
+        now: Optional[datetime] = None,
+        params: Optional[Mapping[str, Any]] = None,
+        **kwargs: str,
+    ) -> Iterator[FluxRecord]:
+        """Records of the query, parsed while the response is read. The connection is in use until exhausted."""
+        body: Dict[str, Any] = dict(
+            dialect=dict(
+                annotations=('group', 'datatype', 'default'),
+                dateTimeFormat='RFC3339Nano',
+            ),
+            query=flux_body,
+            type='flux',
+        )
+        if now is not None:
+            body['now'] = now
+        if params is not None:
+            body['params'] = params
+
+        url = '/api/v2/query?' + urlencode(Client._build_org_query_param(kwargs))
+        headers = self._headers({'Content-Type': 'application/json', 'Accept': 'application/csv'})
+        with self._pool.request('POST', url, body=orjson.dumps(body), headers=headers) as res:
+            self._raise_for_status(res, url)
+            stream: Any = res
+            if res.getheader('Content-Encoding') == 'gzip':
+                stream = gzip.GzipFile(fileobj=res)  # type: ignore[no-untyped-call]
+            parser = FluxCsvRowParser()
+            for chunk in iter(lambda: stream.read1(_READ_SIZE), b''):
+                yield from parser.feed(chunk)
+            yield from parser.close()
+
+    def close(self) -> None:
+        self._closed = True
+        self._pool.close()
+
+    def _headers(self, headers: Optional[Mapping[str, str]] = None) -> Dict[str, str]:
+        ret = {'Authorization': f'Token {self._token}'}
+        if self._gzip:
+            ret['Accept-Encoding'] = 'gzip'
+        if headers is not None:
+            ret.update(headers)
+        return ret
+
+    def _request_json(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Any:
+        """Decoded JSON response body, or `None` if it is empty"""
+        url = path
+        if params is not None:
+            url += '?' + urlencode({k: v for k, v in params.items() if v is not None})
+        with self._pool.request(method, url, body=body, headers=self._headers(headers)) as res:
+            self._raise_for_status(res, url)
+            data = res.read()
+        if res.getheader('Content-Encoding') == 'gzip':
+            data = gzip.decompress(data)  # type: ignore[no-untyped-call]
+        return orjson.loads(data) if len(data) != 0 else None
+
+    def _serialize_records(
+        self,
+        records: Iterable[Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple]],
+    ) -> bytes:
+        return '\n'.join(map(self._record_serializer.serialize_record, records)).encode()  # type: ignore[arg-type]
+
+    @staticmethod
+    def _raise_for_status(res: http.client.HTTPResponse, url: str) -> None:
+        if res.status < 400:
+            return
+        body = res.read()
+        if res.getheader('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)  # type: ignore[no-untyped-call]
+        raise HTTPError(url, res.status, body.decode(errors='replace') or res.reason, res.headers, None)
+
+
+class BatchWriter:
+    """
+    Buffers records from any thread and writes them in batches from a background thread.
+
+    A batch is written when it holds `batch_size` records, or `flush_interval` seconds after its first record.
+    Records are serialized in the background thread as well, so `write()` only enqueues them.
+    `write()` blocks while `max_pending` records wait to be written.
+    """
+
+    _client: SyncClient
+    _bucket: str
+    _precision: constants.WritePrecision
+    _org_map: Dict[str, str]
+    _batch_size: int
+    _flush_interval: float
+    _on_error: Optional[Callable[[Exception, bytes], None]]
+    _queue: queue.Queue[Any]
+    _thread: threading.Thread
+    _errors: List[Exception]
+    _closed: bool
+
+    def __init__(
+        self,
+        client: SyncClient,
+        *,
+        bucket: str,
+        precision: constants.WritePrecision = constants.WritePrecision.NanoSecond,
+        batch_size: int = 5_000,
+        flush_interval: float = 1,
+        max_pending: int = 100_000,
+        on_error: Optional[Callable[[Exception, bytes], None]] = None,
+        **kwargs: str,
+    ) -> None:
+        """
+        :param on_error: called with the error and the line protocol of a batch that could not be written.
+            Without it, the first error is raised by the next `flush()` or `close()`, as are errors raised by it
+        :param kwargs: `organization` or `organization_id`
+        """
+        self._client = client
+        self._bucket = bucket
+        self._precision = precision
+        self._org_map = dict(kwargs)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._on_error = on_error
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._errors = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='aioinfluxdb-batch-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> BatchWriter:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def write(self, record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple]) -> None:
+        if self._closed:
+            raise RuntimeError('BatchWriter is closed')
+        self._queue.put(record)
+
+    def write_multiple(
+        self,
+        records: Union[
+            Iterable[str],
+            Iterable[types.Record],
+            Iterable[types.Point],
+            Iterable[types.MinimalRecordTuple],
+            Iterable[types.RecordTuple],
+        ],
+    ) -> None:
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        """Wait until the records written so far are sent"""
+        if self._closed or not self._thread.is_alive():
+            raise RuntimeError('BatchWriter is closed')
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Send the pending records and stop the background thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if len(self._errors) != 0:
+            error = self._errors[0]
+            self._errors.clear()
+            raise error
+
+    def _run(self) -> None:
+        batch: List[Any] = []
+        deadline = 0.0
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0) if len(batch) != 0 else None)
+            except queue.Empty:
+                item = _FLUSH
+
+            if item is not None and item is not _FLUSH and not isinstance(item, threading.Event):
+                if len(batch) == 0:
+                    deadline = time.monotonic() + self._flush_interval
+                batch.append(item)
+                if len(batch) < self._batch_size:
+                    continue
+
+            if len(batch) != 0:
+                self._send(batch)
+                batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+    def _send(self, batch: List[Any]) -> None:
+        data = b''
+        try:
+            data = self._client._serialize_records(batch)
+            self._client.write_lines(data, bucket=self._bucket, precision=self._precision, **self._org_map)
+        except Exception as e:
+            if self._on_error is None:
+                self._errors.append(e)
+                return
+            try:
+                self._on_error(e, data)
+            except Exception as callback_error:
+                # keep the thread alive, or `flush()` and a full queue would block forever
+                self._errors.append(callback_error)
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import http
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiohttp
+from typing_extensions import Final
+
+_OVERLOAD_STATUSES: Final = frozenset((http.HTTPStatus.TOO_MANY_REQUESTS, http.HTTPStatus.SERVICE_UNAVAILABLE))
+
+
+class TokenBucket:
+    """
+    Token bucket that refills at `rate` tokens per second up to `burst` tokens.
+
+    A request larger than the bucket is let through once the bucket is full and leaves it in debt,
+    so oversized batches are delayed instead of blocked forever.
+    """
+
+    _rate: float
+    _burst: float
+    _tokens: float
+    _updated_at: float
+    _lock: asyncio.Lock
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError('`rate` must be positive')
+        self._rate = rate
+        self._burst = burst if burst is not None else rate
+        self._tokens = self._burst
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    async def acquire(self, amount: float) -> None:
+        # the lock keeps waiters in FIFO order
+        async with self._lock:
+            self._refill()
+            needed = min(amount, self._burst)
+            if self._tokens < needed:
+                await asyncio.sleep((needed - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= amount
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on the number of in-flight requests.
+
+    Each success faster than `target_latency` (or any success if it is not set) grows the limit
+    by `increase` per `limit` requests, every overload signal multiplies it by `decrease_factor`.
+    """
+
+    _limit: float
+    _min_limit: int
+    _max_limit: int
+    _increase: float
+    _decrease_factor: float
+    _target_latency: Optional[float]
+    _in_flight: int
+    _condition: asyncio.Condition
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1,
+        decrease_factor: float = 0.5,
+        target_latency: Optional[float] = None,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError('`min_limit` <= `initial_limit` <= `max_limit` must hold and be positive')
+        if not 0 < decrease_factor < 1:
+            raise ValueError('`decrease_factor` must be between 0 and 1')
+        self._limit = initial_limit
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._increase = increase
+        self._decrease_factor = decrease_factor
+        self._target_latency = target_latency
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        if self._target_latency is None or latency <= self._target_latency:
+            self._limit = min(self._max_limit, self._limit + self._increase / self._limit)
+
+    def on_overload(self) -> None:
+        self._limit = max(self._min_limit, self._limit * self._decrease_factor)
+
+
+class WriteThrottle:
+    """
+    Admission control in front of `/api/v2/write`.
+
+    Requests first wait for the optional points/s and bytes/s token buckets, then for a slot of the optional
+    adaptive concurrency limiter. Responses with 429 or 503 and timeouts count as overload.
+    """
+
+    _points: Optional[TokenBucket]
+    _bytes: Optional[TokenBucket]
+    _concurrency: Optional[AdaptiveConcurrencyLimiter]
+
+    def __init__(
+        self,
+        *,
+        points_per_second: Optional[float] = None,
+        bytes_per_second: Optional[float] = None,
+        concurrency: Optional[AdaptiveConcurrencyLimiter] = None,
+    ) -> None:
+        self._points = TokenBucket(points_per_second) if points_per_second is not None else None
+        self._bytes = TokenBucket(bytes_per_second) if bytes_per_second is not None else None
+        self._concurrency = concurrency
+
+    @property
+    def concurrency(self) -> Optional[AdaptiveConcurrencyLimiter]:
+        return self._concurrency
+
+    @asynccontextmanager
+    async def throttle(self, *, points: int, size: int) -> AsyncIterator[None]:
+        if self._points is not None and points != 0:
+            await self._points.acquire(points)
+        if self._bytes is not None:
+            await self._bytes.acquire(size)
+
+        if self._concurrency is None:
+            yield
+            return
+
+        await self._concurrency.acquire()
+        started_at = time.monotonic()
+        try:
+            yield
+        except aiohttp.ClientResponseError as e:
+            if e.status in _OVERLOAD_STATUSES:
+                self._concurrency.on_overload()
+            raise
+        except asyncio.TimeoutError:
+            self._concurrency.on_overload()
+            raise
+        else:
+            self._concurrency.on_success(time.monotonic() - started_at)
+        finally:
+            await self._concurrency.release()
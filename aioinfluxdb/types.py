@@ -1,8 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Callable, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import ciso8601
 from typing_extensions import TypeAlias, TypedDict
@@ -11,9 +23,9 @@ from aioinfluxdb import constants
 from aioinfluxdb.flux_table import FluxRecord
 
 TagType: TypeAlias = Tuple[str, str]
-TagSetType: TypeAlias = Iterable[Tuple[str, str]]
+TagSetType: TypeAlias = Union[Mapping[str, str], Iterable[Tuple[str, str]]]
 FieldType: TypeAlias = Union[int, float, bool, str]
-FieldSetType: TypeAlias = Iterable[Tuple[str, FieldType]]
+FieldSetType: TypeAlias = Union[Mapping[str, FieldType], Iterable[Tuple[str, FieldType]]]
 TimestampType: TypeAlias = Union[datetime, int, float]
 
 MinimalRecordTuple: TypeAlias = Tuple[str, FieldSetType]
@@ -34,6 +46,104 @@ class Record(NamedTuple):
         return f'<{self.__class__.__name__} {body}>'
 
 
+class Point:
+    """
+    Record whose tags and fields are kept in parallel tuples, compact enough to buffer millions of them.
+
+    Tags are sorted by key, as InfluxDB recommends. The escaped measurement and tag set (the series key)
+    is computed once per serializer class and shared with the points made by `with_fields`.
+    """
+
+    __slots__ = ('measurement', 'tag_keys', 'tag_values', 'field_keys', 'field_values', 'timestamp', '_series_key')
+
+    measurement: str
+    tag_keys: Tuple[str, ...]
+    tag_values: Tuple[str, ...]
+    field_keys: Tuple[str, ...]
+    field_values: Tuple[FieldType, ...]
+    timestamp: Optional[TimestampType]
+    _series_key: Optional[Tuple[type, str]]
+    """ serializer class and the series key it built """
+
+    def __init__(
+        self,
+        measurement: str,
+        field_set: FieldSetType,
+        tag_set: Optional[TagSetType] = None,
+        timestamp: Optional[TimestampType] = None,
+    ) -> None:
+        self.measurement = measurement
+        if tag_set is None:
+            self.tag_keys = self.tag_values = ()
+        else:
+            self.tag_keys, self.tag_values = _unzip(
+                sorted(tag_set.items() if isinstance(tag_set, Mapping) else tag_set)
+            )
+        self.field_keys, self.field_values = _unzip(field_set.items() if isinstance(field_set, Mapping) else field_set)
+        self.timestamp = timestamp
+        self._series_key = None
+
+    def with_fields(
+        self,
+        field_set: FieldSetType,
+        timestamp: Optional[TimestampType] = None,
+    ) -> Point:
+        """Point of the same series with other fields and timestamp"""
+        point = Point.__new__(Point)
+        point.measurement = self.measurement
+        point.tag_keys = self.tag_keys
+        point.tag_values = self.tag_values
+        point.field_keys, point.field_values = _unzip(
+            field_set.items() if isinstance(field_set, Mapping) else field_set
+        )
+        point.timestamp = timestamp
+        point._series_key = self._series_key
+        return point
+
+    @property
+    def tag_set(self) -> Tuple[TagType, ...]:
+        return tuple(zip(self.tag_keys, self.tag_values))
+
+    @property
+    def field_set(self) -> Tuple[Tuple[str, FieldType], ...]:
+        return tuple(zip(self.field_keys, self.field_values))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Point):
+            return NotImplemented
+        return (
+            self.measurement == other.measurement
+            and self.tag_keys == other.tag_keys
+            and self.tag_values == other.tag_values
+            and self.field_keys == other.field_keys
+            and self.field_values == other.field_values
+            and self.timestamp == other.timestamp
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        body = f'measurement={self.measurement}, field_set={self.field_set}'
+        if len(self.tag_keys) != 0:
+            body += f', tag_set={self.tag_set}'
+        if self.timestamp is not None:
+            body += f', timestamp={self.timestamp}'
+        return f'<{self.__class__.__name__} {body}>'
+
+
+def _unzip(pairs: Iterable[Tuple[str, Any]]) -> Tuple[Tuple[str, ...], Tuple[Any, ...]]:
+    pairs = tuple(pairs)
+    return tuple(pair[0] for pair in pairs), tuple(pair[1] for pair in pairs)
+
+
+@dataclass(frozen=True)
+class InvalidRecord:
+    """A record that was dropped from a write, see `on_invalid` of `write_multiple()`"""
+
+    record: Any
+    error: Exception
+
+
 class _RetentionRule(TypedDict, total=False):
     everySeconds: int
     shardGroupDurationSeconds: int
@@ -182,3 +292,96 @@ class QueryOptions:
         """
         self.profilers = profilers
         self.profiler_callback = profiler_callback
+
+
+@dataclass(frozen=True)
+class OperatorProfile:
+    """Costs of one operator of a Flux query, from the `operator` profiler. Durations are in nanoseconds."""
+
+    type: str
+    label: str
+    count: int
+    min_duration: int
+    max_duration: int
+    duration_sum: int
+    mean_duration: float
+
+    @classmethod
+    def from_record(cls, record: FluxRecord) -> OperatorProfile:
+        return cls(
+            type=record['Type'],
+            label=record['Label'],
+            count=record['Count'],
+            min_duration=record['MinDuration'],
+            max_duration=record['MaxDuration'],
+            duration_sum=record['DurationSum'],
+            mean_duration=record['MeanDuration'],
+        )
+
+
+@dataclass
+class QueryStats:
+    """
+    Statistics of a Flux query collected by the server-side profilers. Durations are in nanoseconds.
+
+    Fields of a profiler that was not enabled stay `None` (or empty).
+    """
+
+    total_duration: Optional[int] = None
+    compile_duration: Optional[int] = None
+    queue_duration: Optional[int] = None
+    plan_duration: Optional[int] = None
+    requeue_duration: Optional[int] = None
+    execute_duration: Optional[int] = None
+    concurrency: Optional[int] = None
+    max_allocated: Optional[int] = None
+    """ bytes """
+    total_allocated: Optional[int] = None
+    """ bytes """
+    runtime_errors: Optional[str] = None
+    query_plan: Optional[str] = None
+    scanned_bytes: Optional[int] = None
+    scanned_values: Optional[int] = None
+    operators: List[OperatorProfile] = field(default_factory=list)
+    records: List[FluxRecord] = field(default_factory=list)
+    """ all profiler records, including those of profilers without dedicated fields """
+
+    def add_record(self, record: FluxRecord) -> None:
+        self.records.append(record)
+        measurement = record.values.get('_measurement')
+        if measurement == 'profiler/query':
+            values = record.values
+            self.total_duration = values.get('TotalDuration')
+            self.compile_duration = values.get('CompileDuration')
+            self.queue_duration = values.get('QueueDuration')
+            self.plan_duration = values.get('PlanDuration')
+            self.requeue_duration = values.get('RequeueDuration')
+            self.execute_duration = values.get('ExecuteDuration')
+            self.concurrency = values.get('Concurrency')
+            self.max_allocated = values.get('MaxAllocated')
+            self.total_allocated = values.get('TotalAllocated')
+            self.runtime_errors = values.get('RuntimeErrors') or None
+            self.query_plan = values.get('flux/query-plan')
+            self.scanned_bytes = values.get('influxdb/scanned-bytes')
+            self.scanned_values = values.get('influxdb/scanned-values')
+        elif measurement == 'profiler/operator':
+            self.operators.append(OperatorProfile.from_record(record))
+
+
+class FluxQueryResult(AsyncIterable[FluxRecord]):
+    """
+    Records of a Flux query.
+
+    With profilers enabled, `stats` is filled from the profiler tables that follow the records,
+    so it is complete once all records were read.
+    """
+
+    stats: Optional[QueryStats]
+    _records: AsyncIterable[FluxRecord]
+
+    def __init__(self, records: AsyncIterable[FluxRecord], stats: Optional[QueryStats] = None) -> None:
+        self._records = records
+        self.stats = stats
+
+    def __aiter__(self) -> AsyncIterator[FluxRecord]:
+        return self._records.__aiter__()
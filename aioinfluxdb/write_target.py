@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, AsyncIterable, Callable, Dict, Iterable, Mapping, Optional, Union
+from urllib.parse import quote, urlencode
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from aioinfluxdb import types
+
+if TYPE_CHECKING:
+    from aioinfluxdb.aiohttp_client import AioHTTPClient
+
+
+class WriteTarget:
+    """
+    Destination of writes (bucket, organization and precision) bound to a client.
+
+    The request URL with its encoded query string and the request headers are built once,
+    so each write through a target only costs serializing and sending the body.
+    Create it with `AioHTTPClient.target()`.
+    """
+
+    _client: AioHTTPClient
+    _params: Dict[str, str]
+    _url: URL
+    _headers: CIMultiDictProxy[str]
+    _gzipped_headers: CIMultiDictProxy[str]
+
+    def __init__(self, client: AioHTTPClient, params: Mapping[str, str]) -> None:
+        self._client = client
+        self._params = dict(params)
+        self._url = URL.build(path='/api/v2/write', query_string=urlencode(self._params, quote_via=quote), encoded=True)
+
+        headers = CIMultiDict({aiohttp.hdrs.AUTHORIZATION: f'Token {client.api_token}'})
+        if client._gzip:
+            headers[aiohttp.hdrs.ACCEPT_ENCODING] = 'gzip'
+        self._headers = CIMultiDictProxy(headers)
+        gzipped_headers = headers.copy()
+        gzipped_headers[aiohttp.hdrs.CONTENT_ENCODING] = 'gzip'
+        self._gzipped_headers = CIMultiDictProxy(gzipped_headers)
+
+    @property
+    def client(self) -> AioHTTPClient:
+        return self._client
+
+    @property
+    def params(self) -> Mapping[str, str]:
+        """Query parameters of `/api/v2/write`"""
+        return self._params
+
+    @property
+    def url(self) -> URL:
+        return self._url
+
+    def headers(self, gzipped: bool) -> CIMultiDictProxy[str]:
+        return self._gzipped_headers if gzipped else self._headers
+
+    async def write(
+        self, record: Union[str, types.Record, types.Point, types.MinimalRecordTuple, types.RecordTuple]
+    ) -> None:
+        await self._client._write_data(target=self, data=self._client._serialize_records((record,)))
+
+    async def write_multiple(
+        self,
+        records: Union[
+            Iterable[str],
+            Iterable[types.Record],
+            Iterable[types.Point],
+            Iterable[types.MinimalRecordTuple],
+            Iterable[types.RecordTuple],
+        ],
+        *,
+        on_invalid: Optional[Callable[[types.InvalidRecord], Any]] = None,
+    ) -> None:
+        """:param on_invalid: see `AioHTTPClient.write_multiple()`"""
+        if on_invalid is None:
+            await self._client._write_data(target=self, data=self._client._serialize_records(records))
+            return
+
+        lines = self._client._serialize_lines(records, on_invalid)
+        if len(lines) != 0:
+            await self._client._write_data(target=self, data=b'\n'.join(lines), points=len(lines))
+
+    async def write_lines(
+        self,
+        data: Union[bytes, Iterable[bytes], AsyncIterable[bytes]],
+        *,
+        precompressed: bool = False,
+    ) -> None:
+        """See `AioHTTPClient.write_lines()`"""
+        await self._client._write_lines(target=self, data=data, precompressed=precompressed)
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self._url}>'
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Iterator, List
+
+import aiohttp.web
+import pytest
+
+from aioinfluxdb import AioHTTPClient, types
+
+
+@dataclass(frozen=True)
+class FakeInfluxDB:
+    """In-process stand-in for `/api/v2/write` and `/api/v2/query`"""
+
+    loop: asyncio.AbstractEventLoop
+    host: str
+    port: int
+    app: aiohttp.web.Application
+
+    def client(self, **kwargs) -> AioHTTPClient:
+        async def create() -> AioHTTPClient:
+            return AioHTTPClient(host=self.host, port=self.port, token='token', **kwargs)
+
+        return self.loop.run_until_complete(create())
+
+    def set_query_response(self, body: str) -> None:
+        self.app['responses']['query'] = body.encode()
+
+
+@pytest.fixture(scope='session')
+def event_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope='session')
+def fake_influx(event_loop: asyncio.AbstractEventLoop) -> Iterator[FakeInfluxDB]:
+    async def write(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        await request.read()
+        return aiohttp.web.Response(status=204)
+
+    async def query(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        await request.read()
+        return aiohttp.web.Response(body=request.app['responses']['query'], content_type='text/csv', charset='utf-8')
+
+    app = aiohttp.web.Application(client_max_size=1 << 30)
+    app['responses'] = dict(query=b'')
+    app.router.add_post('/api/v2/write', write)
+    app.router.add_post('/api/v2/query', query)
+
+    runner = aiohttp.web.AppRunner(app)
+    event_loop.run_until_complete(runner.setup())
+    site = aiohttp.web.TCPSite(runner, '127.0.0.1', 0)
+    event_loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    yield FakeInfluxDB(loop=event_loop, host='127.0.0.1', port=port, app=app)
+
+    event_loop.run_until_complete(runner.cleanup())
+
+
+def make_records(count: int, tags: int, fields: int, seed: int = 0) -> List[types.Record]:
+    rnd = random.Random(seed)
+    return [
+        types.Record(
+            measurement='cpu usage',
+            tag_set=tuple((f'tag{t}', f'host {rnd.randrange(100)}') for t in range(tags)),
+            field_set=tuple(
+                (f'field{f}', (rnd.random(), rnd.randrange(1 << 40), f'v{i}', i % 2 == 0)[f % 4]) for f in range(fields)
+            ),
+            timestamp=1_640_995_200_000_000_000 + i,
+        )
+        for i in range(count)
+    ]
+
+
+def make_flux_csv(rows: int, tags: int, tables: int = 1) -> str:
+    """Annotated CSV as returned by `/api/v2/query` with `tags` extra group key columns"""
+    tag_names = [f'tag{t}' for t in range(tags)]
+    lines = [
+        '#group,false,false,true,true,false,false,true,true' + ',true' * tags,
+        '#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string'
+        + ',string' * tags,
+        '#default,_result,,,,,,,' + ',' * tags,
+        ',result,table,_start,_stop,_time,_value,_field,_measurement' + ''.join(f',{n}' for n in tag_names),
+    ]
+    per_table = max(1, rows // tables)
+    for i in range(rows):
+        table = i // per_table
+        lines.append(
+            f',,{table},2022-01-01T00:00:00Z,2022-01-02T00:00:00Z,'
+            f'2022-01-01T{i // 3600 % 24:02}:{i // 60 % 60:02}:{i % 60:02}.{i:09}Z,{i * 0.5},usage,cpu'
+            + ''.join(f',value-{table}-{t}' for t in range(tags))
+        )
+    return '\r\n'.join(lines) + '\r\n\r\n'
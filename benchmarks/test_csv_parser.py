@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import pytest
+
+from aioinfluxdb.csv_parser import FluxCsvRowParser
+
+from .conftest import FakeInfluxDB, make_flux_csv
+
+
+@pytest.mark.parametrize(('rows', 'tags'), ((100, 0), (10_000, 0), (10_000, 10)))
+def test_flux_query(benchmark, fake_influx: FakeInfluxDB, rows: int, tags: int) -> None:
+    fake_influx.set_query_response(make_flux_csv(rows, tags=tags, tables=10))
+    client = fake_influx.client()
+
+    async def query() -> int:
+        records = await client.flux_query(organization='org', flux_body='from(bucket: "bucket")')
+        count = 0
+        async for _ in records:
+            count += 1
+        return count
+
+    assert benchmark(lambda: fake_influx.loop.run_until_complete(query())) == rows
+    fake_influx.loop.run_until_complete(client.close())
+
+
+@pytest.mark.parametrize('chunk_size', (4 * 1024, 64 * 1024))
+def test_feed(benchmark, chunk_size: int) -> None:
+    data = make_flux_csv(10_000, tags=10, tables=10).encode()
+    chunks = [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+    def parse() -> int:
+        parser = FluxCsvRowParser()
+        count = sum(len(parser.feed(chunk)) for chunk in chunks)
+        return count + len(parser.close())
+
+    assert benchmark(parse) == 10_000
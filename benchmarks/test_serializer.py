@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import pytest
+
+from aioinfluxdb import types
+from aioinfluxdb.serializer import DefaultRecordSerializer, SortedTagsRecordSerializer
+
+from .conftest import make_records
+
+
+@pytest.mark.parametrize(('tags', 'fields'), ((0, 1), (3, 1), (3, 8), (10, 20)))
+def test_serialize_record(benchmark, tags: int, fields: int) -> None:
+    records = make_records(1_000, tags=tags, fields=fields)
+
+    benchmark(lambda: [DefaultRecordSerializer.serialize_record(r) for r in records])
+
+
+@pytest.mark.parametrize(('tags', 'fields'), ((0, 1), (3, 1), (3, 8), (10, 20)))
+def test_serialize_point(benchmark, tags: int, fields: int) -> None:
+    points = [
+        types.Point(r.measurement, r.field_set, tag_set=r.tag_set, timestamp=r.timestamp)
+        for r in make_records(1_000, tags=tags, fields=fields)
+    ]
+
+    benchmark(lambda: [DefaultRecordSerializer.serialize_record(p) for p in points])
+
+
+@pytest.mark.parametrize(('tags', 'fields'), ((3, 1), (10, 20)))
+@pytest.mark.parametrize('serializer', (DefaultRecordSerializer, SortedTagsRecordSerializer))
+def test_serialize_mapping_record(benchmark, serializer, tags: int, fields: int) -> None:
+    records = [
+        r._replace(tag_set=dict(r.tag_set), field_set=dict(r.field_set))
+        for r in make_records(1_000, tags=tags, fields=fields)
+    ]
+
+    benchmark(lambda: [serializer.serialize_record(r) for r in records])
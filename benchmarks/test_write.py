@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import pytest
+
+from .conftest import FakeInfluxDB, make_records
+
+
+@pytest.mark.parametrize('gzip', (True, False))
+@pytest.mark.parametrize('batch_size', (1, 1_000, 10_000))
+def test_write_multiple(benchmark, fake_influx: FakeInfluxDB, gzip: bool, batch_size: int) -> None:
+    records = make_records(batch_size, tags=3, fields=4)
+    client = fake_influx.client(gzip=gzip)
+
+    benchmark(
+        lambda: fake_influx.loop.run_until_complete(
+            client.write_multiple(bucket='bucket', organization='org', records=records)
+        )
+    )
+    fake_influx.loop.run_until_complete(client.close())
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import os
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
 
+import aiohttp.test_utils
+import aiohttp.web
 import pytest
 import pytest_asyncio
 
@@ -67,3 +70,41 @@ async def bucket(
     bucket_name: str,
 ) -> types.Bucket:
     return await aiohttp_influx.create_bucket(name=bucket_name, organization_id=organization.id)
+
+
+@dataclass
+class FakeInfluxDB:
+    server: aiohttp.test_utils.TestServer
+    writes: List[aiohttp.web.BaseRequest] = field(default_factory=list)
+    bodies: List[bytes] = field(default_factory=list)
+    fail_with: Optional[int] = None
+    queries: List[Any] = field(default_factory=list)
+    query_response: str = ''
+
+    def client(self, **kwargs: Any) -> AioHTTPClient:
+        return AioHTTPClient(host=self.server.host, port=self.server.port, token='token', **kwargs)
+
+
+@pytest_asyncio.fixture(scope='function')
+async def fake_influx(aiohttp_server) -> FakeInfluxDB:
+    fake: FakeInfluxDB
+
+    async def write(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        if fake.fail_with is not None:
+            return aiohttp.web.Response(status=fake.fail_with)
+        # aiohttp already decodes `Content-Encoding: gzip` bodies
+        fake.writes.append(request)
+        fake.bodies.append(await request.read())
+        return aiohttp.web.Response(status=204)
+
+    async def query(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        if fake.fail_with is not None:
+            return aiohttp.web.Response(status=fake.fail_with)
+        fake.queries.append(await request.json())
+        return aiohttp.web.Response(text=fake.query_response, content_type='text/csv')
+
+    app = aiohttp.web.Application()
+    app.router.add_post('/api/v2/write', write)
+    app.router.add_post('/api/v2/query', query)
+    fake = FakeInfluxDB(server=await aiohttp_server(app))
+    return fake
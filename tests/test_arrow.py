@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from aioinfluxdb.arrow import write_record_batches
+
+pa = pytest.importorskip('pyarrow')
+
+QUERY_RESPONSE = (
+    '#group,false,false,true,false,false,true\r\n'
+    '#datatype,string,long,dateTime:RFC3339,double,base64Binary,string\r\n'
+    '#default,_result,,,1,,\r\n'
+    ',result,table,_time,_value,raw,host\r\n'
+    ',,0,2022-01-01T01:00:00.123456789Z,1.5,YQ==,a\r\n'
+    ',,0,2022-01-01T02:00:00Z,,,a\r\n'
+    ',,1,2022-01-01T01:00:00Z,+Inf,,b\r\n'
+    '\r\n'
+    '#group,false,false,true,false\r\n'
+    '#datatype,string,long,string,long\r\n'
+    '#default,_result,,,\r\n'
+    ',result,table,host,count\r\n'
+    ',,2,a,3\r\n'
+    '\r\n'
+)
+
+
+@pytest.mark.asyncio
+class TestFluxQueryArrow:
+    async def test_batches(self, fake_influx) -> None:
+        fake_influx.query_response = QUERY_RESPONSE
+        client = fake_influx.client()
+        try:
+            batches = [b async for b in await client.flux_query_arrow(organization='o', flux_body='q', batch_size=10)]
+        finally:
+            await client.close()
+
+        assert [b.num_rows for b in batches] == [2, 1, 1]
+        first = batches[0]
+        assert first.schema.field('_time').type == pa.timestamp('ns', tz='UTC')
+        assert first.column('_time')[0].value == 1640998800_123456789
+        assert first.column('_value').to_pylist() == [1.5, 1.0]
+        assert first.column('raw').to_pylist() == [b'a', None]
+        assert batches[1].column('_value').to_pylist() == [float('inf')]
+        assert batches[1].column('table').to_pylist() == [1]
+        assert batches[2].schema.names == ['result', 'table', 'host', 'count']
+
+    async def test_write_ipc(self, fake_influx, tmp_path) -> None:
+        fake_influx.query_response = QUERY_RESPONSE.split('\r\n\r\n')[0] + '\r\n\r\n'
+        client = fake_influx.client()
+        path = tmp_path / 'result.arrow'
+        try:
+            rows = await write_record_batches(
+                await client.flux_query_arrow(organization='o', flux_body='q', batch_size=1),
+                str(path),
+                format='ipc',
+            )
+        finally:
+            await client.close()
+
+        assert rows == 3
+        table = pa.ipc.open_file(str(path)).read_all()
+        assert table.column('host').to_pylist() == ['a', 'a', 'b']
+        assert table.column('_time')[1].as_py() == datetime(2022, 1, 1, 2, tzinfo=timezone.utc)
+
+    async def test_write_parquet_align(self, tmp_path) -> None:
+        parquet = pytest.importorskip('pyarrow.parquet')
+        schema = pa.schema([('a', pa.int64()), ('b', pa.string())])
+
+        async def batches():
+            yield pa.RecordBatch.from_arrays([pa.array([1])], names=['a'])
+            yield pa.RecordBatch.from_arrays([pa.array(['x']), pa.array([2])], names=['b', 'a'])
+
+        path = str(tmp_path / 'result.parquet')
+        assert await write_record_batches(batches(), path, schema=schema) == 2
+        assert parquet.read_table(path).to_pylist() == [dict(a=1, b=None), dict(a=2, b='x')]
+
+    async def test_write_errors(self, tmp_path) -> None:
+        class FailingSink(io.BytesIO):
+            """Fails the writes of batches, which happen outside of the event loop thread"""
+
+            def write(self, data) -> int:
+                if threading.current_thread() is not threading.main_thread():
+                    raise OSError('disk full')
+                return super().write(data)
+
+        schema = pa.schema([('a', pa.int64())])
+        batch = pa.RecordBatch.from_arrays([pa.array([1])], names=['a'])
+
+        async def batches():
+            yield batch
+
+        with pytest.raises(OSError):
+            await write_record_batches(batches(), FailingSink(), format='ipc', schema=schema)
+
+        async def failing_batches():
+            yield batch
+            await asyncio.sleep(0.01)
+            raise ValueError('query failed')
+
+        with pytest.raises(ValueError):
+            await write_record_batches(failing_batches(), FailingSink(), format='ipc', schema=schema)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pytest
+
+from aioinfluxdb.bridge import copy_flux_query, rfc3339_to_ns
+
+QUERY_RESPONSE = (
+    '#group,false,false,true,true,false,false,true,true,true\r\n'
+    '#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339Nano,double,string,string,string\r\n'
+    '#default,_result,,,,,,,,\r\n'
+    ',result,table,_start,_stop,_time,_value,_field,_measurement,host\r\n'
+    ',,0,2022-01-01T00:00:00Z,2022-01-02T00:00:00Z,2022-01-01T00:00:01.000000001Z,1.5,usage,cpu,a b\r\n'
+    ',,0,2022-01-01T00:00:00Z,2022-01-02T00:00:00Z,2022-01-01T00:00:02Z,NaN,usage,cpu,a b\r\n'
+    ',,1,2022-01-01T00:00:00Z,2022-01-02T00:00:00Z,2022-01-01T00:00:03.5Z,2.5,usage,cpu,c\r\n'
+    '\r\n'
+    '#group,false,false,true,false,false\r\n'
+    '#datatype,string,long,string,dateTime:RFC3339,long\r\n'
+    '#default,_result,,,,\r\n'
+    ',result,table,_measurement,_time,count\r\n'
+    ',,2,disk,2022-01-01T00:00:00Z,3\r\n'
+    '\r\n'
+)
+
+
+def test_rfc3339_to_ns() -> None:
+    assert rfc3339_to_ns('1970-01-01T00:00:01Z') == 1_000_000_000
+    assert rfc3339_to_ns('1970-01-01T00:00:01.5Z') == 1_500_000_000
+    assert rfc3339_to_ns('2022-01-01T00:00:00.123456789Z') == 1_640_995_200_123_456_789
+    assert rfc3339_to_ns('2022-01-01T09:00:00.000000001+09:00') == 1_640_995_200_000_000_001
+
+
+@pytest.mark.asyncio
+class TestCopyFluxQuery:
+    @pytest.mark.parametrize('batch_size', (1, 100))
+    async def test_copy(self, fake_influx, batch_size: int) -> None:
+        fake_influx.query_response = QUERY_RESPONSE
+        client = fake_influx.client()
+        try:
+            count = await copy_flux_query(
+                client,
+                client.target(bucket='downsampled', organization='o'),
+                flux_body='from(bucket: "raw")',
+                organization='o',
+                batch_size=batch_size,
+            )
+        finally:
+            await client.close()
+
+        assert count == 3
+        assert b'\n'.join(fake_influx.bodies).decode().split('\n') == [
+            'cpu,host=a\\ b usage=1.5 1640995201000000001',
+            'cpu,host=c usage=2.5 1640995203500000000',
+            'disk count=3i 1640995200000000000',
+        ]
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import time
+
+import aiohttp.web
+import pytest
+import pytest_asyncio
+
+from aioinfluxdb import AioHTTPClient
+from aioinfluxdb.cache import MetadataCache, TTLCache
+
+
+class TestTTLCache:
+    def test_expire(self, monkeypatch) -> None:
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now)
+        cache: TTLCache[str, int] = TTLCache(ttl=10, negative_ttl=1, max_entries=10)
+        cache.set('positive', 1)
+        cache.set('negative', None)
+        assert cache.lookup('positive') == (True, 1)
+        assert cache.lookup('negative') == (True, None)
+
+        now += 5
+        assert cache.lookup('positive') == (True, 1)
+        assert cache.lookup('negative') == (False, None)
+
+        now += 10
+        assert cache.lookup('positive') == (False, None)
+
+    def test_lru(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(ttl=10, max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.lookup('a')
+        cache.set('c', 3)
+        assert cache.lookup('a') == (True, 1)
+        assert cache.lookup('b') == (False, None)
+        assert len(cache) == 2
+
+
+@pytest_asyncio.fixture
+async def metadata_influx(aiohttp_server):
+    requests = []
+    buckets = dict(b0=dict(id='b0', name='bucket', orgID='o0', retentionRules=[]))
+
+    async def list_buckets(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        requests.append(request.path_qs)
+        found = [b for b in buckets.values() if b['name'] == request.query.get('name', b['name'])]
+        return aiohttp.web.json_response(dict(buckets=found))
+
+    async def get_bucket(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        requests.append(request.path_qs)
+        return aiohttp.web.json_response(buckets[request.match_info['id']])
+
+    async def delete_bucket(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        requests.append(request.path_qs)
+        del buckets[request.match_info['id']]
+        return aiohttp.web.Response(status=204)
+
+    async def list_orgs(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        requests.append(request.path_qs)
+        return aiohttp.web.json_response(dict(orgs=[dict(id='o0', name=request.query['org'])]))
+
+    async def write(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        requests.append(request.path_qs)
+        return aiohttp.web.Response(status=204)
+
+    app = aiohttp.web.Application()
+    app.router.add_get('/api/v2/buckets', list_buckets)
+    app.router.add_get('/api/v2/buckets/{id}', get_bucket)
+    app.router.add_delete('/api/v2/buckets/{id}', delete_bucket)
+    app.router.add_get('/api/v2/orgs', list_orgs)
+    app.router.add_post('/api/v2/write', write)
+    server = await aiohttp_server(app)
+    client = AioHTTPClient(
+        host=server.host,
+        port=server.port,
+        token='token',
+        metadata_cache=MetadataCache(resolve_write_organizations=True),
+    )
+    yield client, requests
+    await client.close()
+
+
+@pytest.mark.asyncio
+class TestMetadataCache:
+    async def test_find_bucket(self, metadata_influx) -> None:
+        client, requests = metadata_influx
+        for _ in range(3):
+            bucket = await client.find_bucket(name='bucket', organization_id='o0')
+            assert bucket.id == 'b0'
+        assert (await client.get_bucket(bucket_id='b0')).name == 'bucket'
+        assert len(requests) == 1
+
+    async def test_invalidate_on_delete(self, metadata_influx) -> None:
+        client, requests = metadata_influx
+        await client.find_bucket(name='bucket', organization_id='o0')
+        await client.delete_bucket(bucket_id='b0')
+        assert await client.find_bucket(name='bucket', organization_id='o0') is None
+        assert await client.find_bucket(name='bucket', organization_id='o0') is None
+        assert len(requests) == 3
+
+    async def test_resolve_write_organization(self, metadata_influx) -> None:
+        client, requests = metadata_influx
+        for _ in range(2):
+            await client.write(bucket='bucket', organization='my-org', record=('m', (('a', 1),)))
+        assert requests == [
+            '/api/v2/orgs?descending=0&limit=1&offset=0&org=my-org',
+            '/api/v2/write?orgID=o0&bucket=bucket&precision=ns',
+            '/api/v2/write?orgID=o0&bucket=bucket&precision=ns',
+        ]
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pytest
+
+from aioinfluxdb.csv_parser import FluxCsvRowParser
+from aioinfluxdb.exceptions import FluxQueryException
+
+QUERY_RESPONSE = (
+    '#group,false,false,true,false,false\r\n'
+    '#datatype,string,long,string,string,double\r\n'
+    '#default,_result,,,,\r\n'
+    ',result,table,host,note,_value\r\n'
+    ',,0,a,"multi\r\nline, ""quoted""",1.5\r\n'
+    ',,1,b,ünïcödé,2.5\r\n'
+    '\r\n'
+).encode()
+
+
+class TestFeed:
+    @pytest.mark.parametrize('chunk_size', (1, 2, 7, len(QUERY_RESPONSE)))
+    def test_chunks(self, chunk_size: int) -> None:
+        parser = FluxCsvRowParser()
+        records = []
+        for i in range(0, len(QUERY_RESPONSE), chunk_size):
+            records.extend(parser.feed(QUERY_RESPONSE[i : i + chunk_size]))
+        records.extend(parser.close())
+
+        assert [r.values for r in records] == [
+            dict(result='_result', table=0, host='a', note='multi\r\nline, "quoted"', _value=1.5),
+            dict(result='_result', table=1, host='b', note='ünïcödé', _value=2.5),
+        ]
+        assert [r.table for r in records] == [0, 1]
+
+    def test_rows(self) -> None:
+        parser = FluxCsvRowParser()
+        rows = parser.feed_rows(QUERY_RESPONSE[:-10]) + parser.feed_rows(QUERY_RESPONSE[-10:], final=True)
+        assert [row[3] for _, row in rows] == ['a', 'b']
+        assert rows[0][0] is not rows[1][0]
+
+    def test_without_trailing_line_break(self) -> None:
+        parser = FluxCsvRowParser()
+        assert len(parser.feed(QUERY_RESPONSE.rstrip())) == 1
+        assert len(parser.close()) == 1
+
+    def test_error(self) -> None:
+        parser = FluxCsvRowParser()
+        with pytest.raises(FluxQueryException):
+            parser.feed(b'#datatype,string,string\r\n,error,reference\r\n,failed to execute query,897\r\n')
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import pytest
+
+from aioinfluxdb import types
+from aioinfluxdb.fanout import FanOutTarget, FanOutWriter
+from aioinfluxdb.serializer import SortedTagsRecordSerializer
+from aioinfluxdb.spool import WriteSpool
+
+
+@pytest.mark.asyncio
+class TestFanOutWriter:
+    async def test_replicated(self, fake_influx) -> None:
+        plain, compressed = fake_influx.client(gzip=False), fake_influx.client()
+        writer = FanOutWriter(
+            (
+                FanOutTarget(plain, bucket='primary', organization='org'),
+                FanOutTarget(compressed, bucket='long-term', organization_id='0123'),
+            )
+        )
+        try:
+            results = await writer.write_multiple(records=(('m', (('a', 1),)), ('m', (('b', 2),))))
+        finally:
+            await plain.close()
+            await compressed.close()
+
+        assert all(r.ok for r in results)
+        assert fake_influx.bodies == [b'm a=1i\nm b=2i'] * 2
+        assert sorted(r.query['bucket'] for r in fake_influx.writes) == ['long-term', 'primary']
+
+    @pytest.mark.parametrize('sharded', (False, True))
+    async def test_empty(self, fake_influx, sharded: bool) -> None:
+        client = fake_influx.client()
+        writer = FanOutWriter(
+            (FanOutTarget(client, bucket=f'b{i}', organization='org') for i in range(2)), sharded=sharded
+        )
+        try:
+            results = await writer.write_multiple(records=())
+        finally:
+            await client.close()
+
+        assert all(r.delivered for r in results)
+        assert fake_influx.writes == []
+
+    async def test_sharded(self, fake_influx) -> None:
+        client = fake_influx.client()
+        writer = FanOutWriter(
+            (FanOutTarget(client, bucket=f'shard-{i}', organization='org') for i in range(3)),
+            sharded=True,
+        )
+        records = [types.Record('m', (('v', i),), tag_set=(('host', f'h{i % 5}'),)) for i in range(50)]
+        try:
+            results = await writer.write_multiple(records=records)
+        finally:
+            await client.close()
+
+        assert all(r.ok for r in results)
+        lines = [line for body in fake_influx.bodies for line in body.decode().split('\n')]
+        assert len(lines) == 50
+        for request, body in zip(fake_influx.writes, fake_influx.bodies):
+            shard = int(request.query['bucket'][len('shard-') :])
+            assert all(writer.shard_of(line) == shard for line in body.decode().split('\n'))
+
+    async def test_failed_target(self, fake_influx) -> None:
+        client = fake_influx.client()
+        broken = fake_influx.client()
+        await broken.close()
+        writer = FanOutWriter(
+            (
+                FanOutTarget(client, bucket='ok', organization='org'),
+                FanOutTarget(broken, bucket='broken', organization='org'),
+            )
+        )
+        try:
+            ok, failed = await writer.write_multiple(records=(('m', (('a', 1),)),))
+        finally:
+            await client.close()
+
+        assert ok.ok
+        assert not failed.ok
+        assert isinstance(failed.error, Exception)
+
+    async def test_spooled_target(self, fake_influx, tmp_path) -> None:
+        fake_influx.fail_with = 503
+        client = fake_influx.client(spool=WriteSpool(tmp_path), spool_replay_interval=60)
+        writer = FanOutWriter((FanOutTarget(client, bucket='b', organization='org'),))
+        try:
+            (result,) = await writer.write_multiple(records=(('m', (('a', 1),)),))
+        finally:
+            await client.close()
+
+        assert result.ok
+        assert result.spooled
+        assert not result.delivered
+
+    async def test_record_serializer(self, fake_influx) -> None:
+        sorted_tags, default = fake_influx.client(record_serializer=SortedTagsRecordSerializer()), fake_influx.client()
+        try:
+            writer = FanOutWriter((FanOutTarget(sorted_tags, bucket='b', organization='org'),))
+            await writer.write_multiple(records=(types.Record('m', (('v', 1),), tag_set=(('b', 'x'), ('a', 'y'))),))
+            with pytest.raises(ValueError):
+                FanOutWriter(
+                    (
+                        FanOutTarget(sorted_tags, bucket='b', organization='org'),
+                        FanOutTarget(default, bucket='b', organization='org'),
+                    )
+                )
+        finally:
+            await sorted_tags.close()
+            await default.close()
+
+        assert fake_influx.bodies == [b'm,a=y,b=x v=1i']
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+import aioinfluxdb
+
+# generous enough for slow CI machines, still far below what importing aiohttp costs
+IMPORT_TIME_BUDGET = 0.5
+
+
+def _loaded_modules(statement: str) -> str:
+    return subprocess.run(
+        [sys.executable, '-c', f'{statement}\nimport sys\nprint(" ".join(sys.modules))'],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.mark.parametrize(
+    'statement',
+    [
+        'import aioinfluxdb',
+        'from aioinfluxdb import Record, WritePrecision',
+        'from aioinfluxdb.serializer import DefaultRecordSerializer',
+    ],
+)
+def test_import_does_not_load_http_stack(statement: str) -> None:
+    modules = _loaded_modules(statement).split()
+
+    for heavy in ('aiohttp', 'orjson', 'aioinfluxdb.aiohttp_client', 'aioinfluxdb.csv_parser'):
+        assert heavy not in modules
+
+
+def test_lazy_attributes() -> None:
+    modules = _loaded_modules('from aioinfluxdb import AioHTTPClient').split()
+
+    assert 'aiohttp' in modules
+    assert aioinfluxdb.AioHTTPClient.__module__ == 'aioinfluxdb.aiohttp_client'
+    assert 'AioHTTPClient' in dir(aioinfluxdb)
+    with pytest.raises(AttributeError):
+        aioinfluxdb.NoSuchName
+
+
+def test_import_time_budget() -> None:
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'from aioinfluxdb import Record'],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    # the last line is the package itself, its cumulative time includes everything it imported
+    cumulative_us = int(stderr.strip().splitlines()[-1].split('|')[1])
+
+    assert cumulative_us / 1_000_000 < IMPORT_TIME_BUDGET
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from aioinfluxdb.instrumentation import ClientStats
+
+QUERY_RESPONSE = (
+    '#group,false,false,true,true,false,false,true,true\r\n'
+    '#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string\r\n'
+    '#default,_result,,,,,,,\r\n'
+    ',result,table,_start,_stop,_time,_value,_field,_measurement\r\n'
+    ',,0,2022-01-01T00:00:00Z,2022-01-02T00:00:00Z,2022-01-01T01:00:00Z,1.5,a,m\r\n'
+    ',,0,2022-01-01T00:00:00Z,2022-01-02T00:00:00Z,2022-01-01T02:00:00Z,2.5,a,m\r\n'
+    '\r\n'
+)
+
+
+@pytest.mark.asyncio
+class TestClientStats:
+    async def test_write(self, fake_influx) -> None:
+        stats = ClientStats()
+        client = fake_influx.client(instrumentation=stats)
+        try:
+            await client.write_multiple(
+                bucket='b',
+                organization='o',
+                records=(('m', (('a', 1),)), ('m', (('b', 2),))),
+            )
+        finally:
+            await client.close()
+
+        assert stats.points_serialized == 2
+        assert stats.serialized_bytes == len(b'm a=1i\nm b=2i')
+        assert stats.compressed_input_bytes == stats.serialized_bytes
+        assert stats.compressed_output_bytes > 0
+        assert stats.requests == 1
+        assert stats.failed_requests == 0
+
+    async def test_query(self, fake_influx) -> None:
+        fake_influx.query_response = QUERY_RESPONSE
+        stats = ClientStats()
+        client = fake_influx.client(instrumentation=stats)
+        try:
+            records = [r async for r in await client.flux_query(organization='o', flux_body='from(bucket: "b")')]
+        finally:
+            await client.close()
+
+        assert [r.get_value() for r in records] == [1.5, 2.5]
+        assert stats.rows_parsed == 2
+        assert stats.parsed_bytes == len(QUERY_RESPONSE)
+        assert stats.requests == 1
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import aiohttp.web
+import pytest
+import pytest_asyncio
+
+from aioinfluxdb import AioHTTPClient
+
+BUCKET_IDS = [f'{i:016x}' for i in range(250)]
+
+
+@pytest_asyncio.fixture
+async def paged_influx(aiohttp_server):
+    requests = []
+
+    async def buckets(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        requests.append(request.query)
+        limit = int(request.query['limit'])
+        after = request.query.get('after')
+        start = BUCKET_IDS.index(after) + 1 if after is not None else 0
+        page = BUCKET_IDS[start : start + limit]
+        return aiohttp.web.json_response(
+            dict(buckets=[dict(id=i, name=f'bucket-{i}', retentionRules=[]) for i in page], links={})
+        )
+
+    async def orgs(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        requests.append(request.query)
+        limit = int(request.query['limit'])
+        offset = int(request.query['offset'])
+        page = BUCKET_IDS[offset : offset + limit]
+        return aiohttp.web.json_response(dict(orgs=[dict(id=i, name=f'org-{i}') for i in page], links={}))
+
+    app = aiohttp.web.Application()
+    app.router.add_get('/api/v2/buckets', buckets)
+    app.router.add_get('/api/v2/orgs', orgs)
+    server = await aiohttp_server(app)
+    client = AioHTTPClient(host=server.host, port=server.port, token='token')
+    yield client, requests
+    await client.close()
+
+
+@pytest.mark.asyncio
+class TestPagination:
+    @pytest.mark.parametrize('prefetch', (True, False))
+    async def test_iter_buckets(self, paged_influx, prefetch: bool) -> None:
+        client, requests = paged_influx
+        ids = [b.id async for b in client.iter_buckets(organization='org', prefetch=prefetch)]
+        assert ids == BUCKET_IDS
+        assert [r.get('after') for r in requests] == [None, BUCKET_IDS[99], BUCKET_IDS[199]]
+
+    async def test_iter_organizations(self, paged_influx) -> None:
+        client, requests = paged_influx
+        ids = [o.id async for o in client.iter_organizations(page_size=50)]
+        assert ids == BUCKET_IDS
+        assert [int(r['offset']) for r in requests] == [0, 50, 100, 150, 200, 250]
+
+    async def test_stop_early(self, paged_influx) -> None:
+        client, requests = paged_influx
+        async for bucket in client.iter_buckets():
+            break
+        assert bucket.id == BUCKET_IDS[0]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from datetime import datetime, timedelta, timezone
+
+import aiohttp.web
+import pytest
+import pytest_asyncio
+
+from aioinfluxdb import AioHTTPClient
+from aioinfluxdb.partition import partitioned_flux_query, split_time_range
+
+START = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+def test_split_time_range() -> None:
+    windows = split_time_range(START, START + timedelta(days=30), 4)
+    assert len(windows) == 4
+    assert windows[0][0] == START
+    assert windows[-1][1] == START + timedelta(days=30)
+    assert all(a[1] == b[0] for a, b in zip(windows, windows[1:]))
+
+
+@pytest_asyncio.fixture
+async def window_influx(aiohttp_server):
+    queries = []
+
+    async def query(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        body = await request.json()
+        start, stop = re.search(r'start: (\S+), stop: (\S+)\)', body['query']).groups()
+        queries.append(start)
+        # later windows answer first
+        day = (datetime.fromisoformat(start.replace('Z', '+00:00')) - START).days
+        await asyncio.sleep(0.05 * (3 - day))
+        return aiohttp.web.Response(
+            text=(
+                '#group,false,false,false,false\r\n'
+                '#datatype,string,long,dateTime:RFC3339,double\r\n'
+                '#default,_result,,,\r\n'
+                ',result,table,_time,_value\r\n'
+                f',,0,{start},1\r\n'
+                f',,0,{stop},2\r\n'
+                '\r\n'
+            ),
+            content_type='text/csv',
+        )
+
+    app = aiohttp.web.Application()
+    app.router.add_post('/api/v2/query', query)
+    server = await aiohttp_server(app)
+    client = AioHTTPClient(host=server.host, port=server.port, token='token')
+    yield client, queries
+    await client.close()
+
+
+@pytest.mark.asyncio
+class TestPartitionedFluxQuery:
+    @pytest.mark.parametrize('ordered', (True, False))
+    async def test_query(self, window_influx, ordered: bool) -> None:
+        client, queries = window_influx
+        records = [
+            r
+            async for r in partitioned_flux_query(
+                client,
+                flux_template='from(bucket: "b") |> range(start: $start, stop: $stop)',
+                start=START,
+                stop=START + timedelta(days=4),
+                partitions=4,
+                concurrency=4,
+                ordered=ordered,
+                organization='o',
+            )
+        ]
+
+        assert len(queries) == 4
+        times = [r.get_time() for r in records]
+        assert sorted(times) == [START + timedelta(days=d) for d in (0, 1, 1, 2, 2, 3, 3, 4)]
+        if ordered:
+            assert times == sorted(times)
+        else:
+            # the last window answers first
+            assert times[:2] == [START + timedelta(days=3), START + timedelta(days=4)]
+
+    async def test_tables_renumbered(self, aiohttp_server) -> None:
+        async def query(request: aiohttp.web.Request) -> aiohttp.web.Response:
+            body = await request.json()
+            start = re.search(r'start: (\S+),', body['query']).group(1)
+            # host `a` is missing from the second window, so host `b` is its table 0
+            hosts = ('a', 'b') if start.startswith('2022-01-01') else ('b',)
+            return aiohttp.web.Response(
+                text=(
+                    '#group,false,false,true,false,true,false\r\n'
+                    '#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,string,double\r\n'
+                    '#default,_result,,,,,\r\n'
+                    ',result,table,_start,_time,host,_value\r\n'
+                    + ''.join(f',,{i},{start},{start},{host},1\r\n' for i, host in enumerate(hosts))
+                    + '\r\n'
+                ),
+                content_type='text/csv',
+            )
+
+        app = aiohttp.web.Application()
+        app.router.add_post('/api/v2/query', query)
+        server = await aiohttp_server(app)
+        client = AioHTTPClient(host=server.host, port=server.port, token='token')
+        try:
+            records = [
+                r
+                async for r in partitioned_flux_query(
+                    client,
+                    flux_template='from(bucket: "b") |> range(start: $start, stop: $stop)',
+                    start=START,
+                    stop=START + timedelta(days=2),
+                    partitions=2,
+                    organization='o',
+                )
+            ]
+        finally:
+            await client.close()
+
+        assert [(r['host'], r.table) for r in records] == [('a', 0), ('b', 1), ('b', 1)]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from aioinfluxdb import AioHTTPClient
+from aioinfluxdb.cache import QueryCache
+
+from .test_instrumentation import QUERY_RESPONSE
+
+FLUX_BODY = 'from(bucket: params.bucket) |> range(start: params.start)'
+
+
+class TestPreparedQuery:
+    @pytest.mark.asyncio
+    async def test_body(self) -> None:
+        client = AioHTTPClient(host='localhost', token='token')
+        try:
+            query = client.prepare_query(organization='o', flux_body=FLUX_BODY)
+            now = datetime(2022, 1, 1, tzinfo=timezone.utc)
+            params = dict(bucket='b', start='-1h')
+            for kwargs in (dict(now=None, params=params), dict(now=now, params=params)):
+                expected = client._flux_query_body(flux_body=FLUX_BODY, **kwargs)
+                assert orjson.loads(query.body(**kwargs)) == orjson.loads(orjson.dumps(expected))
+            assert query.param_names == frozenset(('bucket', 'start'))
+            with pytest.raises(ValueError, match='start'):
+                query.body(params=dict(bucket='b'))
+        finally:
+            await client.close()
+
+
+@pytest.mark.asyncio
+class TestExecute:
+    async def test_execute(self, fake_influx) -> None:
+        fake_influx.query_response = QUERY_RESPONSE
+        client = fake_influx.client()
+        try:
+            query = client.prepare_query(organization='o', flux_body=FLUX_BODY)
+            for start in ('-1h', '-2h'):
+                records = [r async for r in await query.execute(params=dict(bucket='b', start=start))]
+                assert [r.get_value() for r in records] == [1.5, 2.5]
+        finally:
+            await client.close()
+
+        assert [q['params']['start'] for q in fake_influx.queries] == ['-1h', '-2h']
+        assert fake_influx.queries[0]['query'] == FLUX_BODY
+        assert len(query._schema_cache) == 1
+
+    async def test_query_cache(self, fake_influx) -> None:
+        fake_influx.query_response = QUERY_RESPONSE
+        client = fake_influx.client(query_cache=QueryCache(time_bucket=3600))
+        try:
+            query = client.prepare_query(organization='o', flux_body=FLUX_BODY)
+            for _ in range(2):
+                records = [r async for r in await query.execute(params=dict(bucket='b', start='-1h'))]
+                assert len(records) == 2
+        finally:
+            await client.close()
+
+        assert len(fake_influx.queries) == 1
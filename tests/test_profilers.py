@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import pytest
+
+from aioinfluxdb.aiohttp_client import _enable_profilers
+
+from .test_instrumentation import QUERY_RESPONSE
+
+PROFILER_RESPONSE = (
+    '#group,false,false,true,false,false,false,false,false,false,false,false,false,false,false,false,false\r\n'
+    '#datatype,string,long,string,long,long,long,long,long,long,long,long,long,string,string,long,long\r\n'
+    '#default,_profiler,,,,,,,,,,,,,,,\r\n'
+    ',result,table,_measurement,TotalDuration,CompileDuration,QueueDuration,PlanDuration,RequeueDuration,'
+    'ExecuteDuration,Concurrency,MaxAllocated,TotalAllocated,RuntimeErrors,flux/query-plan,'
+    'influxdb/scanned-bytes,influxdb/scanned-values\r\n'
+    ',,0,profiler/query,8924700,350900,33800,0,0,8486500,0,2072,512,,"digraph {\r\n}",96,12\r\n'
+    '\r\n'
+    '#group,false,false,true,false,false,false,false,false,false,false\r\n'
+    '#datatype,string,long,string,string,string,long,long,long,long,double\r\n'
+    '#default,_profiler,,,,,,,,,\r\n'
+    ',result,table,_measurement,Type,Label,Count,MinDuration,MaxDuration,DurationSum,MeanDuration\r\n'
+    ',,1,profiler/operator,*influxdb.readFilterSource,ReadRange2,1,367331,367331,367331,367331\r\n'
+    ',,1,profiler/operator,*universe.filterTransformation,filter3,2,10,30,40,20\r\n'
+    '\r\n'
+)
+
+
+def test_enable_profilers() -> None:
+    assert _enable_profilers('from(bucket: "b")', ['query']) == (
+        'import "profiler"\n\noption profiler.enabledProfilers = ["query"]\nfrom(bucket: "b")'
+    )
+
+    flux = _enable_profilers(
+        '// q\nimport "strings"\nimport s2 "experimental"\n\nfrom(bucket: "b")', ['query', 'operator']
+    )
+    assert flux == (
+        'import "profiler"\n// q\nimport "strings"\nimport s2 "experimental"\n'
+        'option profiler.enabledProfilers = ["query", "operator"]\n\n\nfrom(bucket: "b")'
+    )
+
+    assert _enable_profilers('import "profiler"\nx', ['query']) == (
+        'import "profiler"\noption profiler.enabledProfilers = ["query"]\n\nx'
+    )
+
+
+@pytest.mark.asyncio
+class TestProfiledQuery:
+    async def test_stats(self, fake_influx) -> None:
+        fake_influx.query_response = QUERY_RESPONSE + PROFILER_RESPONSE
+        client = fake_influx.client()
+        try:
+            result = await client.flux_query(
+                organization='o', flux_body='from(bucket: "b")', profilers=['query', 'operator']
+            )
+            records = [r async for r in result]
+        finally:
+            await client.close()
+
+        assert fake_influx.queries[0]['query'].startswith('import "profiler"\n')
+        assert [r.get_value() for r in records] == [1.5, 2.5]
+        stats = result.stats
+        assert stats is not None
+        assert stats.total_duration == 8924700
+        assert stats.execute_duration == 8486500
+        assert stats.total_allocated == 512
+        assert stats.runtime_errors is None
+        assert stats.query_plan == 'digraph {\r\n}'
+        assert stats.scanned_values == 12
+        assert [(o.label, o.count, o.mean_duration) for o in stats.operators] == [
+            ('ReadRange2', 1, 367331.0),
+            ('filter3', 2, 20.0),
+        ]
+        assert len(stats.records) == 3
+
+    async def test_without_profilers(self, fake_influx, capsys) -> None:
+        fake_influx.query_response = QUERY_RESPONSE
+        client = fake_influx.client()
+        try:
+            result = await client.flux_query(organization='o', flux_body='from(bucket: "b")')
+            assert len([r async for r in result]) == 2
+        finally:
+            await client.close()
+
+        assert result.stats is None
+        assert fake_influx.queries[0]['query'] == 'from(bucket: "b")'
+        assert capsys.readouterr().out == ''
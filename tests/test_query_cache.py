@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from aioinfluxdb.cache import CachedFluxResult, QueryCache
+from aioinfluxdb.flux_table import FluxRecord
+
+from .test_instrumentation import QUERY_RESPONSE
+
+
+def make_result(size: int) -> CachedFluxResult:
+    result = CachedFluxResult()
+    result.append(FluxRecord(0, {'_value': 1}))
+    result.size = size
+    return result
+
+
+class TestQueryCache:
+    def test_key_time_bucket(self, monkeypatch) -> None:
+        cache = QueryCache(time_bucket=10)
+        monkeypatch.setattr(time, 'time', lambda: 1_000)
+        key = cache.key(flux_body='q', now=None, params={'a': 1, 'b': 2}, org_map={'org': 'o'})
+        monkeypatch.setattr(time, 'time', lambda: 1_009)
+        assert cache.key(flux_body='q', now=None, params={'b': 2, 'a': 1}, org_map={'org': 'o'}) == key
+        monkeypatch.setattr(time, 'time', lambda: 1_010)
+        assert cache.key(flux_body='q', now=None, params={'a': 1, 'b': 2}, org_map={'org': 'o'}) != key
+
+        now = datetime(2022, 1, 1, 0, 0, 1, tzinfo=timezone.utc)
+        assert cache.key(flux_body='q', now=now, params=None, org_map={}) == cache.key(
+            flux_body='q', now=now.replace(second=9), params=None, org_map={}
+        )
+
+    @pytest.mark.asyncio
+    async def test_max_bytes(self) -> None:
+        cache = QueryCache(max_bytes=100)
+
+        async def fetch(size: int) -> CachedFluxResult:
+            return make_result(size)
+
+        await cache.get_or_fetch('a', lambda: fetch(60))
+        await cache.get_or_fetch('b', lambda: fetch(30))
+        assert len(cache) == 2
+        await cache.get_or_fetch('c', lambda: fetch(30))
+        assert len(cache) == 2
+        assert cache.size == 60
+        await cache.get_or_fetch('d', lambda: fetch(101))
+        assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+class TestCachedFluxQuery:
+    async def test_hit(self, fake_influx) -> None:
+        fake_influx.query_response = QUERY_RESPONSE
+        client = fake_influx.client(query_cache=QueryCache(time_bucket=3600))
+        try:
+            first = [r async for r in await client.flux_query(organization='o', flux_body='from(bucket: "b")')]
+            first[0].values['_value'] = 0
+            second = [r async for r in await client.flux_query(organization='o', flux_body='from(bucket: "b")')]
+        finally:
+            await client.close()
+
+        assert len(fake_influx.queries) == 1
+        assert [r.get_value() for r in second] == [1.5, 2.5]
+        assert [r.table for r in second] == [0, 0]
+
+    async def test_coalesce(self, fake_influx) -> None:
+        fake_influx.query_response = QUERY_RESPONSE
+        client = fake_influx.client(query_cache=QueryCache(time_bucket=3600))
+
+        async def query() -> list:
+            return [r async for r in await client.flux_query(organization='o', flux_body='from(bucket: "b")')]
+
+        try:
+            results = await asyncio.gather(*(query() for _ in range(5)))
+        finally:
+            await client.close()
+
+        assert len(fake_influx.queries) == 1
+        assert all([r.get_value() for r in records] == [1.5, 2.5] for records in results)
+
+    async def test_error_not_cached(self, fake_influx) -> None:
+        fake_influx.fail_with = 500
+        client = fake_influx.client(query_cache=QueryCache(time_bucket=3600))
+        try:
+            with pytest.raises(Exception):
+                await client.flux_query(organization='o', flux_body='from(bucket: "b")')
+            fake_influx.fail_with = None
+            fake_influx.query_response = QUERY_RESPONSE
+            records = [r async for r in await client.flux_query(organization='o', flux_body='from(bucket: "b")')]
+        finally:
+            await client.close()
+
+        assert len(records) == 2
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, List
+
+import pytest
+
+from aioinfluxdb import types
+from aioinfluxdb.exceptions import InvalidRecordError
+from aioinfluxdb.serializer import DefaultRecordSerializer, SortedTagsRecordSerializer, ValidatingRecordSerializer
+
+
+class _Ratio:
+    def __float__(self) -> float:
+        return 0.25
+
+
+class TestPoint:
+    def test_serialize(self) -> None:
+        point = types.Point(
+            'cpu usage',
+            field_set={'value': 0.5, 'count': 3},
+            tag_set={'region': 'eu west', 'host': 'a=b'},
+            timestamp=1_640_995_200_000_000_000,
+        )
+
+        assert DefaultRecordSerializer.serialize_record(point) == DefaultRecordSerializer.serialize_record(
+            types.Record(
+                measurement='cpu usage',
+                tag_set=(('host', 'a=b'), ('region', 'eu west')),
+                field_set=(('value', 0.5), ('count', 3)),
+                timestamp=1_640_995_200_000_000_000,
+            )
+        )
+        assert (
+            DefaultRecordSerializer.serialize_record(point)
+            == r'cpu\ usage,host=a\=b,region=eu\ west value=0.5,count=3i 1640995200000000000'
+        )
+
+    def test_without_tags_and_timestamp(self) -> None:
+        point = types.Point('m', (('a', True),))
+
+        assert DefaultRecordSerializer.serialize_record(point) == 'm a=t'
+        assert point.tag_set == ()
+
+    def test_with_fields_shares_series_key(self) -> None:
+        point = types.Point('m', {'a': 1}, tag_set=(('t', 'x'),))
+        DefaultRecordSerializer.serialize_record(point)
+
+        other = point.with_fields({'b': 2.0}, timestamp=10)
+
+        assert other._series_key == (DefaultRecordSerializer, 'm,t=x')
+        assert other.tag_keys is point.tag_keys
+        assert DefaultRecordSerializer.serialize_record(other) == 'm,t=x b=2.0 10'
+        assert other != point
+        assert other == types.Point('m', {'b': 2.0}, tag_set={'t': 'x'}, timestamp=10)
+
+
+class TestMappings:
+    def test_tag_and_field_mappings(self) -> None:
+        record = types.Record(
+            measurement='m',
+            tag_set={'b': 'x y', 'a=': 'z'},
+            field_set={'f 1': 1.5, 'g': 'v'},
+            timestamp=1,
+        )
+
+        assert DefaultRecordSerializer.serialize_record(record) == r'm,b=x\ y,a\==z f\ 1=1.5,g=v 1'
+        assert DefaultRecordSerializer.serialize_record(('m', None, {'f': 1}, None)) == 'm f=1i'
+
+    def test_sorted_tags(self) -> None:
+        for tag_set in ({'b': '2', 'a': '1', 'c': '3'}, (('b', '2'), ('a', '1'), ('c', '3'))):
+            record = types.Record(measurement='m', tag_set=tag_set, field_set={'f': True})
+
+            assert SortedTagsRecordSerializer.serialize_record(record) == 'm,a=1,b=2,c=3 f=t'
+            assert DefaultRecordSerializer.serialize_record(record) == 'm,b=2,a=1,c=3 f=t'
+
+
+class TestFieldValues:
+    @pytest.mark.parametrize(
+        ('value', 'expected'),
+        (
+            (True, 't'),
+            (0, '0i'),
+            (-(1 << 63), '-9223372036854775808i'),
+            ((1 << 63) - 1, '9223372036854775807i'),
+            (1 << 63, '9223372036854775808u'),
+            ((1 << 64) - 1, '18446744073709551615u'),
+            (1 << 64, str(float(1 << 64))),
+            (-(1 << 63) - 1, str(float(-(1 << 63) - 1))),
+            (1.25, '1.25'),
+            ('a b', '"a b"'),
+            ('a"b\\', 'a\\"b\\\\'),
+            (Decimal('2.5'), '2i'),
+            (_Ratio(), '0.25'),
+        ),
+    )
+    def test_types(self, value: Any, expected: str) -> None:
+        assert DefaultRecordSerializer._serialize_field_value(value) == expected
+
+    def test_numpy_scalars(self) -> None:
+        numpy = pytest.importorskip('numpy')
+
+        assert DefaultRecordSerializer._serialize_field_value(numpy.bool_(True)) == 't'
+        assert DefaultRecordSerializer._serialize_field_value(numpy.int32(-3)) == '-3i'
+        assert DefaultRecordSerializer._serialize_field_value(numpy.uint64((1 << 64) - 1)) == '18446744073709551615u'
+        assert DefaultRecordSerializer._serialize_field_value(numpy.float32(0.5)) == '0.5'
+        assert DefaultRecordSerializer._serialize_field_value(numpy.float64(0.1)) == '0.1'
+
+
+class TestValidation:
+    @pytest.mark.parametrize(
+        'record',
+        (
+            ('', {'f': 1}),
+            ('m', {}),
+            ('m', {'f': float('nan')}),
+            ('m', {'f': float('-inf')}),
+            ('m', {'': 1}),
+            ('m\n', {'f': 1}),
+            ('m', {'t': 'a\nb'}, {'f': 1}, None),
+            ('m', (('t', ''),), {'f': 1}, None),
+            types.Point('m', {'f': float('inf')}),
+            types.Point('m', {}),
+        ),
+    )
+    def test_invalid(self, record: Any) -> None:
+        with pytest.raises(InvalidRecordError):
+            ValidatingRecordSerializer.serialize_record(record)
+
+    def test_valid(self) -> None:
+        record = types.Record(measurement='m', tag_set={'t': 'x'}, field_set={'f': 1.5, 's': 'a\nb'}, timestamp=1)
+
+        assert ValidatingRecordSerializer.serialize_record(record) == DefaultRecordSerializer.serialize_record(record)
+        assert DefaultRecordSerializer.serialize_record(('m', {'f': float('nan')})) == 'm f=nan'
+
+    def test_point_validated_after_default_serializer(self) -> None:
+        point = types.Point('m', {'f': 1.0}, tag_set={'t': 'a\nb'})
+        assert DefaultRecordSerializer.serialize_record(point) == 'm,t=a\nb f=1.0'
+
+        with pytest.raises(InvalidRecordError):
+            ValidatingRecordSerializer.serialize_record(point)
+        with pytest.raises(InvalidRecordError):
+            ValidatingRecordSerializer.serialize_record(point.with_fields({'f': 2.0}))
+
+
+@pytest.mark.asyncio
+class TestWriteInvalidRecords:
+    async def test_on_invalid(self, fake_influx) -> None:
+        invalid: List[types.InvalidRecord] = []
+        client = fake_influx.client(record_serializer=ValidatingRecordSerializer())
+        try:
+            await client.write_multiple(
+                bucket='b',
+                organization='o',
+                records=[('m', {'f': 1}), ('m', {'f': float('nan')}), ('', {'f': 2}), ('m', {'f': 3})],
+                on_invalid=invalid.append,
+            )
+            with pytest.raises(InvalidRecordError):
+                await client.write_multiple(bucket='b', organization='o', records=[('m', {})])
+        finally:
+            await client.close()
+
+        assert fake_influx.bodies == [b'm f=1i\nm f=3i']
+        assert [r.record[0] for r in invalid] == ['m', '']
+        assert all(isinstance(r.error, InvalidRecordError) for r in invalid)
+
+    async def test_every_record_invalid(self, fake_influx) -> None:
+        invalid: List[types.InvalidRecord] = []
+        client = fake_influx.client(record_serializer=ValidatingRecordSerializer())
+        try:
+            records = [('m', {'f': float('nan')}), ('', {'f': 2})]
+            await client.write_multiple(bucket='b', organization='o', records=records, on_invalid=invalid.append)
+            await client.target(bucket='b', organization='o').write_multiple(records, on_invalid=invalid.append)
+        finally:
+            await client.close()
+
+        assert fake_influx.writes == []
+        assert len(invalid) == 4
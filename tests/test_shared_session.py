@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import aiohttp
+import pytest
+
+
+@pytest.mark.asyncio
+class TestSharedSession:
+    async def test_with_token(self, fake_influx) -> None:
+        client = fake_influx.client()
+        other = client.with_token('other-token')
+        try:
+            assert other.session is client.session
+            for c in (client, other, client):
+                await c.write(bucket='b', organization='o', record=('m', (('a', 1),)))
+            await other.close()
+            assert not client.session.closed
+            await client.write(bucket='b', organization='o', record=('m', (('a', 2),)))
+        finally:
+            await client.close()
+
+        assert client.session.closed
+        assert [w.headers['Authorization'] for w in fake_influx.writes] == [
+            'Token token',
+            'Token other-token',
+            'Token token',
+            'Token token',
+        ]
+
+    async def test_session(self, fake_influx) -> None:
+        async with aiohttp.ClientSession(str(fake_influx.server.make_url('/'))) as session:
+            client = fake_influx.client(session=session)
+            await client.write(bucket='b', organization='o', record=('m', (('a', 1),)))
+            await client.close()
+            assert not session.closed
+        assert len(fake_influx.writes) == 1
+
+    async def test_session_and_connector(self, fake_influx) -> None:
+        connector = aiohttp.TCPConnector()
+        async with aiohttp.ClientSession() as session:
+            with pytest.raises(ValueError):
+                fake_influx.client(session=session, connector=connector)
+        await connector.close()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+
+import aiohttp.web
+import pytest
+
+from aioinfluxdb import AioHTTPClient
+from aioinfluxdb.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    async def test_share(self) -> None:
+        flight = SingleFlight()
+        calls = []
+
+        async def fn(value: int) -> int:
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(
+            *(flight.do('a', lambda: fn(1)) for _ in range(5)), flight.do('b', lambda: fn(2))
+        )
+        assert results == [1, 1, 1, 1, 1, 2]
+        assert calls == [1, 2]
+        assert len(flight) == 0
+
+        assert await flight.do('a', lambda: fn(3)) == 3
+
+    async def test_cancel_caller(self) -> None:
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def fn() -> int:
+            started.set()
+            await asyncio.sleep(0.01)
+            return 1
+
+        first = asyncio.ensure_future(flight.do('a', fn))
+        await started.wait()
+        second = asyncio.ensure_future(flight.do('a', fn))
+        first.cancel()
+        assert await second == 1
+
+    async def test_error(self) -> None:
+        flight = SingleFlight()
+
+        async def fn() -> int:
+            await asyncio.sleep(0)
+            raise ValueError
+
+        results = await asyncio.gather(flight.do('a', fn), flight.do('a', fn), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_client_single_flight(aiohttp_server) -> None:
+    requests = []
+
+    async def get_bucket(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        requests.append(request.path)
+        await asyncio.sleep(0.01)
+        return aiohttp.web.json_response(
+            dict(id=request.match_info['id'], name='bucket', orgID='o0', retentionRules=[])
+        )
+
+    async def ping(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        requests.append(request.path)
+        await asyncio.sleep(0.01)
+        return aiohttp.web.Response(status=204)
+
+    app = aiohttp.web.Application()
+    app.router.add_get('/api/v2/buckets/{id}', get_bucket)
+    app.router.add_get('/ping', ping)
+    server = await aiohttp_server(app)
+    client = AioHTTPClient(host=server.host, port=server.port, token='token', single_flight=True)
+    try:
+        pings = await asyncio.gather(*(client.ping() for _ in range(5)))
+        buckets = await asyncio.gather(*(client.get_bucket(bucket_id=i) for i in ('b0', 'b0', 'b1')))
+    finally:
+        await client.close()
+
+    assert pings == [True] * 5
+    assert [bucket.id for bucket in buckets] == ['b0', 'b0', 'b1']
+    assert sorted(requests) == ['/api/v2/buckets/b0', '/api/v2/buckets/b1', '/ping']
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from aioinfluxdb.instrumentation import ClientStats
+from aioinfluxdb.spool import WriteSpool
+
+
+class TestWriteSpool:
+    def test_persisted(self, tmp_path) -> None:
+        spool = WriteSpool(tmp_path)
+        spool.append(params=dict(bucket='b', org='o', precision='ns'), data=b'm a=1i', gzipped=False, points=1)
+        spool.append(params=dict(bucket='b', org='o', precision='ns'), data=b'\x1f\x8b', gzipped=True, points=3)
+        spool.close()
+
+        reopened = WriteSpool(tmp_path)
+        assert reopened.size == spool.size
+        entries = [entry for _, entry in reopened._read_segment(reopened._segments[0], 0)]
+        assert [(e.data, e.gzipped, e.points) for e in entries] == [(b'm a=1i', False, 1), (b'\x1f\x8b', True, 3)]
+        assert entries[0].params == dict(bucket='b', org='o', precision='ns')
+
+    def test_evict_oldest(self, tmp_path) -> None:
+        spool = WriteSpool(tmp_path, max_bytes=200, segment_bytes=64)
+        for i in range(10):
+            spool.append(params=dict(bucket='b'), data=f'm a={i}i'.encode(), gzipped=False, points=1)
+
+        spool.flush()
+
+        assert spool.size <= 200
+        remaining = [entry.data for path in spool._segments for _, entry in spool._read_segment(path, 0)]
+        assert remaining[-1] == b'm a=9i'
+        assert b'm a=0i' not in remaining
+
+
+@pytest.mark.asyncio
+class TestSpooledWrite:
+    async def test_replay_after_outage(self, fake_influx, tmp_path) -> None:
+        fake_influx.fail_with = 503
+        client = fake_influx.client(spool=WriteSpool(tmp_path), spool_replay_interval=0.01)
+        try:
+            await client.write(bucket='b', organization='o', record=('m', (('a', 1),)))
+            assert client._spool
+            assert fake_influx.bodies == []
+
+            fake_influx.fail_with = None
+            await asyncio.wait_for(client._spool_task, 1)
+        finally:
+            await client.close()
+
+        assert fake_influx.bodies == [b'm a=1i']
+        assert fake_influx.writes[0].query['bucket'] == 'b'
+        assert not client._spool
+
+    async def test_client_error_not_spooled(self, fake_influx, tmp_path) -> None:
+        fake_influx.fail_with = 400
+        client = fake_influx.client(spool=WriteSpool(tmp_path))
+        try:
+            with pytest.raises(Exception):
+                await client.write(bucket='b', organization='o', record=('m', (('a', 1),)))
+        finally:
+            await client.close()
+
+        assert not client._spool
+
+    async def test_replay_left_over(self, fake_influx, tmp_path) -> None:
+        spool = WriteSpool(tmp_path)
+        spool.append(params=dict(bucket='b', org='o', precision='ns'), data=b'm a=1i', gzipped=False, points=1)
+        spool.close()
+
+        client = fake_influx.client(spool=WriteSpool(tmp_path), spool_replay_interval=0.01)
+        try:
+            client.replay_spool()
+            assert client._spool_task is not None
+            await asyncio.wait_for(client._spool_task, 1)
+        finally:
+            await client.close()
+
+        assert fake_influx.bodies == [b'm a=1i']
+        assert not client._spool
+
+    async def test_replay_error_retried(self, fake_influx, tmp_path) -> None:
+        spool = WriteSpool(tmp_path)
+        spool.append(params=dict(bucket='b', org='o', precision='ns'), data=b'm a=1i', gzipped=False, points=1)
+        replay = spool.replay
+        failures = [OSError('segment is locked')]
+
+        async def flaky_replay(client) -> int:
+            if len(failures) != 0:
+                raise failures.pop()
+            return await replay(client)
+
+        spool.replay = flaky_replay
+        stats = ClientStats()
+        client = fake_influx.client(spool=spool, spool_replay_interval=0.01, instrumentation=stats)
+        try:
+            client.replay_spool()
+            await asyncio.wait_for(client._spool_task, 1)
+        finally:
+            await client.close()
+
+        assert stats.spool_errors == 1
+        assert fake_influx.bodies == [b'm a=1i']
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import http.server
+import threading
+from typing import Iterator, List, Tuple
+from urllib.error import HTTPError
+
+import orjson
+import pytest
+from isal import igzip
+
+from aioinfluxdb import types
+from aioinfluxdb.serializer import SortedTagsRecordSerializer
+from aioinfluxdb.sync_client import BatchWriter, SyncClient
+
+from .test_instrumentation import QUERY_RESPONSE
+
+
+class FakeInfluxDBHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests: List[Tuple[str, str, bytes]]
+    connections: List[int]
+
+    def do_GET(self) -> None:
+        self.handle_request()
+
+    def do_POST(self) -> None:
+        self.handle_request()
+
+    def handle_request(self) -> None:
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = igzip.decompress(body)
+        self.requests.append((self.command, self.path, body))
+        self.connections.append(self.client_address[1])
+
+        if self.path == '/ping':
+            self.respond(204, b'')
+        elif self.path.startswith('/api/v2/buckets'):
+            bucket = dict(id='b0', name='bucket', orgID='o0', retentionRules=[])
+            self.respond(200, orjson.dumps(dict(buckets=[bucket])), 'application/json')
+        elif self.path.startswith('/api/v2/write') and 'bucket=invalid' in self.path:
+            self.respond(400, b'{"code":"invalid","message":"bad line"}', 'application/json')
+        elif self.path.startswith('/api/v2/write'):
+            self.respond(204, b'')
+        elif self.path.startswith('/api/v2/query'):
+            self.respond(200, igzip.compress(QUERY_RESPONSE.encode()), 'text/csv', gzipped=True)
+
+    def respond(self, status: int, body: bytes, content_type: str = '', gzipped: bool = False) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_) -> None:
+        pass
+
+
+@pytest.fixture
+def sync_influx() -> Iterator[Tuple[SyncClient, FakeInfluxDBHandler]]:
+    handler = type('Handler', (FakeInfluxDBHandler,), dict(requests=[], connections=[]))
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    client = SyncClient(host='127.0.0.1', port=server.server_address[1], token='token')
+    yield client, handler
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+class TestSyncClient:
+    def test_keep_alive(self, sync_influx) -> None:
+        client, handler = sync_influx
+        assert client.ping()
+        assert [bucket.id for bucket in client.list_buckets(name='bucket')] == ['b0']
+        assert client.ping()
+        assert len(set(handler.connections)) == 1
+
+    def test_write(self, sync_influx) -> None:
+        client, handler = sync_influx
+        client.write_multiple(bucket='b', organization='o', records=(('m', (('a', 1),)), ('m', (('b', 2),))))
+        assert handler.requests == [('POST', '/api/v2/write?org=o&bucket=b&precision=ns', b'm a=1i\nm b=2i')]
+
+        with pytest.raises(HTTPError) as e:
+            client.write(bucket='invalid', organization='o', record=('m', (('a', 1),)))
+        assert e.value.code == 400
+
+    def test_record_serializer(self, sync_influx) -> None:
+        plain, handler = sync_influx
+        client = SyncClient(
+            host='127.0.0.1', port=plain._pool._port, token='token', record_serializer=SortedTagsRecordSerializer()
+        )
+        try:
+            client.write(
+                bucket='b', organization='o', record=types.Record('m', (('v', 1),), tag_set=(('b', 'x'), ('a', 'y')))
+            )
+        finally:
+            client.close()
+        assert handler.requests[-1][2] == b'm,a=y,b=x v=1i'
+
+    def test_flux_query(self, sync_influx) -> None:
+        client, handler = sync_influx
+        records = list(client.flux_query(organization='o', flux_body='from(bucket: "b")'))
+        assert [r.get_value() for r in records] == [1.5, 2.5]
+        assert orjson.loads(handler.requests[0][2])['query'] == 'from(bucket: "b")'
+
+
+class TestBatchWriter:
+    def test_batches(self, sync_influx) -> None:
+        client, handler = sync_influx
+        with BatchWriter(client, bucket='b', organization='o', batch_size=2, flush_interval=60) as writer:
+            writer.write_multiple(('m', (('a', i),)) for i in range(3))
+            writer.flush()
+            assert [body for _, _, body in handler.requests] == [b'm a=0i\nm a=1i', b'm a=2i']
+            writer.write(('m', (('a', 3),)))
+        assert handler.requests[-1][2] == b'm a=3i'
+
+    def test_flush_interval(self, sync_influx) -> None:
+        client, handler = sync_influx
+        done = threading.Event()
+        writer = BatchWriter(client, bucket='b', organization='o', flush_interval=0.01)
+        try:
+            writer.write(('m', (('a', 1),)))
+            for _ in range(100):
+                if len(handler.requests) != 0:
+                    done.set()
+                    break
+                done.wait(0.01)
+            assert done.is_set()
+        finally:
+            writer.close()
+
+    def test_error(self, sync_influx) -> None:
+        client, _ = sync_influx
+        errors = []
+        writer = BatchWriter(client, bucket='invalid', organization='o', on_error=lambda e, data: errors.append(data))
+        writer.write(('m', (('a', 1),)))
+        writer.close()
+        assert errors == [b'm a=1i']
+
+        writer = BatchWriter(client, bucket='invalid', organization='o')
+        writer.write(('m', (('a', 1),)))
+        with pytest.raises(HTTPError):
+            writer.close()
+
+    def test_error_in_callback(self, sync_influx) -> None:
+        client, handler = sync_influx
+
+        def on_error(e: Exception, data: bytes) -> None:
+            raise ValueError(data)
+
+        writer = BatchWriter(client, bucket='invalid', organization='o', on_error=on_error)
+        try:
+            writer.write(('m', (('a', 1),)))
+            with pytest.raises(ValueError):
+                writer.flush()
+            writer.write(('m', (('a', 2),)))
+            with pytest.raises(ValueError):
+                writer.flush()
+        finally:
+            writer.close()
+        assert len(handler.requests) == 2
+
+    def test_flush_after_close(self, sync_influx) -> None:
+        client, _ = sync_influx
+        writer = BatchWriter(client, bucket='b', organization='o')
+        writer.close()
+        with pytest.raises(RuntimeError):
+            writer.flush()
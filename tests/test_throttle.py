@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from aioinfluxdb.throttle import AdaptiveConcurrencyLimiter, TokenBucket, WriteThrottle
+
+
+@pytest.mark.asyncio
+class TestTokenBucket:
+    async def test_rate(self) -> None:
+        bucket = TokenBucket(rate=100, burst=10)
+        started_at = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire(10)
+        assert time.monotonic() - started_at == pytest.approx(0.2, abs=0.05)
+
+    async def test_oversized_request(self) -> None:
+        bucket = TokenBucket(rate=1000, burst=10)
+        await asyncio.wait_for(bucket.acquire(50), 1)
+
+
+@pytest.mark.asyncio
+class TestAdaptiveConcurrencyLimiter:
+    async def test_aimd(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=5, target_latency=0.1)
+        for _ in range(10):
+            limiter.on_success(0.01)
+        assert limiter.limit == 5
+        limiter.on_success(1)
+        limiter.on_overload()
+        assert limiter.limit == 2
+        for _ in range(10):
+            limiter.on_overload()
+        assert limiter.limit == 1
+
+    async def test_limit_in_flight(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 2
+
+
+@pytest.mark.asyncio
+class TestThrottledWrite:
+    async def test_overload_shrinks_limit(self, fake_influx) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        client = fake_influx.client(write_throttle=WriteThrottle(points_per_second=1000, concurrency=limiter))
+        try:
+            await client.write(bucket='b', organization='o', record=('m', (('a', 1),)))
+            fake_influx.fail_with = 503
+            with pytest.raises(Exception):
+                await client.write(bucket='b', organization='o', record=('m', (('a', 1),)))
+        finally:
+            await client.close()
+
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
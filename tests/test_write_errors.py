@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+import aiohttp
+import aiohttp.web
+import orjson
+import pytest
+import pytest_asyncio
+
+from aioinfluxdb import AioHTTPClient
+from aioinfluxdb.exceptions import PartialWriteError, WriteError
+from aioinfluxdb.spool import WriteSpool
+
+
+class FakeWriteServer:
+    """
+    Rejects bodies with lines containing `bad`, pointing out the first one if `report_line` is set,
+    and answers 503 to the other bodies with lines containing `busy`
+    """
+
+    bodies: List[bytes]
+    report_line: bool
+    status: Optional[int]
+    """ status of every response if set """
+    port: int
+
+    def __init__(self, report_line: bool) -> None:
+        self.bodies = []
+        self.report_line = report_line
+        self.status = None
+        self.port = 0
+
+    def client(self, **kwargs: Any) -> AioHTTPClient:
+        return AioHTTPClient(host='127.0.0.1', port=self.port, token='token', **kwargs)
+
+    async def write(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
+        body = await request.read()
+        if self.status is not None:
+            return aiohttp.web.json_response(dict(code='unavailable', message='try later'), status=self.status)
+        lines = body.split(b'\n')
+        bad = [i for i, line in enumerate(lines, start=1) if b'bad' in line]
+        if len(bad) == 0:
+            if b'busy' in body:
+                return aiohttp.web.json_response(dict(code='unavailable', message='try later'), status=503)
+            self.bodies.append(body)
+            return aiohttp.web.Response(status=204)
+        error = dict(code='invalid', message=f'unable to parse {lines[bad[0] - 1].decode()!r}: missing field value')
+        if self.report_line:
+            error['line'] = bad[0]
+        return aiohttp.web.Response(body=orjson.dumps(error), status=400, content_type='application/json')
+
+
+@pytest_asyncio.fixture(scope='function')
+async def write_server(aiohttp_server, request) -> FakeWriteServer:
+    fake = FakeWriteServer(report_line=getattr(request, 'param', False))
+    app = aiohttp.web.Application()
+    app.router.add_post('/api/v2/write', fake.write)
+    fake.port = (await aiohttp_server(app, host='127.0.0.1')).port
+    return fake
+
+
+@pytest.mark.asyncio
+class TestWriteErrors:
+    async def test_structured_error(self, write_server) -> None:
+        client = write_server.client()
+        try:
+            with pytest.raises(WriteError) as e:
+                await client.write_multiple(bucket='b', organization='o', records=[('m', {'ok': 1}), ('m', {'bad': 1})])
+        finally:
+            await client.close()
+
+        assert isinstance(e.value, aiohttp.ClientResponseError)
+        assert e.value.status == 400
+        assert e.value.error_code == 'invalid'
+        assert e.value.message == "unable to parse 'm bad=1i': missing field value"
+        assert e.value.line is None
+        assert write_server.bodies == []
+
+    @pytest.mark.parametrize('write_server', (False, True), indirect=True)
+    async def test_bisect_rejected(self, write_server) -> None:
+        records = [('m', {'ok': i}) for i in range(10)]
+        records[3] = ('m', {'bad': 3})
+        records[7] = ('m', {'bad': 7})
+        client = write_server.client()
+        try:
+            with pytest.raises(PartialWriteError) as e:
+                await client.write_multiple(bucket='b', organization='o', records=records, bisect_rejected=True)
+            await client.write_multiple(bucket='b', organization='o', records=records[:3], bisect_rejected=True)
+        finally:
+            await client.close()
+
+        assert sorted(line for line, _ in e.value.rejected) == [b'm bad=3i', b'm bad=7i']
+        assert all(error.status == 400 for _, error in e.value.rejected)
+        assert e.value.written == 8
+        written = sorted(line for body in write_server.bodies for line in body.split(b'\n'))
+        assert written == sorted(
+            [f'm ok={i}i'.encode() for i in range(10) if i not in (3, 7)] + [b'm ok=0i', b'm ok=1i', b'm ok=2i']
+        )
+        if write_server.report_line:
+            assert len(write_server.bodies) == 2
+
+    @pytest.mark.parametrize('write_server', (True,), indirect=True)
+    async def test_bisect_spooled(self, write_server, tmp_path) -> None:
+        records = [('m', {'ok': 0}), ('m', {'bad': 1}), ('m', {'busy': 2})]
+        client = write_server.client(spool=WriteSpool(tmp_path))
+        try:
+            with pytest.raises(PartialWriteError) as e:
+                await client.write_multiple(bucket='b', organization='o', records=records, bisect_rejected=True)
+        finally:
+            await client.close()
+
+        assert [line for line, _ in e.value.rejected] == [b'm bad=1i']
+        assert (e.value.written, e.value.spooled) == (0, 2)
+        assert write_server.bodies == []
+        assert client._spool
+
+    async def test_bisect_does_not_retry_other_errors(self, write_server) -> None:
+        write_server.status = 503
+        client = write_server.client()
+        try:
+            with pytest.raises(WriteError) as e:
+                await client.write_multiple(
+                    bucket='b', organization='o', records=[('m', {'ok': 1}), ('m', {'ok': 2})], bisect_rejected=True
+                )
+        finally:
+            await client.close()
+
+        assert e.value.status == 503
+        assert e.value.error_code == 'unavailable'
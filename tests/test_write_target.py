@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import gzip as gzip_module
+
+import pytest
+
+from aioinfluxdb import constants
+
+
+@pytest.mark.asyncio
+class TestWriteTarget:
+    async def test_write(self, fake_influx) -> None:
+        client = fake_influx.client()
+        target = client.target(bucket='my bucket', organization='a&b', precision=constants.WritePrecision.Second)
+        try:
+            await target.write(('m', (('a', 1),)))
+            await target.write_multiple((('m', (('b', 2),)), ('m', (('c', 3),))))
+        finally:
+            await client.close()
+
+        assert fake_influx.bodies == [b'm a=1i', b'm b=2i\nm c=3i']
+        for request in fake_influx.writes:
+            assert dict(request.query) == dict(org='a&b', bucket='my bucket', precision='s')
+            assert request.headers['Authorization'] == 'Token token'
+
+    async def test_reused_by_write(self, fake_influx) -> None:
+        client = fake_influx.client()
+        try:
+            target = client.target(bucket='b', organization_id='0123')
+            await client.write(bucket='b', organization_id='0123', record=('m', (('a', 1),)))
+            assert client._targets == {tuple(target.params.items()): target}
+        finally:
+            await client.close()
+
+
+@pytest.mark.asyncio
+class TestWriteLines:
+    @pytest.mark.parametrize('gzip', (True, False))
+    async def test_bytes(self, fake_influx, gzip: bool) -> None:
+        client = fake_influx.client(gzip=gzip)
+        try:
+            await client.write_lines(b'm a=1i\nm b=2i', bucket='b', organization='o')
+            await client.write_lines((b'm a=1i\n', b'm b=2i'), bucket='b', organization='o')
+        finally:
+            await client.close()
+
+        assert fake_influx.bodies == [b'm a=1i\nm b=2i'] * 2
+
+    @pytest.mark.parametrize('gzip', (True, False))
+    async def test_async_iterable(self, fake_influx, gzip: bool) -> None:
+        async def chunks():
+            for i in range(100):
+                yield f'm a={i}i\n'.encode()
+
+        client = fake_influx.client(gzip=gzip)
+        try:
+            await client.target(bucket='b', organization='o').write_lines(chunks())
+        finally:
+            await client.close()
+
+        assert fake_influx.bodies == [b''.join([f'm a={i}i\n'.encode() for i in range(100)])]
+
+    async def test_precompressed(self, fake_influx) -> None:
+        client = fake_influx.client(gzip=False)
+        try:
+            await client.write_lines(gzip_module.compress(b'm a=1i'), bucket='b', organization='o', precompressed=True)
+        finally:
+            await client.close()
+
+        assert fake_influx.bodies == [b'm a=1i']
+        assert fake_influx.writes[0].headers['Content-Encoding'] == 'gzip'